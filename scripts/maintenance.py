@@ -0,0 +1,97 @@
+#!python
+
+from argparse import ArgumentParser
+import datetime
+import sys
+
+sys.path.append('.')
+
+from terrareg.database import Database
+from terrareg.analytics import AnalyticsEngine
+from terrareg.module_search import ModuleSearchIndex
+from terrareg.models import ModuleProvider
+
+
+def parse_day(value):
+    """Convert date argument to date object."""
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def rollup_analytics(args):
+    """Re-generate daily analytics rollups."""
+    AnalyticsEngine.rollup_analytics(from_day=args.from_day, to_day=args.to_day)
+
+
+def purge_analytics(args):
+    """Remove analytics older than retention period."""
+    removed_count = AnalyticsEngine.purge_analytics(
+        retention_days=args.retention_days, batch_size=args.batch_size)
+    print('Removed {} analytics rows'.format(removed_count))
+
+
+def rebuild_search_index(args):
+    """Re-generate search tokens for all module providers."""
+    indexed_count = ModuleSearchIndex.rebuild()
+    print('Indexed {} module providers'.format(indexed_count))
+
+
+def recompress_blobs(args):
+    """Compress existing blob values that were stored uncompressed."""
+    recompressed_count = Database.get().recompress_blobs(batch_size=args.batch_size)
+    print('Recompressed {} blob values'.format(recompressed_count))
+
+
+def refresh_source_download_urls(args):
+    """Re-generate stored source download URLs for all module versions."""
+    refreshed_count = ModuleProvider.refresh_all_source_download_urls()
+    print('Refreshed source download URLs for {} module providers'.format(refreshed_count))
+
+
+parser = ArgumentParser('terrareg-maintenance')
+subparsers = parser.add_subparsers(dest='command', required=True)
+
+rollup_analytics_parser = subparsers.add_parser(
+    'rollup-analytics',
+    help='Re-generate daily analytics rollups from the analytics table')
+rollup_analytics_parser.add_argument(
+    '--from-day', dest='from_day', type=parse_day, default=None,
+    help='First day (YYYY-MM-DD) to re-generate rollups for. Defaults to the earliest analytics.')
+rollup_analytics_parser.add_argument(
+    '--to-day', dest='to_day', type=parse_day, default=None,
+    help='Last day (YYYY-MM-DD) to re-generate rollups for. Defaults to the latest analytics.')
+rollup_analytics_parser.set_defaults(func=rollup_analytics)
+
+purge_analytics_parser = subparsers.add_parser(
+    'purge-analytics',
+    help='Remove analytics older than the retention period')
+purge_analytics_parser.add_argument(
+    '--retention-days', dest='retention_days', type=int, default=None,
+    help='Number of days of analytics to retain. Defaults to ANALYTICS_RETENTION_DAYS.')
+purge_analytics_parser.add_argument(
+    '--batch-size', dest='batch_size', type=int, default=None,
+    help='Maximum number of analytics removed per query. Defaults to ANALYTICS_RETENTION_BATCH_SIZE.')
+purge_analytics_parser.set_defaults(func=purge_analytics)
+
+rebuild_search_index_parser = subparsers.add_parser(
+    'rebuild-search-index',
+    help='Re-generate search tokens for all module providers')
+rebuild_search_index_parser.set_defaults(func=rebuild_search_index)
+
+refresh_source_download_urls_parser = subparsers.add_parser(
+    'refresh-source-download-urls',
+    help='Re-generate stored source download URLs for all module versions, '
+         'otherwise re-generated on first download after changing configuration that affects source download URLs')
+refresh_source_download_urls_parser.set_defaults(func=refresh_source_download_urls)
+
+recompress_blobs_parser = subparsers.add_parser(
+    'recompress-blobs',
+    help='Compress existing README, terraform-docs, tfsec, infracost and example file contents stored uncompressed')
+recompress_blobs_parser.add_argument(
+    '--batch-size', dest='batch_size', type=int, default=1000,
+    help='Number of rows processed per batch. Defaults to 1000.')
+recompress_blobs_parser.set_defaults(func=recompress_blobs)
+
+args = parser.parse_args()
+
+Database.get().initialise()
+args.func(args)
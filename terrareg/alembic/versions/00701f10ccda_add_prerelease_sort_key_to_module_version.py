@@ -0,0 +1,53 @@
+"""Add pre-release sort key column to module_version
+
+Revision ID: 00701f10ccda
+Revises: f278515bc33b
+Create Date: 2026-10-18 20:41:12.530914
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '00701f10ccda'
+down_revision = 'f278515bc33b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_prerelease_sort_key', sa.String(length=256), nullable=True))
+
+    # Populate sort key from pre-release of existing module versions,
+    # prefixing each numeric part with its length
+    module_version = sa.table(
+        'module_version',
+        sa.column('id', sa.Integer),
+        sa.column('version_prerelease', sa.String),
+        sa.column('version_prerelease_sort_key', sa.String)
+    )
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(
+        module_version.c.id, module_version.c.version_prerelease
+    ).where(
+        module_version.c.version_prerelease != None
+    )).fetchall()
+    for row in rows:
+        conn.execute(module_version.update().where(
+            module_version.c.id == row['id']
+        ).values(
+            version_prerelease_sort_key=re.sub(
+                r'[0-9]+',
+                lambda numeric_match: '{:02d}{}'.format(len(numeric_match.group(0)), numeric_match.group(0)),
+                row['version_prerelease']
+            )
+        ))
+
+
+def downgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_column('version_prerelease_sort_key')
@@ -0,0 +1,66 @@
+"""Add tfsec failure count columns to module_details
+
+Revision ID: 027b8ba22010
+Revises: 3d65d0ae77e3
+Create Date: 2026-10-18 17:18:32.604117
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '027b8ba22010'
+down_revision = '3d65d0ae77e3'
+branch_labels = None
+depends_on = None
+
+
+SEVERITIES = ['critical', 'high', 'medium', 'low']
+
+
+def upgrade():
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        for severity in SEVERITIES:
+            batch_op.add_column(sa.Column('tfsec_{}_count'.format(severity), sa.Integer(), nullable=False, server_default='0'))
+
+    # Populate failure counts from tfsec output of existing module details
+    module_details = sa.table(
+        'module_details',
+        sa.column('id', sa.Integer),
+        *[sa.column('tfsec_{}_count'.format(severity), sa.Integer) for severity in SEVERITIES]
+    )
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, tfsec FROM module_details WHERE tfsec IS NOT NULL")).fetchall()
+    for row in rows:
+        try:
+            results = json.loads(row['tfsec'])['results'] or []
+        except (ValueError, TypeError, KeyError):
+            continue
+
+        counts = {severity: 0 for severity in SEVERITIES}
+        for result in results:
+            # TFsec status of 0 is a fail
+            if result.get('status') == 0:
+                severity = str(result.get('severity', '')).lower()
+                counts[severity if severity in SEVERITIES else 'low'] += 1
+
+        conn.execute(module_details.update().where(
+            module_details.c.id == row['id']
+        ).values(**{
+            'tfsec_{}_count'.format(severity): count
+            for severity, count in counts.items()
+        }))
+
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        for severity in SEVERITIES:
+            batch_op.create_index(op.f('ix_module_details_tfsec_{}_count'.format(severity)), ['tfsec_{}_count'.format(severity)], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('module_details', schema=None) as batch_op:
+        for severity in SEVERITIES:
+            batch_op.drop_index(op.f('ix_module_details_tfsec_{}_count'.format(severity)))
+            batch_op.drop_column('tfsec_{}_count'.format(severity))
@@ -0,0 +1,30 @@
+"""Add config_fingerprint column to readme_html
+
+Revision ID: 14e4e8822af9
+Revises: 767207fecd43
+Create Date: 2026-10-18 21:24:03.918270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '14e4e8822af9'
+down_revision = '767207fecd43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Remove existing rendered HTML, which may have been stored for any
+    # server hostname and is re-rendered on first use
+    op.execute(sa.table('readme_html').delete())
+
+    with op.batch_alter_table('readme_html', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('config_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('readme_html', schema=None) as batch_op:
+        batch_op.drop_column('config_fingerprint')
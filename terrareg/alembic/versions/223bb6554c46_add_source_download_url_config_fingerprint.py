@@ -0,0 +1,28 @@
+"""Add source_download_url_config_fingerprint column to module_version
+
+Revision ID: 223bb6554c46
+Revises: 00701f10ccda
+Create Date: 2026-10-18 20:58:37.104926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '223bb6554c46'
+down_revision = '00701f10ccda'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing stored source download URLs have no fingerprint,
+    # so are re-generated on first download
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source_download_url_config_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_column('source_download_url_config_fingerprint')
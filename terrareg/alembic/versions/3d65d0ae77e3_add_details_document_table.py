@@ -0,0 +1,32 @@
+"""Add details_document table to hold pre-generated terrareg API details of module versions
+
+Revision ID: 3d65d0ae77e3
+Revises: 60fbd4922990
+Create Date: 2026-10-18 16:42:07.519364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '3d65d0ae77e3'
+down_revision = '60fbd4922990'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Documents are generated for existing module versions on first use
+    op.create_table('details_document',
+        sa.Column('module_version_id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('document', sa.LargeBinary(length=16777215).with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=False),
+        sa.ForeignKeyConstraint(['module_version_id'], ['module_version.id'], name='fk_details_document_module_version_id_module_version_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('module_version_id')
+    )
+
+
+def downgrade():
+    op.drop_table('details_document')
@@ -0,0 +1,38 @@
+"""Add module_version_download_count table to hold total downloads of each module version
+
+Revision ID: 5c439940842b
+Revises: 6416ffbf606d
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c439940842b'
+down_revision = '6416ffbf606d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create download count table
+    op.create_table('module_version_download_count',
+        sa.Column('parent_module_version', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('download_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('parent_module_version')
+    )
+
+    # Populate download counts from existing analytics
+    op.execute("""
+        INSERT INTO module_version_download_count (parent_module_version, download_count)
+        SELECT parent_module_version, COUNT(*)
+        FROM analytics
+        GROUP BY parent_module_version
+    """)
+
+
+def downgrade():
+    # Remove download count table
+    op.drop_table('module_version_download_count')
@@ -0,0 +1,28 @@
+"""Add source_download_url column to module_version
+
+Revision ID: 60fbd4922990
+Revises: a187b0fcd3d6
+Create Date: 2026-10-18 16:27:51.639021
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '60fbd4922990'
+down_revision = 'a187b0fcd3d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Source download URLs of existing module versions are populated
+    # on first download or using the refresh-source-download-urls maintenance command
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source_download_url', sa.String(length=1024), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_column('source_download_url')
@@ -0,0 +1,31 @@
+"""Add versions_document table to hold pre-generated registry versions document of module providers
+
+Revision ID: 64f38c06ec9f
+Revises: 816d4bd0b889
+Create Date: 2026-10-18 14:03:48.105927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '64f38c06ec9f'
+down_revision = '816d4bd0b889'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Documents are generated for existing module providers on first use
+    op.create_table('versions_document',
+        sa.Column('module_provider_id', sa.Integer(), nullable=False),
+        sa.Column('document', sa.LargeBinary(length=16777215).with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=False),
+        sa.ForeignKeyConstraint(['module_provider_id'], ['module_provider.id'], name='fk_versions_document_module_provider_id_module_provider_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('module_provider_id')
+    )
+
+
+def downgrade():
+    op.drop_table('versions_document')
@@ -0,0 +1,74 @@
+"""Add module_search_token table to hold search tokens of latest version of module providers
+
+Revision ID: 741e713875bd
+Revises: b63bfd447969
+Create Date: 2026-10-18 12:41:17.630958
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '741e713875bd'
+down_revision = 'b63bfd447969'
+branch_labels = None
+depends_on = None
+
+
+TOKEN_LENGTH = 12
+
+
+def get_tokens(namespace, module, provider, version, description, owner):
+    """Return search tokens for module provider, matching terrareg.module_search.ModuleSearchIndex."""
+    tokens = set()
+    for value in [namespace, module, description, owner]:
+        if not value:
+            continue
+        value = value.lower()
+        for start_index in range(len(value)):
+            tokens.add(value[start_index:start_index + TOKEN_LENGTH])
+
+    for value in [provider, version]:
+        if value:
+            tokens.add(value.lower()[:TOKEN_LENGTH])
+
+    return tokens
+
+
+def upgrade():
+    module_search_token = op.create_table('module_search_token',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('module_provider_id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(length=TOKEN_LENGTH), nullable=False),
+        sa.ForeignKeyConstraint(['module_provider_id'], ['module_provider.id'], name='fk_module_search_token_module_provider_id_module_provider_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('module_search_token', schema=None) as batch_op:
+        batch_op.create_index('ix_module_search_token_module_provider_id', ['module_provider_id'], unique=False)
+        batch_op.create_index('ix_module_search_token_token_module_provider_id', ['token', 'module_provider_id'], unique=False)
+
+    # Populate tokens for latest version of existing module providers
+    rows = op.get_bind().execute(sa.text("""
+        SELECT module_provider.id, module_provider.namespace, module_provider.module, module_provider.provider,
+            module_version.version, module_version.description, module_version.owner
+        FROM module_provider
+        INNER JOIN module_version ON module_provider.latest_version_id=module_version.id
+    """)).fetchall()
+    token_rows = [
+        {'module_provider_id': row['id'], 'token': token}
+        for row in rows
+        for token in get_tokens(
+            namespace=row['namespace'], module=row['module'], provider=row['provider'],
+            version=row['version'], description=row['description'], owner=row['owner'])
+    ]
+    if token_rows:
+        op.bulk_insert(module_search_token, token_rows)
+
+
+def downgrade():
+    with op.batch_alter_table('module_search_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_search_token_token_module_provider_id')
+        batch_op.drop_index('ix_module_search_token_module_provider_id')
+
+    op.drop_table('module_search_token')
@@ -0,0 +1,27 @@
+"""Add config_fingerprint column to details_document
+
+Revision ID: 767207fecd43
+Revises: 223bb6554c46
+Create Date: 2026-10-18 21:09:14.662085
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '767207fecd43'
+down_revision = '223bb6554c46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing documents have no fingerprint, so are regenerated on first use
+    with op.batch_alter_table('details_document', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('config_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('details_document', schema=None) as batch_op:
+        batch_op.drop_column('config_fingerprint')
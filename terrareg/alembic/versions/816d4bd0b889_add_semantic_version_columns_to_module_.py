@@ -0,0 +1,66 @@
+"""Add semantic version columns to module_version
+
+Revision ID: 816d4bd0b889
+Revises: 741e713875bd
+Create Date: 2026-10-18 13:22:05.871342
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '816d4bd0b889'
+down_revision = '741e713875bd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version_major', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version_minor', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version_patch', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('version_prerelease', sa.String(length=128), nullable=True))
+
+    # Populate semantic version columns from version of existing module versions
+    module_version = sa.table(
+        'module_version',
+        sa.column('id', sa.Integer),
+        sa.column('version_major', sa.Integer),
+        sa.column('version_minor', sa.Integer),
+        sa.column('version_patch', sa.Integer),
+        sa.column('version_prerelease', sa.String)
+    )
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, version FROM module_version")).fetchall()
+    for row in rows:
+        match = re.match(r'^([0-9]+)\.([0-9]+)\.([0-9]+)(?:-([a-z0-9]+))?$', row['version'] or '')
+        if not match:
+            continue
+        conn.execute(module_version.update().where(
+            module_version.c.id == row['id']
+        ).values(
+            version_major=int(match.group(1)),
+            version_minor=int(match.group(2)),
+            version_patch=int(match.group(3)),
+            version_prerelease=match.group(4)
+        ))
+
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_module_version_module_provider_id_semver',
+            ['module_provider_id', 'version_major', 'version_minor', 'version_patch'],
+            unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_version_module_provider_id_semver')
+        batch_op.drop_column('version_prerelease')
+        batch_op.drop_column('version_patch')
+        batch_op.drop_column('version_minor')
+        batch_op.drop_column('version_major')
@@ -0,0 +1,26 @@
+"""Add revision column to module_provider
+
+Revision ID: a187b0fcd3d6
+Revises: 64f38c06ec9f
+Create Date: 2026-10-18 15:41:27.304916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a187b0fcd3d6'
+down_revision = '64f38c06ec9f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('revision', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.drop_column('revision')
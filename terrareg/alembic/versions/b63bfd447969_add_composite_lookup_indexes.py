@@ -0,0 +1,49 @@
+"""Add composite indexes for module provider, module version, submodule and example file lookups
+
+Revision ID: b63bfd447969
+Revises: c8e501f776fa
+Create Date: 2026-10-18 12:04:41.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b63bfd447969'
+down_revision = 'c8e501f776fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.create_index('ix_module_provider_namespace_module_provider', ['namespace', 'module', 'provider'], unique=False)
+
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.create_index('ix_module_version_module_provider_id_version', ['module_provider_id', 'version'], unique=False)
+
+    with op.batch_alter_table('submodule', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_submodule_parent_module_version_path_type',
+            ['parent_module_version', 'path', 'type'],
+            unique=False,
+            mysql_length={'path': 255}
+        )
+
+    with op.batch_alter_table('example_file', schema=None) as batch_op:
+        batch_op.create_index('ix_example_file_submodule_id_path', ['submodule_id', 'path'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('example_file', schema=None) as batch_op:
+        batch_op.drop_index('ix_example_file_submodule_id_path')
+
+    with op.batch_alter_table('submodule', schema=None) as batch_op:
+        batch_op.drop_index('ix_submodule_parent_module_version_path_type')
+
+    with op.batch_alter_table('module_version', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_version_module_provider_id_version')
+
+    with op.batch_alter_table('module_provider', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_provider_namespace_module_provider')
@@ -0,0 +1,151 @@
+"""Store module details and example file content in content-addressed blob table
+
+Revision ID: ba4937c69d42
+Revises: 027b8ba22010
+Create Date: 2026-10-18 18:05:41.283906
+
+"""
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'ba4937c69d42'
+down_revision = '027b8ba22010'
+branch_labels = None
+depends_on = None
+
+
+# Blob columns of each table, which are moved to the blob table
+BLOB_COLUMNS = {
+    'module_details': ['readme_content', 'terraform_docs', 'tfsec', 'infracost'],
+    'example_file': ['content']
+}
+COMPRESSED_BLOB_MARKER = b'\x00zlib\x00'
+
+
+def medium_blob():
+    return sa.LargeBinary(length=16777215).with_variant(mysql.MEDIUMBLOB(), 'mysql')
+
+
+def get_content_hash(value):
+    """Return hash of uncompressed content of encoded blob value."""
+    value = bytes(value)
+    if value.startswith(COMPRESSED_BLOB_MARKER):
+        value = zlib.decompress(value[len(COMPRESSED_BLOB_MARKER):])
+    return hashlib.sha256(value).hexdigest()
+
+
+def upgrade():
+    op.create_table('blob',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('reference_count', sa.Integer(), nullable=False),
+        sa.Column('content', medium_blob(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('blob', schema=None) as batch_op:
+        batch_op.create_index('ix_blob_hash', ['hash'], unique=True)
+
+    for table_name, columns in BLOB_COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(sa.Column('{}_blob_id'.format(column), sa.Integer(), nullable=True))
+                batch_op.create_foreign_key(
+                    'fk_{}_{}_blob_id_blob_id'.format(table_name, column),
+                    'blob', ['{}_blob_id'.format(column)], ['id'],
+                    onupdate='CASCADE')
+
+    # Move existing values to blob table, storing identical content once
+    blob = sa.table(
+        'blob',
+        sa.column('id', sa.Integer),
+        sa.column('hash', sa.String),
+        sa.column('reference_count', sa.Integer),
+        sa.column('content', sa.LargeBinary)
+    )
+    conn = op.get_bind()
+    blob_ids = {}
+    for table_name, columns in BLOB_COLUMNS.items():
+        table = sa.table(
+            table_name,
+            sa.column('id', sa.Integer),
+            *[sa.column('{}_blob_id'.format(column), sa.Integer) for column in columns]
+        )
+        rows = conn.execute(sa.text("SELECT id, {} FROM {}".format(', '.join(columns), table_name))).fetchall()
+        for row in rows:
+            values = {}
+            for column in columns:
+                if row[column] is None:
+                    continue
+                content_hash = get_content_hash(row[column])
+                if content_hash in blob_ids:
+                    conn.execute(blob.update().where(
+                        blob.c.id == blob_ids[content_hash]
+                    ).values(reference_count=(blob.c.reference_count + 1)))
+                else:
+                    conn.execute(blob.insert().values(
+                        hash=content_hash,
+                        reference_count=1,
+                        content=row[column]
+                    ))
+                    blob_ids[content_hash] = conn.execute(
+                        sa.select(blob.c.id).where(blob.c.hash == content_hash)
+                    ).scalar()
+                values['{}_blob_id'.format(column)] = blob_ids[content_hash]
+
+            if values:
+                conn.execute(table.update().where(table.c.id == row['id']).values(**values))
+
+    for table_name, columns in BLOB_COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for column in columns:
+                batch_op.drop_column(column)
+
+
+def downgrade():
+    for table_name, columns in BLOB_COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(sa.Column(column, medium_blob(), nullable=True))
+
+    # Copy blob values back to each row
+    blob = sa.table(
+        'blob',
+        sa.column('id', sa.Integer),
+        sa.column('content', sa.LargeBinary)
+    )
+    conn = op.get_bind()
+    for table_name, columns in BLOB_COLUMNS.items():
+        table = sa.table(
+            table_name,
+            sa.column('id', sa.Integer),
+            *[sa.column(column, sa.LargeBinary) for column in columns],
+            *[sa.column('{}_blob_id'.format(column), sa.Integer) for column in columns]
+        )
+        for column in columns:
+            rows = conn.execute(sa.select(
+                table.c.id.label('id'),
+                blob.c.content.label('content')
+            ).select_from(
+                table
+            ).join(
+                blob,
+                blob.c.id == table.c['{}_blob_id'.format(column)]
+            )).fetchall()
+            for row in rows:
+                conn.execute(table.update().where(table.c.id == row['id']).values(**{column: row['content']}))
+
+    for table_name, columns in BLOB_COLUMNS.items():
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            for column in columns:
+                batch_op.drop_constraint('fk_{}_{}_blob_id_blob_id'.format(table_name, column), type_='foreignkey')
+                batch_op.drop_column('{}_blob_id'.format(column))
+
+    with op.batch_alter_table('blob', schema=None) as batch_op:
+        batch_op.drop_index('ix_blob_hash')
+    op.drop_table('blob')
@@ -0,0 +1,70 @@
+"""Add analytics_daily_rollup table to hold daily aggregated download counts
+
+Revision ID: c8e501f776fa
+Revises: 5c439940842b
+Create Date: 2026-10-18 11:38:02.517364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e501f776fa'
+down_revision = '5c439940842b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Create rollup table
+    op.create_table('analytics_daily_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('module_provider_id', sa.Integer(), nullable=False),
+        sa.Column('module_version_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('environment', sa.String(length=128), nullable=True),
+        sa.Column('analytics_token', sa.String(length=128), nullable=True),
+        sa.Column('auth_token_provided', sa.Boolean(), nullable=False),
+        sa.Column('download_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('analytics_daily_rollup', schema=None) as batch_op:
+        batch_op.create_index('ix_analytics_daily_rollup_module_version_id', ['module_version_id'], unique=False)
+        batch_op.create_index('ix_analytics_daily_rollup_day', ['day'], unique=False)
+        batch_op.create_index('ix_analytics_daily_rollup_module_provider_id_day', ['module_provider_id', 'day'], unique=False)
+
+    # Populate rollups from existing analytics
+    op.execute("""
+        INSERT INTO analytics_daily_rollup (
+            module_provider_id, module_version_id, day, environment,
+            analytics_token, auth_token_provided, download_count
+        )
+        SELECT
+            module_version.module_provider_id,
+            analytics.parent_module_version,
+            DATE(analytics.timestamp),
+            analytics.environment,
+            analytics.analytics_token,
+            analytics.auth_token IS NOT NULL,
+            COUNT(*)
+        FROM analytics
+        INNER JOIN module_version ON module_version.id=analytics.parent_module_version
+        GROUP BY
+            module_version.module_provider_id,
+            analytics.parent_module_version,
+            DATE(analytics.timestamp),
+            analytics.environment,
+            analytics.analytics_token,
+            analytics.auth_token IS NOT NULL
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('analytics_daily_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_daily_rollup_module_provider_id_day')
+        batch_op.drop_index('ix_analytics_daily_rollup_day')
+        batch_op.drop_index('ix_analytics_daily_rollup_module_version_id')
+
+    # Remove rollup table
+    op.drop_table('analytics_daily_rollup')
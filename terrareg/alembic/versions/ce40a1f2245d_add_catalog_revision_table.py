@@ -0,0 +1,29 @@
+"""Add catalog_revision table
+
+Revision ID: ce40a1f2245d
+Revises: 14e4e8822af9
+Create Date: 2026-10-18 21:52:46.207381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce40a1f2245d'
+down_revision = '14e4e8822af9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Row is created when the catalog revision is first incremented
+    op.create_table('catalog_revision',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_revision')
@@ -0,0 +1,32 @@
+"""Add readme_html table to hold rendered README HTML of module details
+
+Revision ID: d0d0d4a2c12e
+Revises: ba4937c69d42
+Create Date: 2026-10-18 18:47:12.730518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0d0d4a2c12e'
+down_revision = 'ba4937c69d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # HTML is rendered for existing module details on first use
+    op.create_table('readme_html',
+        sa.Column('module_details_id', sa.Integer(), nullable=False),
+        sa.Column('server_hostname', sa.String(length=255), nullable=False),
+        sa.Column('html', sa.LargeBinary(length=16777215).with_variant(mysql.MEDIUMBLOB(), 'mysql'), nullable=False),
+        sa.ForeignKeyConstraint(['module_details_id'], ['module_details.id'], name='fk_readme_html_module_details_id_module_details_id', onupdate='CASCADE', ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('module_details_id', 'server_hostname')
+    )
+
+
+def downgrade():
+    op.drop_table('readme_html')
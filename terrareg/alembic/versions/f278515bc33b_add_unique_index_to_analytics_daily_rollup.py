@@ -0,0 +1,89 @@
+"""Add unique index to analytics_daily_rollup for each rollup key
+
+Revision ID: f278515bc33b
+Revises: d0d0d4a2c12e
+Create Date: 2026-10-18 19:24:51.308671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f278515bc33b'
+down_revision = 'd0d0d4a2c12e'
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_KEY_COLUMNS = ['module_version_id', 'day', 'environment', 'analytics_token', 'auth_token_provided']
+
+
+def upgrade():
+    analytics_daily_rollup = sa.table(
+        'analytics_daily_rollup',
+        sa.column('id', sa.Integer),
+        sa.column('module_version_id', sa.Integer),
+        sa.column('day', sa.Date),
+        sa.column('environment', sa.String),
+        sa.column('analytics_token', sa.String),
+        sa.column('auth_token_provided', sa.Boolean),
+        sa.column('download_count', sa.Integer)
+    )
+
+    # Store empty environments and analytics tokens as empty strings,
+    # as NULL values are not considered equal by unique indexes
+    op.execute(analytics_daily_rollup.update().where(
+        analytics_daily_rollup.c.environment == None
+    ).values(environment=''))
+    op.execute(analytics_daily_rollup.update().where(
+        analytics_daily_rollup.c.analytics_token == None
+    ).values(analytics_token=''))
+
+    # Merge duplicate rollups into the first rollup for each key
+    conn = op.get_bind()
+    key_columns = [analytics_daily_rollup.c[column] for column in ROLLUP_KEY_COLUMNS]
+    duplicate_rollups = conn.execute(sa.select(
+        *key_columns,
+        sa.func.min(analytics_daily_rollup.c.id).label('first_id'),
+        sa.func.sum(analytics_daily_rollup.c.download_count).label('total_download_count')
+    ).group_by(
+        *key_columns
+    ).having(
+        sa.func.count() > 1
+    )).fetchall()
+    for duplicate_rollup in duplicate_rollups:
+        conn.execute(analytics_daily_rollup.update().where(
+            analytics_daily_rollup.c.id == duplicate_rollup['first_id']
+        ).values(download_count=duplicate_rollup['total_download_count']))
+        conn.execute(analytics_daily_rollup.delete().where(
+            analytics_daily_rollup.c.id != duplicate_rollup['first_id'],
+            *[
+                analytics_daily_rollup.c[column] == duplicate_rollup[column]
+                for column in ROLLUP_KEY_COLUMNS
+            ]
+        ))
+
+    with op.batch_alter_table('analytics_daily_rollup', schema=None) as batch_op:
+        batch_op.alter_column('environment', existing_type=sa.String(length=128), nullable=False)
+        batch_op.alter_column('analytics_token', existing_type=sa.String(length=128), nullable=False)
+        batch_op.create_index('ix_analytics_daily_rollup_rollup_key', ROLLUP_KEY_COLUMNS, unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('analytics_daily_rollup', schema=None) as batch_op:
+        batch_op.drop_index('ix_analytics_daily_rollup_rollup_key')
+        batch_op.alter_column('analytics_token', existing_type=sa.String(length=128), nullable=True)
+        batch_op.alter_column('environment', existing_type=sa.String(length=128), nullable=True)
+
+    analytics_daily_rollup = sa.table(
+        'analytics_daily_rollup',
+        sa.column('environment', sa.String),
+        sa.column('analytics_token', sa.String)
+    )
+    op.execute(analytics_daily_rollup.update().where(
+        analytics_daily_rollup.c.environment == ''
+    ).values(environment=None))
+    op.execute(analytics_daily_rollup.update().where(
+        analytics_daily_rollup.c.analytics_token == ''
+    ).values(analytics_token=None))
@@ -1,23 +1,48 @@
 
+import atexit
+import collections
 import re
 import datetime
+import logging
+import threading
+import time
 
 
 import sqlalchemy
 
+from terrareg.cache import CacheBackend
 from terrareg.database import Database
 from terrareg.config import Config
 import terrareg.models
 
 
+logger = logging.getLogger(__name__)
+
+
 class AnalyticsEngine:
 
     _ARE_TOKENS_ENABLED = None
     _ARE_ENVIRONMENTS_ENABLED = None
     _TOKEN_ENVIRONMENT_MAPPING = None
+    _WRITE_BEHIND_QUEUE = None
+    _WRITE_BEHIND_QUEUE_LOCK = threading.Lock()
 
     DEFAULT_ENVIRONMENT_NAME = 'Default'
 
+    @classmethod
+    def get_write_behind_queue(cls):
+        """Return write-behind queue, creating and starting it, if it does not exist."""
+        with AnalyticsEngine._WRITE_BEHIND_QUEUE_LOCK:
+            if AnalyticsEngine._WRITE_BEHIND_QUEUE is None:
+                config = Config()
+                AnalyticsEngine._WRITE_BEHIND_QUEUE = AnalyticsWriteBehindQueue(
+                    batch_size=config.ANALYTICS_WRITE_BEHIND_BATCH_SIZE,
+                    flush_interval=config.ANALYTICS_WRITE_BEHIND_FLUSH_INTERVAL,
+                    max_queue_size=config.ANALYTICS_WRITE_BEHIND_MAX_QUEUE_SIZE
+                )
+                AnalyticsEngine._WRITE_BEHIND_QUEUE.start()
+            return AnalyticsEngine._WRITE_BEHIND_QUEUE
+
     @classmethod
     def are_tokens_enabled(cls):
         """Determine if tokens are enabled."""
@@ -103,47 +128,328 @@ class AnalyticsEngine:
         # If auth token is not provided, 
         environment = AnalyticsEngine.get_environment_from_token(auth_token)
 
-        # Insert analytics details into DB
+        analytics_row = {
+            'module_provider_id': module_version._module_provider.pk,
+            'parent_module_version': module_version.pk,
+            'timestamp': datetime.datetime.now(),
+            'terraform_version': terraform_version,
+            'analytics_token': analytics_token,
+            'auth_token': auth_token,
+            'environment': environment
+        }
+
+        # Queue analytics to be inserted by background thread,
+        # if enabled, otherwise insert analytics details into DB
+        if Config().ANALYTICS_WRITE_BEHIND:
+            AnalyticsEngine.get_write_behind_queue().add(analytics_row)
+        else:
+            AnalyticsEngine._insert_analytics_rows([analytics_row])
+
+    @staticmethod
+    def _insert_analytics_rows(analytics_rows):
+        """
+        Insert analytics rows, incrementing download counts and
+        daily rollups of module versions, in a single transaction.
+
+        Each analytics row must contain the module provider ID,
+        alongside the analytics table columns.
+        """
+        db = Database.get()
+
+        download_counts = {}
+        rollup_counts = {}
+        for analytics_row in analytics_rows:
+            download_counts[analytics_row['parent_module_version']] = (
+                download_counts.get(analytics_row['parent_module_version'], 0) + 1
+            )
+            rollup_key = (
+                analytics_row['module_provider_id'],
+                analytics_row['parent_module_version'],
+                analytics_row['timestamp'].date(),
+                analytics_row['environment'],
+                analytics_row['analytics_token'],
+                analytics_row['auth_token'] is not None
+            )
+            rollup_counts[rollup_key] = rollup_counts.get(rollup_key, 0) + 1
+
+        # Use current transaction, if one is present,
+        # otherwise, perform inserts in a new transaction
+        if Database.get_current_transaction() is not None:
+            connection_context = db.get_connection()
+        else:
+            connection_context = db.get_engine().begin()
+
+        with connection_context as conn:
+            conn.execute(db.analytics.insert(), [
+                {
+                    column.name: analytics_row[column.name]
+                    for column in db.analytics.columns
+                    if column.name in analytics_row
+                }
+                for analytics_row in analytics_rows
+            ])
+
+            for module_version_pk, download_count in download_counts.items():
+                AnalyticsEngine._increment_download_count(
+                    conn=conn, module_version_pk=module_version_pk, download_count=download_count)
+
+            for rollup_key, download_count in rollup_counts.items():
+                AnalyticsEngine._increment_daily_rollup(conn, *rollup_key, download_count=download_count)
+
+    @staticmethod
+    def _increment_download_count(conn, module_version_pk, download_count):
+        """Increment download count for module version, creating the row if it does not exist."""
         db = Database.get()
-        insert_statement = db.analytics.insert().values(
-            parent_module_version=module_version.pk,
-            timestamp=datetime.datetime.now(),
-            terraform_version=terraform_version,
-            analytics_token=analytics_token,
-            auth_token=auth_token,
-            environment=environment
+        Database.execute_upsert(
+            conn,
+            db.module_version_download_count.update().where(
+                db.module_version_download_count.c.parent_module_version == module_version_pk
+            ).values(
+                download_count=(db.module_version_download_count.c.download_count + download_count)
+            ),
+            db.module_version_download_count.insert().values(
+                parent_module_version=module_version_pk,
+                download_count=download_count
+            )
         )
-        with db.get_connection() as conn:
+
+    @staticmethod
+    def _increment_daily_rollup(conn, module_provider_id, module_version_id, day,
+                                environment, analytics_token, auth_token_provided,
+                                download_count):
+        """Increment download count of daily rollup, creating the row if it does not exist."""
+        db = Database.get()
+        # Rollups store empty environment and analytics token as empty strings
+        environment = environment or ''
+        analytics_token = analytics_token or ''
+        Database.execute_upsert(
+            conn,
+            db.analytics_daily_rollup.update().where(
+                db.analytics_daily_rollup.c.module_version_id == module_version_id,
+                db.analytics_daily_rollup.c.day == day,
+                db.analytics_daily_rollup.c.environment == environment,
+                db.analytics_daily_rollup.c.analytics_token == analytics_token,
+                db.analytics_daily_rollup.c.auth_token_provided == auth_token_provided
+            ).values(
+                download_count=(db.analytics_daily_rollup.c.download_count + download_count)
+            ),
+            db.analytics_daily_rollup.insert().values(
+                module_provider_id=module_provider_id,
+                module_version_id=module_version_id,
+                day=day,
+                environment=environment,
+                analytics_token=analytics_token,
+                auth_token_provided=auth_token_provided,
+                download_count=download_count
+            )
+        )
+
+    @staticmethod
+    def rollup_analytics(from_day=None, to_day=None):
+        """
+        Re-generate daily rollups from analytics table.
+
+        Rollups are maintained when downloads are recorded, so this is
+        only required to populate rollups for historical analytics.
+        All rollups between from_day and to_day (inclusive) are replaced,
+        so must only be used for days where the analytics table
+        contains all downloads.
+        Days that may contain analytics removed by the retention
+        policy are never re-generated.
+        """
+        db = Database.get()
+
+        retention_days = Config().ANALYTICS_RETENTION_DAYS
+        if retention_days:
+            first_retained_day = (
+                datetime.datetime.now() - datetime.timedelta(days=retention_days)
+            ).date() + datetime.timedelta(days=1)
+            if from_day is None or from_day < first_retained_day:
+                from_day = first_retained_day
+
+        day_column = sqlalchemy.func.date(db.analytics.c.timestamp)
+        environment_column = sqlalchemy.func.coalesce(db.analytics.c.environment, '')
+        analytics_token_column = sqlalchemy.func.coalesce(db.analytics.c.analytics_token, '')
+        auth_token_provided_column = sqlalchemy.case(
+            (db.analytics.c.auth_token == None, False),
+            else_=True
+        )
+
+        delete_statement = db.analytics_daily_rollup.delete()
+        select = sqlalchemy.select(
+            db.module_version.c.module_provider_id,
+            db.analytics.c.parent_module_version,
+            day_column,
+            environment_column,
+            analytics_token_column,
+            auth_token_provided_column,
+            sqlalchemy.func.count()
+        ).select_from(
+            db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).group_by(
+            db.module_version.c.module_provider_id,
+            db.analytics.c.parent_module_version,
+            day_column,
+            environment_column,
+            analytics_token_column,
+            auth_token_provided_column
+        )
+
+        if from_day is not None:
+            delete_statement = delete_statement.where(db.analytics_daily_rollup.c.day >= from_day)
+            select = select.where(
+                db.analytics.c.timestamp >= datetime.datetime.combine(from_day, datetime.time.min)
+            )
+        if to_day is not None:
+            delete_statement = delete_statement.where(db.analytics_daily_rollup.c.day <= to_day)
+            select = select.where(
+                db.analytics.c.timestamp < datetime.datetime.combine(
+                    to_day + datetime.timedelta(days=1), datetime.time.min)
+            )
+
+        insert_statement = db.analytics_daily_rollup.insert().from_select(
+            [
+                'module_provider_id', 'module_version_id', 'day', 'environment',
+                'analytics_token', 'auth_token_provided', 'download_count'
+            ],
+            select
+        )
+
+        if Database.get_current_transaction() is not None:
+            connection_context = db.get_connection()
+        else:
+            connection_context = db.get_engine().begin()
+
+        with connection_context as conn:
+            conn.execute(delete_statement)
             conn.execute(insert_statement)
 
+    @staticmethod
+    def purge_analytics(retention_days=None, batch_size=None):
+        """
+        Remove analytics older than retention period, returning the number of removed rows.
+
+        Download counts and rollups are maintained when downloads are recorded,
+        so are unaffected.
+        The latest analytics row for each analytics token and environment of each
+        module provider is retained, as required by get_module_provider_token_versions.
+        Rows are removed in batches, to avoid long-running locks on the analytics table.
+        """
+        config = Config()
+        retention_days = config.ANALYTICS_RETENTION_DAYS if retention_days is None else retention_days
+        batch_size = config.ANALYTICS_RETENTION_BATCH_SIZE if batch_size is None else batch_size
+        if not retention_days:
+            return 0
+
+        db = Database.get()
+        cutoff_timestamp = datetime.datetime.now() - datetime.timedelta(days=retention_days)
+
+        # Obtain IDs of latest analytics row for each
+        # analytics token and environment of each module provider
+        retained_ids_select = sqlalchemy.select(
+            sqlalchemy.func.max(db.analytics.c.id).label('id')
+        ).select_from(
+            db.analytics
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.analytics.c.parent_module_version
+        ).group_by(
+            db.module_version.c.module_provider_id,
+            db.analytics.c.analytics_token,
+            db.analytics.c.environment
+        )
+        with db.get_connection() as conn:
+            retained_ids = set([row['id'] for row in conn.execute(retained_ids_select)])
+
+        removed_count = 0
+        last_id = 0
+        while True:
+            with db.get_connection() as conn:
+                batch_ids = [
+                    row['id']
+                    for row in conn.execute(
+                        sqlalchemy.select(
+                            db.analytics.c.id
+                        ).where(
+                            db.analytics.c.timestamp < cutoff_timestamp,
+                            db.analytics.c.id > last_id
+                        ).order_by(
+                            db.analytics.c.id.asc()
+                        ).limit(batch_size)
+                    )
+                ]
+            if not batch_ids:
+                break
+
+            last_id = batch_ids[-1]
+            delete_ids = [id_ for id_ in batch_ids if id_ not in retained_ids]
+            if delete_ids:
+                with db.get_connection() as conn:
+                    conn.execute(db.analytics.delete().where(
+                        db.analytics.c.id.in_(delete_ids)
+                    ))
+                removed_count += len(delete_ids)
+
+        return removed_count
+
+    @staticmethod
+    def start_retention_schedule():
+        """
+        Start background thread to periodically remove analytics older than retention period.
+
+        Returns the thread, or None if retention or the retention interval are not configured.
+        """
+        config = Config()
+        if not config.ANALYTICS_RETENTION_DAYS or not config.ANALYTICS_RETENTION_INTERVAL:
+            return None
+
+        def run_retention_schedule():
+            while True:
+                try:
+                    AnalyticsEngine.purge_analytics()
+                except Exception:
+                    logger.exception('Failed to remove analytics outside of retention period')
+                time.sleep(config.ANALYTICS_RETENTION_INTERVAL * 60 * 60)
+
+        thread = threading.Thread(
+            target=run_retention_schedule,
+            name='analytics-retention',
+            daemon=True
+        )
+        thread.start()
+        return thread
+
     def get_total_downloads():
         """Return number of downloads for a given module version."""
         db = Database.get()
         select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
+            [sqlalchemy.func.sum(db.module_version_download_count.c.download_count)]
         ).select_from(
-            db.analytics
+            db.module_version_download_count
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
-            return res.scalar()
+            return res.scalar() or 0
 
     @staticmethod
     def get_global_module_usage_base_query(include_empty_auth_token=False):
         """Return base query for getting all analytics tokens."""
         db = Database.get()
-        # Initial query to select all analytics joined to module version and module provider
+        # Initial query to select all analytics rollups joined to module version and module provider
         select = sqlalchemy.select(
             db.module_provider.c.id,
             db.module_provider.c.namespace,
             db.module_provider.c.module,
             db.module_provider.c.provider,
-            db.analytics.c.analytics_token
+            db.analytics_daily_rollup.c.analytics_token
         ).select_from(
-            db.analytics
+            db.analytics_daily_rollup
         ).join(
             db.module_version,
-            db.analytics.c.parent_module_version == db.module_version.c.id
+            db.analytics_daily_rollup.c.module_version_id == db.module_version.c.id
         ).join(
             db.module_provider,
             db.module_version.c.module_provider_id == db.module_provider.c.id
@@ -155,12 +461,12 @@ class AnalyticsEngine:
         # Filter rows with empty auth token, if including them is not enabled
         if not include_empty_auth_token:
             select = select.where(
-                db.analytics.c.auth_token != None
+                db.analytics_daily_rollup.c.auth_token_provided == True
             )
 
         # Group select by analytics token and module provider ID
         select = select.group_by(
-            db.analytics.c.analytics_token,
+            db.analytics_daily_rollup.c.analytics_token,
             db.module_provider.c.id
         )
         return select
@@ -197,44 +503,86 @@ class AnalyticsEngine:
         """Return number of downloads for a given module version."""
         db = Database.get()
         select = sqlalchemy.select(
-            [sqlalchemy.func.count()]
+            [db.module_version_download_count.c.download_count]
         ).select_from(
-            db.analytics
-        ).join(
-            db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
+            db.module_version_download_count
         ).where(
-            db.module_version.c.id == module_version.pk
+            db.module_version_download_count.c.parent_module_version == module_version.pk
         )
         with db.get_connection() as conn:
             res = conn.execute(select)
-            return res.scalar()
+            return res.scalar() or 0
+
+    @staticmethod
+    def get_module_versions_total_downloads(module_version_pks):
+        """
+        Return number of downloads for multiple module versions.
+
+        Returns dict of module version ID to download count.
+        """
+        # Default all module versions to 0 downloads,
+        # as module versions without analytics will not
+        # be returned from the query
+        downloads = {
+            module_version_pk: 0
+            for module_version_pk in module_version_pks
+        }
+        if not downloads:
+            return downloads
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            [
+                db.module_version_download_count.c.parent_module_version,
+                db.module_version_download_count.c.download_count
+            ]
+        ).select_from(
+            db.module_version_download_count
+        ).where(
+            db.module_version_download_count.c.parent_module_version.in_(list(downloads.keys()))
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            for row in res:
+                downloads[row['parent_module_version']] = row['download_count']
+
+        return downloads
 
     @staticmethod
     def get_module_provider_download_stats(module_provider):
         """Return number of downloads for intervals."""
         db = Database.get()
         stats = {}
-        for i in [(7, 'week'), (31, 'month'), (365, 'year'), (None, 'total')]:
-
+        for i in [(7, 'week'), (31, 'month'), (365, 'year')]:
+            # Sum daily rollups of module provider for the given number of days
+            from_day = (datetime.datetime.now() - datetime.timedelta(days=i[0])).date()
             select = sqlalchemy.select(
-                [sqlalchemy.func.count()]
+                [sqlalchemy.func.sum(db.analytics_daily_rollup.c.download_count)]
             ).select_from(
-                db.analytics
+                db.analytics_daily_rollup
+            ).where(
+                db.analytics_daily_rollup.c.module_provider_id == module_provider.pk,
+                db.analytics_daily_rollup.c.day >= from_day
             )
-            select = AnalyticsEngine._join_filter_analytics_table_by_module_provider(
-                db=db, query=select, module_provider=module_provider)
-
-            # If a checking a given time frame, limit by number of days
-            if i[0]:
-                from_timestamp = datetime.datetime.now() - datetime.timedelta(days=i[0])
-                select = select.where(
-                    db.analytics.c.timestamp >= from_timestamp
-                )
 
             with db.get_connection() as conn:
                 res = conn.execute(select)
-                stats[i[1]] = res.scalar()
+                stats[i[1]] = res.scalar() or 0
+
+        # Obtain total from download counts of module versions
+        select = sqlalchemy.select(
+            [sqlalchemy.func.sum(db.module_version_download_count.c.download_count)]
+        ).select_from(
+            db.module_version_download_count
+        ).join(
+            db.module_version,
+            db.module_version.c.id == db.module_version_download_count.c.parent_module_version
+        ).where(
+            db.module_version.c.module_provider_id == module_provider.pk
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            stats['total'] = res.scalar() or 0
 
         return stats
 
@@ -340,6 +688,12 @@ class AnalyticsEngine:
             conn.execute(db.analytics.delete().where(
                 db.analytics.c.parent_module_version == module_version.pk
             ))
+            conn.execute(db.module_version_download_count.delete().where(
+                db.module_version_download_count.c.parent_module_version == module_version.pk
+            ))
+            conn.execute(db.analytics_daily_rollup.delete().where(
+                db.analytics_daily_rollup.c.module_version_id == module_version.pk
+            ))
 
     @classmethod
     def migrate_analytics_to_new_module_version(cls, old_version_version_pk, new_module_version):
@@ -353,6 +707,34 @@ class AnalyticsEngine:
                 parent_module_version=new_module_version.pk
             ))
 
+            # Merge rollups of old module version into rollups of new module version
+            old_rollups = conn.execute(db.analytics_daily_rollup.select().where(
+                db.analytics_daily_rollup.c.module_version_id == old_version_version_pk
+            )).fetchall()
+            conn.execute(db.analytics_daily_rollup.delete().where(
+                db.analytics_daily_rollup.c.module_version_id == old_version_version_pk
+            ))
+            for old_rollup in old_rollups:
+                cls._increment_daily_rollup(
+                    conn, old_rollup['module_provider_id'], new_module_version.pk, old_rollup['day'],
+                    environment=old_rollup['environment'], analytics_token=old_rollup['analytics_token'],
+                    auth_token_provided=old_rollup['auth_token_provided'],
+                    download_count=old_rollup['download_count'])
+
+            # Move download count from old module version to new module version
+            old_download_count = conn.execute(sqlalchemy.select(
+                [db.module_version_download_count.c.download_count]
+            ).where(
+                db.module_version_download_count.c.parent_module_version == old_version_version_pk
+            )).scalar()
+            if old_download_count:
+                conn.execute(db.module_version_download_count.delete().where(
+                    db.module_version_download_count.c.parent_module_version == old_version_version_pk
+                ))
+                cls._increment_download_count(
+                    conn=conn, module_version_pk=new_module_version.pk,
+                    download_count=old_download_count)
+
     @classmethod
     def get_prometheus_metrics(cls):
         """Return prometheus metrics for modules and usage."""
@@ -382,9 +764,144 @@ class AnalyticsEngine:
             )
         prometheus_generator.add_metric(module_provider_usage_metric)
 
+        if Config().ANALYTICS_WRITE_BEHIND:
+            write_behind_queue = cls.get_write_behind_queue()
+
+            queue_depth_metric = PrometheusMetric(
+                'analytics_write_behind_queue_depth',
+                type_='gauge',
+                help='Number of module downloads waiting to be recorded'
+            )
+            queue_depth_metric.add_data_row(value=write_behind_queue.depth)
+            prometheus_generator.add_metric(queue_depth_metric)
+
+            dropped_events_metric = PrometheusMetric(
+                'analytics_write_behind_dropped_events',
+                type_='counter',
+                help='Number of module downloads that could not be recorded'
+            )
+            dropped_events_metric.add_data_row(value=write_behind_queue.dropped_count)
+            prometheus_generator.add_metric(dropped_events_metric)
+
+        caches = CacheBackend.get_caches()
+        if caches:
+            for name, type_, help, attribute in [
+                    ('cache_hits', 'counter', 'Number of cache lookups that returned a cached value', 'hits'),
+                    ('cache_misses', 'counter', 'Number of cache lookups that did not find a cached value', 'misses'),
+                    ('cache_hit_ratio', 'gauge', 'Ratio of cache lookups that returned a cached value', 'hit_ratio'),
+                    ('cache_evictions', 'counter', 'Number of cache entries removed due to the cache size limit', 'evictions'),
+                    ('cache_size', 'gauge', 'Number of entries in cache', 'size')]:
+                cache_metric = PrometheusMetric(name, type_=type_, help=help)
+                for cache in caches:
+                    cache_metric.add_data_row(value=getattr(cache, attribute), labels={'cache': cache.name})
+                prometheus_generator.add_metric(cache_metric)
+
         return prometheus_generator.generate()
 
 
+class AnalyticsWriteBehindQueue:
+    """
+    Queue analytics rows in memory, inserting them into
+    the database in batches from a background thread.
+
+    Rows are inserted when the number of queued rows reaches the
+    batch size or after the flush interval, whichever occurs first.
+    Rows are dropped if the queue is full or if the insert fails.
+    """
+
+    @property
+    def depth(self):
+        """Return number of queued analytics rows."""
+        with self._condition:
+            return len(self._queue)
+
+    @property
+    def dropped_count(self):
+        """Return number of analytics rows that have been dropped."""
+        with self._condition:
+            return self._dropped_count
+
+    def __init__(self, batch_size, flush_interval, max_queue_size):
+        """Store member variables."""
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = flush_interval
+        self._max_queue_size = max_queue_size
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._dropped_count = 0
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        """Start background thread, draining queue on shutdown."""
+        self._thread = threading.Thread(
+            target=self._run,
+            name='analytics-write-behind',
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def add(self, analytics_row):
+        """Add analytics row to queue, returning whether it was queued."""
+        with self._condition:
+            if self._stopped or len(self._queue) >= self._max_queue_size:
+                self._dropped_count += 1
+                return False
+
+            self._queue.append(analytics_row)
+
+            # Wake background thread if batch size has been reached
+            if len(self._queue) >= self._batch_size:
+                self._condition.notify()
+        return True
+
+    def flush(self):
+        """Insert all queued analytics rows into the database."""
+        with self._flush_lock:
+            while True:
+                with self._condition:
+                    batch = [
+                        self._queue.popleft()
+                        for _ in range(min(self._batch_size, len(self._queue)))
+                    ]
+                if not batch:
+                    return
+
+                try:
+                    AnalyticsEngine._insert_analytics_rows(batch)
+                except Exception:
+                    with self._condition:
+                        self._dropped_count += len(batch)
+                    logger.exception('Failed to record %d module downloads', len(batch))
+
+    def stop(self):
+        """Stop background thread and insert any remaining queued analytics rows."""
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        """Insert queued analytics rows when batch size or flush interval is reached, until stopped."""
+        while True:
+            with self._condition:
+                if not self._stopped and len(self._queue) < self._batch_size:
+                    self._condition.wait(timeout=self._flush_interval)
+                stopped = self._stopped
+
+            self.flush()
+
+            if stopped:
+                return
+
+
 class PrometheusMetric:
     """Prometheus metric"""
 
@@ -0,0 +1,190 @@
+"""Provide in-memory caches."""
+
+import collections
+import threading
+
+from terrareg.config import Config
+
+
+class CacheBackend(object):
+    """
+    Interface for thread-safe caches.
+
+    All caches are registered by name, so that their
+    statistics can be exposed in metrics.
+    Implementations must maintain the hit, miss and eviction counters.
+    """
+
+    _CACHES = {}
+    _CACHES_LOCK = threading.Lock()
+
+    @classmethod
+    def get_caches(cls):
+        """Return all registered caches."""
+        with cls._CACHES_LOCK:
+            return list(cls._CACHES.values())
+
+    @property
+    def name(self):
+        """Return name of cache."""
+        return self._name
+
+    @property
+    def size(self):
+        """Return current number of entries in cache."""
+        raise NotImplementedError
+
+    @property
+    def hits(self):
+        """Return number of cache lookups that returned a cached value."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Return number of cache lookups that did not find a cached value."""
+        return self._misses
+
+    @property
+    def evictions(self):
+        """Return number of entries removed from cache due to size limit."""
+        return self._evictions
+
+    @property
+    def hit_ratio(self):
+        """Return ratio of cache lookups that returned a cached value."""
+        lookups = self._hits + self._misses
+        return (self._hits / lookups) if lookups else 0.0
+
+    def __init__(self, name):
+        """Setup statistics and register cache."""
+        self._name = name
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        with self._CACHES_LOCK:
+            self._CACHES[name] = self
+
+    def get(self, key, default=None):
+        """Return cached value for key, or default if it is not present."""
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store value for key."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove cached value for key."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove all cached values."""
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-memory cache, bounded by number of entries.
+
+    When the cache is full, the least recently used entry is evicted.
+    """
+
+    @property
+    def max_size(self):
+        """Return maximum number of entries in cache."""
+        return self._max_size
+
+    @property
+    def size(self):
+        """Return current number of entries in cache."""
+        return len(self._entries)
+
+    def __init__(self, name, max_size):
+        """Setup member variables and register cache."""
+        super(LRUCache, self).__init__(name=name)
+        self._max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return cached value for key, or default if it is not present."""
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        """Store value for key, evicting least recently used entries if full."""
+        if self._max_size < 1:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        """Remove cached value for key."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all cached values."""
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache(object):
+    """
+    Cache of API responses.
+
+    Entries are keyed by the resource, request path and any request headers
+    that the response varies by, alongside values identifying the current
+    state of the response (e.g. the revision of the module provider).
+    Modifications to the underlying data change the state values,
+    so outdated entries are never returned and are evicted by the backend.
+
+    An in-memory LRU cache is used by default, which can be
+    replaced by any CacheBackend implementation using set_backend.
+    """
+
+    _BACKEND = None
+    _BACKEND_LOCK = threading.Lock()
+
+    @classmethod
+    def get_backend(cls):
+        """Return cache backend, if response caching is enabled."""
+        with cls._BACKEND_LOCK:
+            if cls._BACKEND is None:
+                response_cache_size = Config().RESPONSE_CACHE_SIZE
+                if response_cache_size < 1:
+                    return None
+                cls._BACKEND = LRUCache(name='response', max_size=response_cache_size)
+            return cls._BACKEND
+
+    @classmethod
+    def set_backend(cls, backend):
+        """Replace cache backend. Set to None to use default in-memory cache."""
+        with cls._BACKEND_LOCK:
+            cls._BACKEND = backend
+
+    @classmethod
+    def get(cls, key, state):
+        """Return cached response for key, if cached with the given state."""
+        backend = cls.get_backend()
+        if backend is None:
+            return None
+        return backend.get((key, tuple(state)))
+
+    @classmethod
+    def set(cls, key, state, response):
+        """Store response for key and state."""
+        backend = cls.get_backend()
+        if backend is not None:
+            backend.set((key, tuple(state)), response)
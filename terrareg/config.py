@@ -1,4 +1,6 @@
 
+import hashlib
+import json
 import os
 import uuid
 
@@ -210,6 +212,114 @@ class Config:
             token for token in os.environ.get('ANALYTICS_AUTH_KEYS', '').split(',') if token
         ]
 
+    @property
+    def ANALYTICS_WRITE_BEHIND(self):
+        """
+        Whether to queue module download analytics in memory and insert them into the database
+        in batches from a background thread, rather than inserting each download during the request.
+
+        This reduces database writes during high volumes of module downloads, but queued analytics
+        are lost if the process is terminated without being shutdown cleanly and download counts
+        will be delayed by up to ANALYTICS_WRITE_BEHIND_FLUSH_INTERVAL seconds.
+        """
+        return self.convert_boolean(os.environ.get('ANALYTICS_WRITE_BEHIND', 'False'))
+
+    @property
+    def ANALYTICS_WRITE_BEHIND_BATCH_SIZE(self):
+        """
+        Number of queued analytics that will cause the queue to be inserted into the database,
+        when ANALYTICS_WRITE_BEHIND is enabled.
+
+        This is also the maximum number of analytics inserted in a single database query.
+        """
+        return int(os.environ.get('ANALYTICS_WRITE_BEHIND_BATCH_SIZE', 100))
+
+    @property
+    def ANALYTICS_WRITE_BEHIND_FLUSH_INTERVAL(self):
+        """
+        Maximum number of seconds that analytics are queued for before being inserted into the database,
+        when ANALYTICS_WRITE_BEHIND is enabled.
+        """
+        return float(os.environ.get('ANALYTICS_WRITE_BEHIND_FLUSH_INTERVAL', 5))
+
+    @property
+    def ANALYTICS_WRITE_BEHIND_MAX_QUEUE_SIZE(self):
+        """
+        Maximum number of analytics that can be queued, when ANALYTICS_WRITE_BEHIND is enabled.
+
+        Any downloads whilst the queue is full will not be recorded.
+        """
+        return int(os.environ.get('ANALYTICS_WRITE_BEHIND_MAX_QUEUE_SIZE', 10000))
+
+    @property
+    def ANALYTICS_RETENTION_DAYS(self):
+        """
+        Number of days to retain individual module download analytics for.
+
+        Analytics older than this are removed, except for the latest download for each analytics token and environment
+        of each module provider, which is used for displaying the module versions in use by each analytics token.
+        Download counts and statistics are unaffected, as these are obtained from aggregated data.
+
+        Analytics are removed by the `purge-analytics` maintenance task (see `scripts/maintenance.py`)
+        and periodically by the server, if ANALYTICS_RETENTION_INTERVAL is set.
+
+        Set to 0 to retain all analytics.
+        """
+        return int(os.environ.get('ANALYTICS_RETENTION_DAYS', 0))
+
+    @property
+    def ANALYTICS_RETENTION_BATCH_SIZE(self):
+        """
+        Maximum number of analytics removed in a single database query, when removing analytics
+        older than ANALYTICS_RETENTION_DAYS.
+        """
+        return int(os.environ.get('ANALYTICS_RETENTION_BATCH_SIZE', 1000))
+
+    @property
+    def ANALYTICS_RETENTION_INTERVAL(self):
+        """
+        Number of hours between the server removing analytics older than ANALYTICS_RETENTION_DAYS.
+
+        Set to 0 to disable removing analytics from the server, e.g. if the `purge-analytics`
+        maintenance task is scheduled externally.
+        """
+        return float(os.environ.get('ANALYTICS_RETENTION_INTERVAL', 24))
+
+    @property
+    def SEARCH_IN_MEMORY_INDEX(self):
+        """
+        Whether to hold an in-memory trigram index of module providers, which is used
+        to perform module searches without querying the database.
+
+        The index is built when the server starts and is updated when module versions are published or deleted.
+        Since updates are only applied to the index of the process that performs them,
+        this should only be enabled when running a single server process.
+        """
+        return self.convert_boolean(os.environ.get('SEARCH_IN_MEMORY_INDEX', 'False'))
+
+    @property
+    def SEARCH_CACHE_SIZE(self):
+        """
+        Maximum number of module search results and search filter results held in the in-memory search cache.
+
+        Cached results are invalidated whenever module providers or module versions are modified,
+        including modifications made by other server processes, as the revision of the module catalog is stored in the database.
+        Set to 0 to disable caching of search results.
+        """
+        return int(os.environ.get('SEARCH_CACHE_SIZE', '1000'))
+
+    @property
+    def RESPONSE_CACHE_SIZE(self):
+        """
+        Maximum number of responses of Terraform registry API endpoints held in the in-memory response cache.
+
+        Cached responses are invalidated whenever the module provider or its module versions are modified,
+        or configuration used to generate the responses is changed.
+        Source download URLs of module downloads are also cached, whilst still recording the downloads.
+        Set to 0 to disable caching of responses.
+        """
+        return int(os.environ.get('RESPONSE_CACHE_SIZE', '1000'))
+
     @property
     def UPLOAD_API_KEYS(self):
         """
@@ -426,6 +536,18 @@ class Config:
         """
         return self.convert_boolean(os.environ.get('INFRACOST_TLS_INSECURE_SKIP_VERIFY', 'False'))
 
+    def get_fingerprint(self, config_names):
+        """
+        Return hash of values of configuration.
+
+        Stored alongside data generated from the configuration,
+        to detect when the data must be re-generated.
+        """
+        return hashlib.sha256(json.dumps(
+            [getattr(self, config_name) for config_name in config_names],
+            default=str
+        ).encode('utf-8')).hexdigest()
+
     def convert_boolean(self, string):
         """Convert boolean environment variable to boolean."""
         if string.lower() in ['true', 'yes', '1']:
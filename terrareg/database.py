@@ -1,5 +1,7 @@
 """Provide database class."""
 
+import zlib
+
 import sqlalchemy
 import sqlalchemy.dialects.mysql
 
@@ -20,21 +22,43 @@ class Database():
     blob_encoding_format = 'utf-8'
     MEDIUM_BLOB_SIZE = ((2 ** 24) - 1)
 
+    # Prefix of compressed blob values.
+    # Uncompressed values, which are stored as encoded strings, never start with a null byte.
+    COMPRESSED_BLOB_MARKER = b'\x00zlib\x00'
+    # Minimum length of encoded value that is compressed,
+    # as compressing small values provides no benefit
+    BLOB_COMPRESSION_MIN_SIZE = 256
+
     @staticmethod
     def encode_blob(value):
-        """Encode string as a blog value"""
+        """
+        Encode string as a blog value.
+
+        Values larger than the compression threshold are compressed
+        and prefixed with the compressed blob marker.
+        """
         # Convert any untruthful values to empty string
         if not value:
             value = ''
-        return value.encode(Database.blob_encoding_format)
+        encoded_value = value.encode(Database.blob_encoding_format)
+        if len(encoded_value) >= Database.BLOB_COMPRESSION_MIN_SIZE:
+            encoded_value = Database.COMPRESSED_BLOB_MARKER + zlib.compress(encoded_value)
+        return encoded_value
 
     @staticmethod
     def decode_blob(value):
-        """Decode blob as a string."""
+        """Decode blob as a string, decompressing compressed values."""
         if value is None:
             return None
+        if Database.is_compressed_blob(value):
+            value = zlib.decompress(value[len(Database.COMPRESSED_BLOB_MARKER):])
         return value.decode(Database.blob_encoding_format)
 
+    @staticmethod
+    def is_compressed_blob(value):
+        """Return whether blob value is compressed."""
+        return bytes(value[:len(Database.COMPRESSED_BLOB_MARKER)]) == Database.COMPRESSED_BLOB_MARKER
+
     @staticmethod
     def medium_blob():
         """Return column type for medium blob."""
@@ -42,17 +66,46 @@ class Database():
                 length=Database.MEDIUM_BLOB_SIZE).with_variant(
                     sqlalchemy.dialects.mysql.MEDIUMBLOB(), "mysql")
 
+    @staticmethod
+    def execute_upsert(conn, update_statement, insert_statement):
+        """
+        Execute update statement, executing insert statement if no rows were updated.
+
+        If the row is inserted by another connection between the update
+        and the insert, the insert fails on the unique key of the row
+        and the update statement is re-executed.
+
+        Returns the result of the insert statement, if the row was inserted.
+        """
+        if conn.execute(update_statement).rowcount:
+            return None
+
+        try:
+            return conn.execute(insert_statement)
+        except sqlalchemy.exc.IntegrityError:
+            conn.execute(update_statement)
+            return None
+
     def __init__(self):
         """Setup member variables."""
         self._git_provider = None
         self._module_provider = None
+        self._blob = None
         self._module_details = None
         self._module_version = None
         self._sub_module = None
         self._analytics = None
+        self._module_version_download_count = None
+        self._analytics_daily_rollup = None
+        self._module_search_token = None
+        self._catalog_revision = None
+        self._versions_document = None
+        self._details_document = None
+        self._readme_html = None
         self._example_file = None
         self._session = None
         self.transaction_connection = None
+        self.transaction_commit_callbacks = None
 
     @property
     def session(self):
@@ -75,6 +128,13 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._module_provider
 
+    @property
+    def blob(self):
+        """Return blob table."""
+        if self._blob is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._blob
+
     @property
     def module_details(self):
         """Return module_details table."""
@@ -103,6 +163,55 @@ class Database():
             raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
         return self._analytics
 
+    @property
+    def module_version_download_count(self):
+        """Return module_version_download_count table."""
+        if self._module_version_download_count is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_version_download_count
+
+    @property
+    def analytics_daily_rollup(self):
+        """Return analytics_daily_rollup table."""
+        if self._analytics_daily_rollup is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._analytics_daily_rollup
+
+    @property
+    def module_search_token(self):
+        """Return module_search_token table."""
+        if self._module_search_token is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._module_search_token
+
+    @property
+    def catalog_revision(self):
+        """Return catalog_revision table."""
+        if self._catalog_revision is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._catalog_revision
+
+    @property
+    def versions_document(self):
+        """Return versions_document table."""
+        if self._versions_document is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._versions_document
+
+    @property
+    def readme_html(self):
+        """Return readme_html table."""
+        if self._readme_html is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._readme_html
+
+    @property
+    def details_document(self):
+        """Return details_document table."""
+        if self._details_document is None:
+            raise DatabaseMustBeIniistalisedError('Database class must be initialised.')
+        return self._details_document
+
     @property
     def example_file(self):
         """Return analytics table."""
@@ -151,6 +260,9 @@ class Database():
         GENERAL_COLUMN_SIZE = 128
         LARGE_COLUMN_SIZE = 1024
         URL_COLUMN_SIZE = 1024
+        SEARCH_TOKEN_COLUMN_SIZE = 12
+        BLOB_HASH_COLUMN_SIZE = 64
+        HOSTNAME_COLUMN_SIZE = 255
 
         self._session = sqlalchemy.Table(
             'session', meta,
@@ -198,16 +310,66 @@ class Database():
                     use_alter=True
                 ),
                 nullable=True
-            )
+            ),
+            # Incremented on each change to the module provider, its versions or related objects,
+            # used to generate ETags for API responses
+            sqlalchemy.Column('revision', sqlalchemy.Integer, nullable=False, default=0, server_default='0'),
+            sqlalchemy.Index('ix_module_provider_namespace_module_provider', 'namespace', 'module', 'provider')
+        )
+
+        # Encoded blob values, keyed by hash of content, so that identical content
+        # of module details and example files is only stored once.
+        # The number of rows referencing each blob is maintained, so that
+        # blobs can be removed when they are no longer referenced.
+        self._blob = sqlalchemy.Table(
+            'blob', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('hash', sqlalchemy.String(BLOB_HASH_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('reference_count', sqlalchemy.Integer, nullable=False, default=0),
+            sqlalchemy.Column('content', Database.medium_blob()),
+            sqlalchemy.Index('ix_blob_hash', 'hash', unique=True)
         )
 
         self._module_details = sqlalchemy.Table(
             'module_details', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
-            sqlalchemy.Column('readme_content', Database.medium_blob()),
-            sqlalchemy.Column('terraform_docs', Database.medium_blob()),
-            sqlalchemy.Column('tfsec', Database.medium_blob()),
-            sqlalchemy.Column('infracost', Database.medium_blob())
+            sqlalchemy.Column(
+                'readme_content_blob_id',
+                sqlalchemy.ForeignKey(
+                    'blob.id',
+                    name='fk_module_details_readme_content_blob_id_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            ),
+            sqlalchemy.Column(
+                'terraform_docs_blob_id',
+                sqlalchemy.ForeignKey(
+                    'blob.id',
+                    name='fk_module_details_terraform_docs_blob_id_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            ),
+            sqlalchemy.Column(
+                'tfsec_blob_id',
+                sqlalchemy.ForeignKey(
+                    'blob.id',
+                    name='fk_module_details_tfsec_blob_id_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            ),
+            sqlalchemy.Column(
+                'infracost_blob_id',
+                sqlalchemy.ForeignKey(
+                    'blob.id',
+                    name='fk_module_details_infracost_blob_id_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            ),
+            # Number of failed tfsec checks for each severity, calculated when tfsec output is stored
+            sqlalchemy.Column('tfsec_critical_count', sqlalchemy.Integer, index=True, nullable=False, default=0, server_default='0'),
+            sqlalchemy.Column('tfsec_high_count', sqlalchemy.Integer, index=True, nullable=False, default=0, server_default='0'),
+            sqlalchemy.Column('tfsec_medium_count', sqlalchemy.Integer, index=True, nullable=False, default=0, server_default='0'),
+            sqlalchemy.Column('tfsec_low_count', sqlalchemy.Integer, index=True, nullable=False, default=0, server_default='0')
         )
 
         self._module_version = sqlalchemy.Table(
@@ -243,7 +405,24 @@ class Database():
             sqlalchemy.Column('published_at', sqlalchemy.DateTime),
             sqlalchemy.Column('variable_template', Database.medium_blob()),
             sqlalchemy.Column('internal', sqlalchemy.Boolean, nullable=False),
-            sqlalchemy.Column('published', sqlalchemy.Boolean)
+            sqlalchemy.Column('published', sqlalchemy.Boolean),
+            # Pre-rendered source download URL, returned by the module version download endpoint
+            sqlalchemy.Column('source_download_url', sqlalchemy.String(URL_COLUMN_SIZE)),
+            # Fingerprint of configuration used to generate source download URL
+            sqlalchemy.Column('source_download_url_config_fingerprint', sqlalchemy.String(64)),
+            # Parsed components of semantic version, used for ordering versions
+            sqlalchemy.Column('version_major', sqlalchemy.Integer),
+            sqlalchemy.Column('version_minor', sqlalchemy.Integer),
+            sqlalchemy.Column('version_patch', sqlalchemy.Integer),
+            sqlalchemy.Column('version_prerelease', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            # Pre-release with numeric parts prefixed by their length, so that
+            # pre-releases order numerically (e.g. beta2 before beta10)
+            sqlalchemy.Column('version_prerelease_sort_key', sqlalchemy.String(GENERAL_COLUMN_SIZE * 2)),
+            sqlalchemy.Index('ix_module_version_module_provider_id_version', 'module_provider_id', 'version'),
+            sqlalchemy.Index(
+                'ix_module_version_module_provider_id_semver',
+                'module_provider_id', 'version_major', 'version_minor', 'version_patch'
+            )
         )
 
         self._sub_module = sqlalchemy.Table(
@@ -270,7 +449,14 @@ class Database():
             ),
             sqlalchemy.Column('type', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
             sqlalchemy.Column('path', sqlalchemy.String(LARGE_COLUMN_SIZE)),
-            sqlalchemy.Column('name', sqlalchemy.String(GENERAL_COLUMN_SIZE))
+            sqlalchemy.Column('name', sqlalchemy.String(GENERAL_COLUMN_SIZE)),
+            # Limit indexed length of path in MySQL, as the full column
+            # exceeds the maximum index key length
+            sqlalchemy.Index(
+                'ix_submodule_parent_module_version_path_type',
+                'parent_module_version', 'path', 'type',
+                mysql_length={'path': 255}
+            )
         )
 
         self._analytics = sqlalchemy.Table(
@@ -284,6 +470,125 @@ class Database():
             sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE))
         )
 
+        # Total downloads of each module version, maintained
+        # alongside the analytics table.
+        # As with the analytics table, there is no foreign key
+        # to module_version, as the counts are migrated to new
+        # module versions when a module version is re-imported.
+        self._module_version_download_count = sqlalchemy.Table(
+            'module_version_download_count', meta,
+            sqlalchemy.Column('parent_module_version', sqlalchemy.Integer, primary_key=True, autoincrement=False),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False)
+        )
+
+        # Daily download counts, aggregated from the analytics table.
+        # Rows are unique per module version, day, environment, analytics token
+        # and whether an auth token was provided.
+        # Empty environments and analytics tokens are stored as empty strings,
+        # as NULL values are not considered equal by the unique index.
+        self._analytics_daily_rollup = sqlalchemy.Table(
+            'analytics_daily_rollup', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('module_provider_id', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Column('module_version_id', sqlalchemy.Integer, index=True, nullable=False),
+            sqlalchemy.Column('day', sqlalchemy.Date, index=True, nullable=False),
+            sqlalchemy.Column('environment', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('analytics_token', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Column('auth_token_provided', sqlalchemy.Boolean, nullable=False),
+            sqlalchemy.Column('download_count', sqlalchemy.Integer, nullable=False),
+            sqlalchemy.Index('ix_analytics_daily_rollup_module_provider_id_day', 'module_provider_id', 'day'),
+            sqlalchemy.Index(
+                'ix_analytics_daily_rollup_rollup_key',
+                'module_version_id', 'day', 'environment', 'analytics_token', 'auth_token_provided',
+                unique=True
+            )
+        )
+
+        # Search tokens of the latest version of each module provider,
+        # used to find candidate module providers for search queries.
+        # See terrareg.module_search.ModuleSearchIndex.
+        self._module_search_token = sqlalchemy.Table(
+            'module_search_token', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_module_search_token_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                index=True,
+                nullable=False
+            ),
+            sqlalchemy.Column('token', sqlalchemy.String(SEARCH_TOKEN_COLUMN_SIZE), nullable=False),
+            sqlalchemy.Index('ix_module_search_token_token_module_provider_id', 'token', 'module_provider_id')
+        )
+
+        # Revision of module catalog, containing a single row, used to invalidate
+        # cached search results in all server processes.
+        # See terrareg.module_search.ModuleSearch.get_catalog_revision.
+        self._catalog_revision = sqlalchemy.Table(
+            'catalog_revision', meta,
+            sqlalchemy.Column('id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('revision', sqlalchemy.Integer, nullable=False)
+        )
+
+        # Pre-generated registry versions API response for module provider
+        self._versions_document = sqlalchemy.Table(
+            'versions_document', meta,
+            sqlalchemy.Column(
+                'module_provider_id',
+                sqlalchemy.ForeignKey(
+                    'module_provider.id',
+                    name='fk_versions_document_module_provider_id_module_provider_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                primary_key=True,
+                nullable=False
+            ),
+            sqlalchemy.Column('document', Database.medium_blob(), nullable=False)
+        )
+
+        # Pre-generated terrareg API details of module version, excluding download counts.
+        # The revision of the module provider that the document was generated for is
+        # stored, so that the document can be regenerated after changes to the module provider
+        self._details_document = sqlalchemy.Table(
+            'details_document', meta,
+            sqlalchemy.Column(
+                'module_version_id',
+                sqlalchemy.ForeignKey(
+                    'module_version.id',
+                    name='fk_details_document_module_version_id_module_version_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                primary_key=True,
+                nullable=False
+            ),
+            sqlalchemy.Column('revision', sqlalchemy.Integer, nullable=False),
+            # Fingerprint of configuration used to generate document
+            sqlalchemy.Column('config_fingerprint', sqlalchemy.String(64)),
+            sqlalchemy.Column('document', Database.medium_blob(), nullable=False)
+        )
+
+        # Rendered HTML of README of module details, for each server hostname used in the README
+        self._readme_html = sqlalchemy.Table(
+            'readme_html', meta,
+            sqlalchemy.Column(
+                'module_details_id',
+                sqlalchemy.ForeignKey(
+                    'module_details.id',
+                    name='fk_readme_html_module_details_id_module_details_id',
+                    onupdate='CASCADE',
+                    ondelete='CASCADE'),
+                primary_key=True,
+                nullable=False
+            ),
+            sqlalchemy.Column('server_hostname', sqlalchemy.String(HOSTNAME_COLUMN_SIZE), primary_key=True, nullable=False),
+            # Fingerprint of configuration used to render HTML
+            sqlalchemy.Column('config_fingerprint', sqlalchemy.String(64)),
+            sqlalchemy.Column('html', Database.medium_blob(), nullable=False)
+        )
+
         self._example_file = sqlalchemy.Table(
             'example_file', meta,
             sqlalchemy.Column('id', sqlalchemy.Integer, primary_key = True),
@@ -297,7 +602,15 @@ class Database():
                 nullable=False
             ),
             sqlalchemy.Column('path', sqlalchemy.String(GENERAL_COLUMN_SIZE), nullable=False),
-            sqlalchemy.Column('content', Database.medium_blob())
+            sqlalchemy.Column(
+                'content_blob_id',
+                sqlalchemy.ForeignKey(
+                    'blob.id',
+                    name='fk_example_file_content_blob_id_blob_id',
+                    onupdate='CASCADE'),
+                nullable=True
+            ),
+            sqlalchemy.Index('ix_example_file_submodule_id_path', 'submodule_id', 'path')
         )
 
     def select_module_version_joined_module_provider(self, *select_args):
@@ -331,6 +644,26 @@ class Database():
 
         return None
 
+    @classmethod
+    def run_after_commit(cls, callback):
+        """
+        Call callback once the current transaction has been committed.
+
+        If there is no current transaction, the callback is called immediately.
+        Callbacks are discarded if the transaction is rolled back.
+        A callback that is already registered for the transaction is not registered again.
+        """
+        if has_request_context():
+            commit_callbacks = flask.g.get('database_transaction_commit_callbacks', None)
+        else:
+            commit_callbacks = cls.get().transaction_commit_callbacks
+
+        if cls.get_current_transaction() is None or commit_callbacks is None:
+            callback()
+        # Only call callbacks once for each transaction
+        elif callback not in commit_callbacks:
+            commit_callbacks.append(callback)
+
     @classmethod
     def start_transaction(cls):
         """Start DB transaction, store in current context and return"""
@@ -340,6 +673,64 @@ class Database():
         conn = Database.get().get_connection()
         return Transaction(conn)
 
+    def get_blob_columns(self):
+        """Return dict of tables and columns that contain encoded blob values."""
+        return {
+            self.blob: [self.blob.c.content],
+            self.module_version: [self.module_version.c.variable_template],
+            self.versions_document: [self.versions_document.c.document],
+            self.details_document: [self.details_document.c.document],
+            self.readme_html: [self.readme_html.c.html]
+        }
+
+    def recompress_blobs(self, batch_size=1000):
+        """
+        Re-encode existing blob values that are not compressed, returning the number of re-encoded values.
+
+        Rows of each table are processed in batches, ordered by primary key,
+        to avoid long-running locks.
+        """
+        recompressed_count = 0
+        for table, columns in self.get_blob_columns().items():
+            # Tables may have composite primary keys (e.g. readme_html)
+            primary_key_columns = list(table.primary_key.columns)
+            primary_key = sqlalchemy.tuple_(*primary_key_columns)
+            last_primary_key = None
+            while True:
+                select = sqlalchemy.select(
+                    *primary_key_columns, *columns
+                ).order_by(
+                    *[primary_key_column.asc() for primary_key_column in primary_key_columns]
+                ).limit(batch_size)
+                if last_primary_key is not None:
+                    select = select.where(primary_key > sqlalchemy.tuple_(*last_primary_key))
+
+                with self.get_connection() as conn:
+                    rows = conn.execute(select).fetchall()
+
+                    for row in rows:
+                        values = {}
+                        for column in columns:
+                            value = row[column]
+                            if value is None or self.is_compressed_blob(value):
+                                continue
+                            encoded_value = self.encode_blob(self.decode_blob(value))
+                            if encoded_value != value:
+                                values[column.name] = encoded_value
+
+                        if values:
+                            conn.execute(table.update().where(*[
+                                primary_key_column == row[primary_key_column]
+                                for primary_key_column in primary_key_columns
+                            ]).values(**values))
+                            recompressed_count += len(values)
+
+                if len(rows) < batch_size:
+                    break
+                last_primary_key = [rows[-1][primary_key_column] for primary_key_column in primary_key_columns]
+
+        return recompressed_count
+
     @classmethod
     def get_connection(cls):
         """Get connection, checking for transaction and returning it."""
@@ -385,7 +776,8 @@ class Transaction:
         """Store database connection."""
         self._connection = connection
         self._transaction_outer = None
-    
+        self._commit_callbacks = []
+
     def __enter__(self):
         """Start transaction and store in current context."""
         self._transaction_outer = self._connection.begin()
@@ -396,17 +788,29 @@ class Transaction:
         # returned by any get_connection methods
         if has_request_context():
             flask.g.database_transaction_connection = self._connection
+            flask.g.database_transaction_commit_callbacks = self._commit_callbacks
         else:
             Database.get().transaction = self._connection
+            Database.get().transaction_commit_callbacks = self._commit_callbacks
 
         return self
 
-    def __exit__(self, *args, **kwargs):
+    def __exit__(self, exc_type, *args, **kwargs):
         """End transaction and remove from current context."""
         if has_request_context():
             flask.g.database_transaction_connection = None
+            flask.g.database_transaction_commit_callbacks = None
         else:
             Database.get().transaction = None
+            Database.get().transaction_commit_callbacks = None
+
+        # Transaction is committed on exit if it has not been
+        # rolled back and no exception has been raised
+        committed = exc_type is None and self._transaction_outer.is_active
+
+        self._transaction_outer.__exit__(exc_type, *args, **kwargs)
 
-        self._transaction_outer.__exit__(*args, **kwargs)
+        if committed:
+            for callback in self._commit_callbacks:
+                callback()
 
@@ -160,3 +160,9 @@ class InvalidBooleanConfigurationError(TerraregError):
     """Invalid boolean environment variable."""
 
     pass
+
+
+class InvalidSearchCursorError(TerraregError):
+    """Pagination cursor could not be decoded."""
+
+    pass
@@ -0,0 +1,110 @@
+"""Provide request-scoped identity map for model objects."""
+
+import contextlib
+import threading
+
+from flask import has_request_context
+import flask
+
+
+class IdentityMap:
+    """
+    Store model objects and database rows, keyed by natural key.
+
+    Whilst in a request context, the identity map is stored in
+    flask.g, so is discarded at the end of the request.
+    Outside of a request context (e.g. CLI commands or workers),
+    an identity map is only available whilst inside
+    IdentityMap.context(), which is local to the calling thread.
+    Otherwise, all lookups fall through to the database.
+    """
+
+    _CONTEXT = threading.local()
+
+    @classmethod
+    def get_current(cls):
+        """Return identity map for current context, if available."""
+        if has_request_context():
+            if flask.g.get('identity_map', None) is None:
+                flask.g.identity_map = cls()
+            return flask.g.identity_map
+
+        return getattr(cls._CONTEXT, 'instance', None)
+
+    @classmethod
+    @contextlib.contextmanager
+    def context(cls):
+        """Provide identity map for use outside of a request context in the current thread."""
+        previous_instance = getattr(cls._CONTEXT, 'instance', None)
+        cls._CONTEXT.instance = cls()
+        try:
+            yield cls._CONTEXT.instance
+        finally:
+            cls._CONTEXT.instance = previous_instance
+
+    @classmethod
+    def get_row(cls, key, load_row):
+        """
+        Return database row for key.
+
+        If the row is not present in the identity map, load_row
+        is called to obtain it from the database.
+        Rows that do not exist are not cached.
+        """
+        identity_map = cls.get_current()
+        if identity_map is None:
+            return load_row()
+
+        if key not in identity_map._rows:
+            row = load_row()
+            if row is None:
+                return None
+            identity_map._rows[key] = row
+
+        return identity_map._rows[key]
+
+    @classmethod
+    def add_row(cls, key, row):
+        """Store database row for key, if an identity map is available."""
+        identity_map = cls.get_current()
+        if identity_map is not None:
+            identity_map._rows[key] = row
+
+    @classmethod
+    def get_object(cls, obj):
+        """
+        Return object from identity map with the same natural key as the given object.
+
+        If an object does not exist, the given object is added
+        to the identity map and returned.
+        """
+        identity_map = cls.get_current()
+        if identity_map is None:
+            return obj
+
+        # Key objects by class, to avoid returning an
+        # object of a different type with the same natural key
+        object_key = (type(obj), obj._identity_key)
+        if object_key not in identity_map._objects:
+            identity_map._objects[object_key] = obj
+
+        return identity_map._objects[object_key]
+
+    @classmethod
+    def evict(cls, key):
+        """Remove row and objects for key from identity map."""
+        identity_map = cls.get_current()
+        if identity_map is None:
+            return
+
+        identity_map._rows.pop(key, None)
+        for object_key in [
+                object_key
+                for object_key in identity_map._objects
+                if object_key[1] == key]:
+            del identity_map._objects[object_key]
+
+    def __init__(self):
+        """Setup member variables."""
+        self._rows = {}
+        self._objects = {}
@@ -1,8 +1,8 @@
 
 import datetime
+import hashlib
 from importlib.util import module_for_loader
 import os
-from distutils.version import LooseVersion
 import json
 import re
 import secrets
@@ -13,6 +13,9 @@ import markdown
 
 import terrareg.analytics
 from terrareg.database import Database
+import terrareg.module_search
+import terrareg.trigram_search
+from terrareg.identity_map import IdentityMap
 import terrareg.config
 from terrareg.errors import (
     InvalidModuleNameError, InvalidModuleProviderNameError,
@@ -135,7 +138,19 @@ class GitProvider:
 
             # Check if git provider exists in DB
             existing_git_provider = GitProvider.get_by_name(name=git_provider_config['name'])
+            refresh_source_download_urls = False
+            templates_modified = False
             if existing_git_provider:
+                # Source download URLs of module versions using the git provider
+                # must be re-generated if the clone URL has changed
+                refresh_source_download_urls = (
+                    existing_git_provider.clone_url_template != git_provider_config['clone_url']
+                )
+                templates_modified = (
+                    refresh_source_download_urls or
+                    existing_git_provider.base_url_template != git_provider_config['base_url'] or
+                    existing_git_provider.browse_url_template != git_provider_config['browse_url']
+                )
                 # Update existing row
                 upsert = db.git_provider.update().where(
                     db.git_provider.c.id == existing_git_provider.pk
@@ -154,6 +169,12 @@ class GitProvider:
             with db.get_connection() as conn:
                 conn.execute(upsert)
 
+            if refresh_source_download_urls:
+                ModuleProvider.refresh_all_source_download_urls(git_provider=existing_git_provider)
+            elif templates_modified:
+                # Invalidate API responses of module providers containing URLs of the git provider
+                ModuleProvider.increment_all_revisions(git_provider=existing_git_provider)
+
     @classmethod
     def get_by_name(cls, name):
         """Return instance of git provider by name."""
@@ -237,7 +258,7 @@ class GitProvider:
             )
             with db.get_connection() as conn:
                 res = conn.execute(select)
-                return res.fetchone()
+                self._row_cache = res.fetchone()
         return self._row_cache
 
 
@@ -391,6 +412,47 @@ class Namespace(object):
             for module in modules
         ]
 
+    def get_module_providers(self, offset: int, limit: int, cursor_values: tuple=None):
+        """
+        Return page of module providers in namespace, ordered by module and provider.
+
+        If cursor values are provided, only module providers ordered after
+        the cursor's module and provider are returned.
+        An additional module provider is obtained beyond the limit, to allow
+        the caller to determine whether further pages are available.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        ).select_from(db.module_provider).where(
+            db.module_provider.c.namespace == self.name
+        )
+        if cursor_values:
+            select = select.where(terrareg.module_search.ModuleSearch.get_cursor_filter(
+                db.module_provider.c.namespace,
+                db.module_provider.c.module,
+                db.module_provider.c.provider,
+                cursor_values
+            ))
+        select = select.order_by(
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        ).limit(limit + 1).offset(offset)
+
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        modules = {}
+        module_providers = []
+        for row in rows:
+            if row['module'] not in modules:
+                modules[row['module']] = Module(namespace=self, name=row['module'])
+            module_providers.append(IdentityMap.get_object(
+                ModuleProvider(module=modules[row['module']], name=row['provider'])
+            ))
+        return module_providers
+
     def create_data_directory(self):
         """Create data directory and data directories of parents."""
         # Check if data directory exists
@@ -451,6 +513,23 @@ class Module(object):
             for provider in providers
         ]
 
+    def increment_module_provider_revisions(self):
+        """
+        Increment revision of all providers of module.
+
+        Used when providers are added or removed, as API responses
+        for each module provider contain the providers of the module.
+        """
+        db = Database.get()
+        update = db.module_provider.update().where(
+            db.module_provider.c.namespace == self._namespace.name,
+            db.module_provider.c.module == self.name
+        ).values(
+            revision=(db.module_provider.c.revision + 1)
+        )
+        with db.get_connection() as conn:
+            conn.execute(update)
+
     def create_data_directory(self):
         """Create data directory and data directories of parents."""
         # Check if parent exists
@@ -461,9 +540,102 @@ class Module(object):
             os.mkdir(self.base_directory)
 
 
+class Blob:
+    """
+    Content-addressed blob value, shared by all module details and example files with identical content.
+
+    Blobs are reference counted and removed once they are no longer referenced.
+    """
+
+    @staticmethod
+    def get_hash(value):
+        """Return hash of blob content."""
+        return hashlib.sha256((value or '').encode(Database.blob_encoding_format)).hexdigest()
+
+    @classmethod
+    def create(cls, value):
+        """
+        Add reference to blob with value, returning ID of the blob.
+
+        If a blob with identical content already exists, it is re-used.
+        No blob is created for a value of None, returning None.
+        """
+        if value is None:
+            return None
+
+        content_hash = cls.get_hash(value)
+        db = Database.get()
+        with db.get_connection() as conn:
+            insert_res = Database.execute_upsert(
+                conn,
+                db.blob.update().where(
+                    db.blob.c.hash == content_hash
+                ).values(
+                    reference_count=(db.blob.c.reference_count + 1)
+                ),
+                db.blob.insert().values(
+                    hash=content_hash,
+                    reference_count=1,
+                    content=Database.encode_blob(value)
+                )
+            )
+            if insert_res is not None:
+                return insert_res.inserted_primary_key[0]
+
+            return conn.execute(sqlalchemy.select(
+                db.blob.c.id
+            ).where(
+                db.blob.c.hash == content_hash
+            )).scalar()
+
+    @staticmethod
+    def release(blob_id):
+        """Remove reference to blob, removing the blob if it is no longer referenced."""
+        if blob_id is None:
+            return
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.blob.update().where(
+                db.blob.c.id == blob_id
+            ).values(
+                reference_count=(db.blob.c.reference_count - 1)
+            ))
+            conn.execute(db.blob.delete().where(
+                db.blob.c.id == blob_id,
+                db.blob.c.reference_count <= 0
+            ))
+
+    @staticmethod
+    def get_blob_id_column(table, column):
+        """Return column of table containing ID of blob for value of column."""
+        return table.c['{0}_blob_id'.format(column)]
+
+
 class ModuleDetails:
     """Object to store common details between root module, submodules and examples."""
 
+    # Blob columns of module details, which are each obtained on first use
+    BLOB_COLUMNS = ['readme_content', 'terraform_docs', 'tfsec', 'infracost']
+    # Severities of tfsec checks
+    TFSEC_SEVERITIES = ['critical', 'high', 'medium', 'low']
+    # Columns containing number of failed tfsec checks for each severity
+    TFSEC_FAILURE_COUNT_COLUMNS = ['tfsec_{0}_count'.format(severity) for severity in TFSEC_SEVERITIES]
+
+    @classmethod
+    def get_tfsec_failure_counts(cls, tfsec):
+        """Return dict of failed check count column values from tfsec output."""
+        counts = {column: 0 for column in cls.TFSEC_FAILURE_COUNT_COLUMNS}
+        for result in (tfsec or {}).get('results', None) or []:
+            # TFsec status of 0 is a fail
+            if result.get('status') == 0:
+                severity = str(result.get('severity', '')).lower()
+                # Count any unrecognised severity as low
+                if severity not in cls.TFSEC_SEVERITIES:
+                    severity = 'low'
+                counts['tfsec_{0}_count'.format(severity)] += 1
+        return counts
+
     @classmethod
     def create(cls):
         """Create instance of object in database."""
@@ -483,54 +655,121 @@ class ModuleDetails:
     @property
     def terraform_docs(self):
         """Return terraform_docs column"""
-        if self._get_db_row():
-            return self._get_db_row()['terraform_docs']
-        return None
+        return self._get_column('terraform_docs')
 
     @property
     def readme_content(self):
         """Return readme_content column"""
-        if self._get_db_row():
-            return self._get_db_row()['readme_content']
-        return None
+        return self._get_column('readme_content')
 
     @property
     def tfsec(self):
         """Return tfsec data."""
         # If module scanning is disabled, do not return the tfsec output
-        if (terrareg.config.Config().ENABLE_SECURITY_SCANNING and
-                self._get_db_row() is not None and
-                self._get_db_row()['tfsec']):
-            return json.loads(self._get_db_row()['tfsec'])
+        if terrareg.config.Config().ENABLE_SECURITY_SCANNING:
+            tfsec = Database.decode_blob(self._get_column('tfsec'))
+            if tfsec:
+                return json.loads(tfsec)
         return {'results': None}
 
+    @property
+    def tfsec_failure_counts(self):
+        """Return dict of number of failed tfsec checks for each severity."""
+        # If module scanning is disabled, do not return any failures
+        if not terrareg.config.Config().ENABLE_SECURITY_SCANNING:
+            return {severity: 0 for severity in self.TFSEC_SEVERITIES}
+
+        # Obtain counts for all severities in a single query
+        self._columns += [column for column in self.TFSEC_FAILURE_COUNT_COLUMNS if column not in self._columns]
+        return {
+            severity: self._get_column(column) or 0
+            for severity, column in zip(self.TFSEC_SEVERITIES, self.TFSEC_FAILURE_COUNT_COLUMNS)
+        }
+
     @property
     def infracost(self):
         """Return infracost data."""
-        db_row = self._get_db_row()
-        if (db_row is not None and
-                db_row['infracost']):
-            return json.loads(db_row['infracost'])
+        infracost = Database.decode_blob(self._get_column('infracost'))
+        if infracost:
+            return json.loads(infracost)
         return {}
 
-    def __init__(self, id: int):
-        """Store member variables."""
+    def __init__(self, id: int, columns=None):
+        """
+        Store member variables.
+
+        Blob columns that are known to be required can be provided,
+        which are obtained in a single query when any column is first used.
+        """
         self._id = id
-        self._cache_db_row = None
+        self._columns = list(columns) if columns else []
+        self._cache_columns = {}
 
-    def _get_db_row(self):
-        """Return database row for module details."""
-        if self._cache_db_row is None:
-            db = Database.get()
-            select = db.module_details.select(
-            ).where(
-                db.module_details.c.id == self.pk
-            )
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                self._cache_db_row = res.fetchone()
+    @property
+    def _identity_key(self):
+        """Return key for object in identity map."""
+        return ('module_details', self.pk)
 
-        return self._cache_db_row
+    def _get_column_identity_key(self, column):
+        """Return key for value of column in identity map."""
+        return self._identity_key + (column,)
+
+    def _select_columns(self, columns):
+        """Obtain dict of values of columns from database row for module details."""
+        db = Database.get()
+        select_columns = []
+        from_clause = db.module_details
+        for column in columns:
+            if column in self.BLOB_COLUMNS:
+                # Obtain blob values from blob table
+                blob = db.blob.alias('{0}_blob'.format(column))
+                from_clause = from_clause.outerjoin(
+                    blob,
+                    blob.c.id == Blob.get_blob_id_column(db.module_details, column)
+                )
+                select_columns.append(blob.c.content.label(column))
+            else:
+                select_columns.append(db.module_details.c[column])
+
+        select = sqlalchemy.select(
+            *select_columns
+        ).select_from(
+            from_clause
+        ).where(
+            db.module_details.c.id == self.pk
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            row = res.fetchone()
+        return dict(row) if row is not None else None
+
+    def load_columns(self):
+        """Obtain all required columns that have not yet been obtained, in a single query."""
+        if [column for column in self._columns if column not in self._cache_columns]:
+            self._load_columns()
+
+    def _load_columns(self):
+        """Obtain required columns that have not yet been obtained and return the row of obtained values."""
+        columns = [column for column in self._columns if column not in self._cache_columns]
+        row = self._select_columns(columns)
+        if row is not None:
+            for column in columns:
+                self._cache_columns[column] = row[column]
+                IdentityMap.add_row(self._get_column_identity_key(column), row)
+        return row
+
+    def _get_column(self, column):
+        """Return value of column, obtaining it along with any other required columns on first use."""
+        if column not in self._cache_columns:
+            if column not in self._columns:
+                self._columns.append(column)
+
+            row = IdentityMap.get_row(self._get_column_identity_key(column), self._load_columns)
+            if row is None:
+                return None
+            self._cache_columns[column] = row[column]
+
+        return self._cache_columns[column]
 
     def get_db_where(self, db: Database, statement):
         """Return DB where statement"""
@@ -540,26 +779,121 @@ class ModuleDetails:
 
     def update_attributes(self, **kwargs):
         """Update DB row."""
-        # Check for any blob and encode the values
-        for kwarg in kwargs:
-            if kwarg in ['readme_content', 'terraform_docs', 'tfsec', 'infracost']:
-                kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
+        # Calculate failed check counts from tfsec output, if not provided
+        if 'tfsec' in kwargs and not [column for column in self.TFSEC_FAILURE_COUNT_COLUMNS if column in kwargs]:
+            kwargs.update(self.get_tfsec_failure_counts(json.loads(kwargs['tfsec']) if kwargs['tfsec'] else None))
 
         db = Database.get()
+
+        # Store blob values in blob table, replacing previously referenced blobs
+        blob_columns = [kwarg for kwarg in kwargs if kwarg in self.BLOB_COLUMNS]
+        previous_blob_ids = self._get_blob_ids(blob_columns)
+        for column in blob_columns:
+            kwargs[Blob.get_blob_id_column(db.module_details, column).name] = Blob.create(kwargs.pop(column))
+
         update = self.get_db_where(
             db=db, statement=db.module_details.update()
         ).values(**kwargs)
         with db.get_connection() as conn:
             conn.execute(update)
 
-        # Remove cached DB row
-        self._cache_db_row = None
+        for blob_id in previous_blob_ids:
+            Blob.release(blob_id)
+
+        # Remove rendered README HTML, which may be outdated
+        self._delete_readme_html()
+
+        # Remove cached column values
+        self._evict_columns()
+
+    def _get_blob_ids(self, columns):
+        """Return IDs of blobs referenced by blob columns."""
+        if not columns:
+            return []
+
+        db = Database.get()
+        select = sqlalchemy.select(
+            *[Blob.get_blob_id_column(db.module_details, column) for column in columns]
+        ).where(
+            db.module_details.c.id == self.pk
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        return list(row) if row is not None else []
+
+    def get_readme_html(self, server_hostname):
+        """
+        Return stored rendered HTML of README for server hostname.
+
+        Returns None if HTML has not been rendered for the server hostname
+        using the current configuration.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.readme_html.c.html
+        ).where(
+            db.readme_html.c.module_details_id == self.pk,
+            db.readme_html.c.server_hostname == server_hostname,
+            db.readme_html.c.config_fingerprint == self.get_readme_html_config_fingerprint()
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        return Database.decode_blob(row['html']) if row is not None else None
+
+    def update_readme_html(self, server_hostname, readme_html):
+        """Store rendered HTML of README for server hostname."""
+        db = Database.get()
+        # Do not store HTML for hostnames that are too long for the database column
+        if len(server_hostname) > db.readme_html.c.server_hostname.type.length:
+            return
+
+        encoded_html = Database.encode_blob(readme_html)
+        config_fingerprint = self.get_readme_html_config_fingerprint()
+        with db.get_connection() as conn:
+            Database.execute_upsert(
+                conn,
+                db.readme_html.update().where(
+                    db.readme_html.c.module_details_id == self.pk,
+                    db.readme_html.c.server_hostname == server_hostname
+                ).values(config_fingerprint=config_fingerprint, html=encoded_html),
+                db.readme_html.insert().values(
+                    module_details_id=self.pk,
+                    server_hostname=server_hostname,
+                    config_fingerprint=config_fingerprint,
+                    html=encoded_html
+                )
+            )
+
+    @staticmethod
+    def get_readme_html_config_fingerprint():
+        """Return fingerprint of configuration used to render README HTML."""
+        return terrareg.config.Config().get_fingerprint(['TERRAFORM_EXAMPLE_VERSION_TEMPLATE'])
+
+    def _delete_readme_html(self):
+        """Remove all stored rendered HTML of README."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.readme_html.delete().where(
+                db.readme_html.c.module_details_id == self.pk
+            ))
+
+    def _evict_columns(self):
+        """Remove cached values of all columns."""
+        self._cache_columns = {}
+        for column in self.BLOB_COLUMNS + self.TFSEC_FAILURE_COUNT_COLUMNS:
+            IdentityMap.evict(self._get_column_identity_key(column))
 
     def delete(self):
         """Delete from database."""
         assert self.pk is not None
         db = Database.get()
 
+        blob_ids = self._get_blob_ids(self.BLOB_COLUMNS)
+
+        self._delete_readme_html()
+
         with db.get_connection() as conn:
             # Delete module details from module_details table
             delete_statement = db.module_details.delete().where(
@@ -567,6 +901,12 @@ class ModuleDetails:
             )
             conn.execute(delete_statement)
 
+        # Remove references to blobs of module details
+        for blob_id in blob_ids:
+            Blob.release(blob_id)
+
+        self._evict_columns()
+
 
 class ProviderLogo:
 
@@ -707,12 +1047,14 @@ class ModuleProvider(object):
         with db.get_connection() as conn:
             conn.execute(module_provider_insert)
 
+        module.increment_module_provider_revisions()
+
         return cls(module=module, name=name)
 
     @classmethod
     def get(cls, module, name, create=False):
         """Create object and ensure the object exists."""
-        obj = cls(module=module, name=name)
+        obj = IdentityMap.get_object(cls(module=module, name=name))
 
         # If there is no row, the module provider does not exist
         if obj._get_db_row() is None:
@@ -855,6 +1197,8 @@ class ModuleProvider(object):
         self._module = module
         self._name = name
         self._cache_db_row = None
+        self._cache_latest_version = None
+        self._cache_git_provider = None
 
     def get_db_where(self, db, statement):
         """Filter DB query by where for current object."""
@@ -864,19 +1208,28 @@ class ModuleProvider(object):
             db.module_provider.c.provider == self.name
         )
 
+    @property
+    def _identity_key(self):
+        """Return key for object in identity map."""
+        return ('module_provider', self._module._namespace.name, self._module.name, self.name)
+
+    def _select_db_row(self):
+        """Obtain database row for module provider."""
+        db = Database.get()
+        select = db.module_provider.select(
+        ).where(
+            db.module_provider.c.namespace == self._module._namespace.name,
+            db.module_provider.c.module == self._module.name,
+            db.module_provider.c.provider == self.name
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            return res.fetchone()
+
     def _get_db_row(self):
         """Return database row for module provider."""
         if self._cache_db_row is None:
-            db = Database.get()
-            select = db.module_provider.select(
-            ).where(
-                db.module_provider.c.namespace == self._module._namespace.name,
-                db.module_provider.c.module == self._module.name,
-                db.module_provider.c.provider == self.name
-            )
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                self._cache_db_row = res.fetchone()
+            self._cache_db_row = IdentityMap.get_row(self._identity_key, self._select_db_row)
 
         return self._cache_db_row
 
@@ -886,19 +1239,37 @@ class ModuleProvider(object):
         for module_version in self.get_versions(include_beta=True, include_unpublished=True):
             module_version.delete()
 
+        terrareg.module_search.ModuleSearchIndex.delete_module_provider(self)
+        terrareg.trigram_search.TrigramSearchIndex.delete_module_provider(self)
+
         db = Database.get()
 
         with db.get_connection() as conn:
+            # Delete versions document of module provider
+            conn.execute(db.versions_document.delete().where(
+                db.versions_document.c.module_provider_id == self.pk
+            ))
+
             # Delete module from module_version table
             delete_statement = db.module_provider.delete().where(
                 db.module_provider.c.id == self.pk
             )
             conn.execute(delete_statement)
 
+        self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
+
+        self._module.increment_module_provider_revisions()
+
+        # Invalidate cached search results
+        terrareg.module_search.ModuleSearch.bump_catalog_revision()
+
     def get_git_provider(self):
         """Return the git provider associated with this module provider."""
         if self._get_db_row()['git_provider_id']:
-            return GitProvider.get(id=self._get_db_row()['git_provider_id'])
+            if self._cache_git_provider is None:
+                self._cache_git_provider = GitProvider.get(id=self._get_db_row()['git_provider_id'])
+            return self._cache_git_provider
         return None
 
     def get_git_clone_url(self):
@@ -931,12 +1302,158 @@ class ModuleProvider(object):
         db = Database.get()
         update = self.get_db_where(
             db=db, statement=db.module_provider.update()
-        ).values(**kwargs)
+        ).values(
+            revision=(db.module_provider.c.revision + 1),
+            **kwargs
+        )
+        with db.get_connection() as conn:
+            conn.execute(update)
+
+        # Remove cached DB row and related objects
+        self._cache_db_row = None
+        self._cache_latest_version = None
+        self._cache_git_provider = None
+        IdentityMap.evict(self._identity_key)
+
+        # Update search tokens when latest version changes
+        if 'latest_version_id' in kwargs:
+            terrareg.module_search.ModuleSearchIndex.update_module_provider(self)
+        # Update in-memory search index if attributes used by search have been modified
+        if 'latest_version_id' in kwargs or 'verified' in kwargs:
+            terrareg.trigram_search.TrigramSearchIndex.update_module_provider(self)
+
+        # Re-generate source download URLs of module versions if git settings have changed
+        if [kwarg for kwarg in ['git_provider_id', 'repo_clone_url_template', 'git_tag_format', 'git_path'] if kwarg in kwargs]:
+            self.update_source_download_urls()
+
+        # Invalidate cached search results
+        terrareg.module_search.ModuleSearch.bump_catalog_revision()
+
+    def update_source_download_urls(self):
+        """Re-generate stored source download URLs of all module versions."""
+        for module_version in self.get_versions(include_beta=True, include_unpublished=True):
+            module_version.update_source_download_url()
+
+    @classmethod
+    def refresh_all_source_download_urls(cls, git_provider=None):
+        """
+        Re-generate stored source download URLs of module versions of all module providers.
+
+        If a git provider is provided, only module providers using the git provider are updated.
+        Returns number of module providers updated.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider
+        ).select_from(
+            db.module_provider
+        )
+        if git_provider is not None:
+            select = select.where(
+                db.module_provider.c.git_provider_id == git_provider.pk
+            )
+        with db.get_connection() as conn:
+            rows = conn.execute(select).fetchall()
+
+        for row in rows:
+            namespace = Namespace(name=row['namespace'])
+            module = Module(namespace=namespace, name=row['module'])
+            cls(module=module, name=row['provider']).update_source_download_urls()
+
+        # Invalidate API responses containing the source download URLs
+        cls.increment_all_revisions(git_provider=git_provider)
+        terrareg.module_search.ModuleSearch.bump_catalog_revision()
+
+        return len(rows)
+
+    @staticmethod
+    def increment_all_revisions(git_provider=None):
+        """
+        Increment revision of all module providers.
+
+        If a git provider is provided, only module providers using the git provider are updated.
+        """
+        db = Database.get()
+        update = db.module_provider.update().values(
+            revision=(db.module_provider.c.revision + 1)
+        )
+        if git_provider is not None:
+            update = update.where(
+                db.module_provider.c.git_provider_id == git_provider.pk
+            )
+        with db.get_connection() as conn:
+            conn.execute(update)
+
+    @staticmethod
+    def get_api_revision(namespace, module, provider, version=None, include_downloads=False):
+        """
+        Return list of values identifying the current state of API responses for module provider,
+        obtained in a single query without loading model objects.
+
+        Contains the revision of the module provider and, if include_downloads is set,
+        the total downloads of the given version (or the latest version, if a version is not provided).
+        Returns None if the module provider does not exist.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider.c.revision
+        ).select_from(
+            db.module_provider
+        ).where(
+            db.module_provider.c.namespace == namespace,
+            db.module_provider.c.module == module,
+            db.module_provider.c.provider == provider
+        )
+
+        if include_downloads:
+            select = select.add_columns(
+                db.module_version_download_count.c.download_count
+            ).outerjoin(
+                db.module_version,
+                sqlalchemy.and_(
+                    db.module_version.c.module_provider_id == db.module_provider.c.id,
+                    (db.module_version.c.version == version)
+                    if version is not None else
+                    (db.module_version.c.id == db.module_provider.c.latest_version_id)
+                )
+            ).outerjoin(
+                db.module_version_download_count,
+                db.module_version_download_count.c.parent_module_version == db.module_version.c.id
+            )
+
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row is None:
+            return None
+
+        api_revision = [row['revision']]
+        if include_downloads:
+            api_revision.append(row['download_count'] or 0)
+        return api_revision
+
+    def increment_revision(self):
+        """
+        Increment revision of module provider.
+
+        Must be called when any data returned by API endpoints
+        for the module provider, its versions, submodules or examples is modified,
+        to invalidate ETags of previous responses.
+        """
+        db = Database.get()
+        update = self.get_db_where(
+            db=db, statement=db.module_provider.update()
+        ).values(
+            revision=(db.module_provider.c.revision + 1)
+        )
         with db.get_connection() as conn:
             conn.execute(update)
 
         # Remove cached DB row
         self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
 
     def update_git_provider(self, git_provider: GitProvider):
         """Update git provider associated with module provider."""
@@ -1077,6 +1594,9 @@ class ModuleProvider(object):
 
     def get_latest_version(self):
         """Return latest published version of module."""
+        if self._cache_latest_version is not None:
+            return self._cache_latest_version
+
         db = Database.get()
         select = sqlalchemy.select(db.module_version.c.version).select_from(db.module_provider).join(
             db.module_version,
@@ -1094,7 +1614,7 @@ class ModuleProvider(object):
         return ModuleVersion(module_provider=self, version=version['version'])
 
     def calculate_latest_version(self):
-        """Obtain all versions of module and sort by semantec version numbers to obtain latest version."""
+        """Obtain latest published, non-beta version of module, ordering by semantic version in database."""
         db = Database.get()
         select = db.select_module_version_joined_module_provider(
             db.module_version.c.version
@@ -1104,22 +1624,18 @@ class ModuleProvider(object):
             db.module_provider.c.provider == self.name,
             db.module_version.c.published == True,
             db.module_version.c.beta == False
-        )
+        ).order_by(
+            *ModuleVersion.get_semantic_version_order_by()
+        ).limit(1)
         with db.get_connection() as conn:
-            res = conn.execute(select)
-
-            # Convert to list
-            rows = [r for r in res]
-
-        # Sort rows by semantec versioning
-        rows.sort(key=lambda x: LooseVersion(x['version']), reverse=True)
+            row = conn.execute(select).fetchone()
 
-        # Ensure at least one row
-        if not rows:
+        # Ensure a version was found
+        if row is None:
             return None
 
         # Obtain latest row
-        return ModuleVersion(module_provider=self, version=rows[0]['version'])
+        return ModuleVersion(module_provider=self, version=row['version'])
 
     def create_data_directory(self):
         """Create data directory and data directories of parents."""
@@ -1152,18 +1668,151 @@ class ModuleProvider(object):
                 db.module_version.c.beta == False
             )
 
+        # Order by semantic version, newest first
+        select = select.order_by(*ModuleVersion.get_semantic_version_order_by())
+
         with db.get_connection() as conn:
             res = conn.execute(select)
             module_versions = [
                 ModuleVersion(module_provider=self, version=r['version'])
                 for r in res
             ]
-        module_versions.sort(
-            key=lambda x: LooseVersion(x.version),
-            reverse=True
-        )
         return module_versions
 
+    def get_versions_document(self):
+        """
+        Return JSON registry versions document for module provider.
+
+        The document is regenerated when module versions are published, deleted or re-imported.
+        If a document has not been stored for the module provider, it is generated and stored.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.versions_document.c.document
+        ).select_from(
+            db.module_provider
+        ).join(
+            db.versions_document,
+            db.versions_document.c.module_provider_id == db.module_provider.c.id
+        ).where(
+            db.module_provider.c.namespace == self._module._namespace.name,
+            db.module_provider.c.module == self._module.name,
+            db.module_provider.c.provider == self.name
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row is not None:
+            return Database.decode_blob(row['document'])
+
+        # Do not store document for non-existent module provider
+        if self._get_db_row() is None:
+            return self._generate_versions_document()
+
+        return self.update_versions_document()
+
+    def update_versions_document(self):
+        """Generate and store registry versions document for module provider."""
+        versions_document = self._generate_versions_document()
+        encoded_document = Database.encode_blob(versions_document)
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            res = conn.execute(db.versions_document.update().where(
+                db.versions_document.c.module_provider_id == self.pk
+            ).values(document=encoded_document))
+
+            if res.rowcount == 0:
+                conn.execute(db.versions_document.insert().values(
+                    module_provider_id=self.pk,
+                    document=encoded_document
+                ))
+
+        return versions_document
+
+    def _generate_versions_document(self):
+        """
+        Generate JSON registry versions document from published versions of module provider.
+
+        Root module and submodule details of all versions are obtained in a constant number of queries.
+        """
+        versions = []
+
+        if self._get_db_row() is not None:
+            db = Database.get()
+            version_select = sqlalchemy.select(
+                db.module_version.c.id,
+                db.module_version.c.version,
+                db.blob.c.content.label('terraform_docs')
+            ).select_from(
+                db.module_version
+            ).outerjoin(
+                db.module_details,
+                db.module_version.c.module_details_id == db.module_details.c.id
+            ).outerjoin(
+                db.blob,
+                db.module_details.c.terraform_docs_blob_id == db.blob.c.id
+            ).where(
+                db.module_version.c.module_provider_id == self.pk,
+                db.module_version.c.published == True
+            ).order_by(
+                *ModuleVersion.get_semantic_version_order_by()
+            )
+            submodule_select = sqlalchemy.select(
+                db.sub_module.c.parent_module_version,
+                db.sub_module.c.path,
+                db.blob.c.content.label('terraform_docs')
+            ).select_from(
+                db.sub_module
+            ).join(
+                db.module_version,
+                db.sub_module.c.parent_module_version == db.module_version.c.id
+            ).outerjoin(
+                db.module_details,
+                db.sub_module.c.module_details_id == db.module_details.c.id
+            ).outerjoin(
+                db.blob,
+                db.module_details.c.terraform_docs_blob_id == db.blob.c.id
+            ).where(
+                db.module_version.c.module_provider_id == self.pk,
+                db.module_version.c.published == True,
+                db.sub_module.c.type == Submodule.TYPE
+            ).order_by(
+                db.sub_module.c.path
+            )
+            with db.get_connection() as conn:
+                version_rows = conn.execute(version_select).fetchall()
+                submodule_rows = conn.execute(submodule_select).fetchall()
+
+            submodules = {}
+            for submodule_row in submodule_rows:
+                module_specs = TerraformSpecsObject.decode_module_specs(submodule_row['terraform_docs'])
+                submodules.setdefault(submodule_row['parent_module_version'], []).append({
+                    "path": submodule_row['path'],
+                    "providers": TerraformSpecsObject.get_provider_dependencies_from_specs(module_specs),
+                    "dependencies": []
+                })
+
+            for version_row in version_rows:
+                module_specs = TerraformSpecsObject.decode_module_specs(version_row['terraform_docs'])
+                versions.append({
+                    "version": version_row['version'],
+                    "root": {
+                        "providers": TerraformSpecsObject.get_provider_dependencies_from_specs(module_specs),
+                        "dependencies": []
+                    },
+                    "submodules": submodules.get(version_row['id'], [])
+                })
+
+        return json.dumps({
+            "modules": [
+                {
+                    "source": self.id,
+                    "versions": versions
+                }
+            ]
+        })
+
     def get_api_outline(self):
         """Return dict of basic provider details for API response."""
         return {
@@ -1251,7 +1900,7 @@ class TerraformSpecsObject(object):
     @classmethod
     def get(cls, *args, **kwargs):
         """Create object and ensure the object exists."""
-        obj = cls(*args, **kwargs)
+        obj = IdentityMap.get_object(cls(*args, **kwargs))
 
         # If there is no row, return None
         if obj._get_db_row() is None:
@@ -1298,24 +1947,32 @@ class TerraformSpecsObject(object):
         """Return registry path ID (with excludes version)."""
         raise NotImplementedError
 
+    @property
+    def _identity_key(self):
+        """Must be implemented by object. Return key for object in identity map."""
+        raise NotImplementedError
+
     def _get_db_row(self):
         """Must be implemented by object. Return row from DB."""
         raise NotImplementedError
 
     def get_tfsec_failure_count(self):
         """Return number of tfsec failures."""
-        # Handle when results in None
         module_details = self.module_details
-        if module_details is None or module_details.tfsec['results'] is None:
+        if module_details is None:
             return 0
 
-        count = 0
-        # Count each of the test failures
-        for result in self.module_details.tfsec['results']:
-            # TFsec status of 0 is a fail
-            if result['status'] == 0:
-                count += 1
-        return count
+        # Use failure counts calculated when tfsec output was stored,
+        # to avoid decoding the tfsec output
+        return sum(module_details.tfsec_failure_counts.values())
+
+    @staticmethod
+    def decode_module_specs(terraform_docs):
+        """Return module specs from terraform_docs blob of module details."""
+        raw_json = Database.decode_blob(terraform_docs)
+        if raw_json:
+            return json.loads(raw_json)
+        return {}
 
     def get_module_specs(self):
         """Return module specs"""
@@ -1324,13 +1981,33 @@ class TerraformSpecsObject(object):
 
             module_details = self.module_details
             if module_details:
-                raw_json = Database.decode_blob(module_details.terraform_docs)
-                if raw_json:
-                    module_specs = json.loads(raw_json)
+                module_specs = self.decode_module_specs(module_details.terraform_docs)
             self._module_specs = module_specs
         return self._module_specs
 
     def get_readme_html(self, server_hostname):
+        """
+        Return README converted to HTML.
+
+        Rendered HTML is stored for the configured domain name, until the module details are modified.
+        HTML for other server hostnames, which are provided by the client, is rendered without being stored.
+        """
+        module_details = self.module_details
+        if module_details is None:
+            return None
+
+        if server_hostname != terrareg.config.Config().DOMAIN_NAME:
+            return self._render_readme_html(server_hostname) or None
+
+        readme_html = module_details.get_readme_html(server_hostname)
+        if readme_html is None:
+            readme_html = self._render_readme_html(server_hostname)
+            module_details.update_readme_html(server_hostname, readme_html)
+
+        # Rendered HTML of empty README is stored as empty string
+        return readme_html or None
+
+    def _render_readme_html(self, server_hostname):
         """Replace examples in README and convert readme markdown to HTML"""
         readme_md = self.get_readme_content()
         if readme_md:
@@ -1345,8 +2022,17 @@ class TerraformSpecsObject(object):
     @property
     def module_details(self):
         """Return instance of ModuleDetails for object."""
+        return self.get_module_details()
+
+    def get_module_details(self, columns=None):
+        """
+        Return instance of ModuleDetails for object.
+
+        Blob columns required by the caller can be provided,
+        which are obtained in a single query on first use.
+        """
         if self._get_db_row() and self._get_db_row()['module_details_id']:
-            return ModuleDetails(id=self._get_db_row()['module_details_id'])
+            return ModuleDetails(id=self._get_db_row()['module_details_id'], columns=columns)
         else:
             return None
 
@@ -1378,8 +2064,13 @@ class TerraformSpecsObject(object):
 
     def get_terraform_provider_dependencies(self):
         """Obtain module dependencies."""
+        return self.get_provider_dependencies_from_specs(self.get_module_specs())
+
+    @staticmethod
+    def get_provider_dependencies_from_specs(module_specs):
+        """Return provider dependencies from module specs."""
         providers = []
-        for provider in self.get_module_specs().get('providers', []):
+        for provider in module_specs.get('providers', []):
 
             name_split = provider['name'].split('/')
             # Default to name being the name and hashicorp
@@ -1402,6 +2093,11 @@ class TerraformSpecsObject(object):
 
     def get_api_module_specs(self):
         """Return module specs for API."""
+        # Obtain README and terraform-docs output in a single query
+        module_details = self.get_module_details(columns=['readme_content', 'terraform_docs'])
+        if module_details:
+            module_details.load_columns()
+
         return {
             "path": self.path,
             "readme": self.get_readme_content(),
@@ -1479,6 +2175,55 @@ class ModuleVersion(TerraformSpecsObject):
 
             return res.scalar()
 
+    @classmethod
+    def get_for_download(cls, namespace, module, provider, version):
+        """
+        Return module version for download, obtaining the module provider
+        and module version in a single query.
+
+        Returns None if the module version does not exist.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.module_provider,
+            db.module_version
+        ).select_from(
+            db.module_provider
+        ).join(
+            db.module_version,
+            db.module_version.c.module_provider_id == db.module_provider.c.id
+        ).where(
+            db.module_provider.c.namespace == namespace,
+            db.module_provider.c.module == module,
+            db.module_provider.c.provider == provider,
+            db.module_version.c.version == version
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row is None:
+            return None
+
+        def get_table_row(table):
+            return {column.name: row[column] for column in table.columns}
+
+        return cls.get_for_download_from_rows(
+            namespace=namespace, module=module, provider=provider, version=version,
+            module_provider_row=get_table_row(db.module_provider),
+            module_version_row=get_table_row(db.module_version)
+        )
+
+    @classmethod
+    def get_for_download_from_rows(cls, namespace, module, provider, version, module_provider_row, module_version_row):
+        """Return module version for download from previously obtained module provider and module version rows."""
+        namespace_obj = Namespace(name=namespace)
+        module_obj = Module(namespace=namespace_obj, name=module)
+        module_provider = ModuleProvider(module=module_obj, name=provider)
+        module_provider._cache_db_row = dict(module_provider_row)
+        module_version = cls(module_provider=module_provider, version=version)
+        module_version._cache_db_row = dict(module_version_row)
+        return module_version
+
     @staticmethod
     def _validate_version(version):
         """Validate version, checking if version is a beta version."""
@@ -1487,6 +2232,53 @@ class ModuleVersion(TerraformSpecsObject):
             raise InvalidVersionError('Version is invalid')
         return bool(match.group(1))
 
+    @staticmethod
+    def get_semantic_version_attributes(version):
+        """Return database attributes for parsed components of semantic version."""
+        match = re.match(r'^([0-9]+)\.([0-9]+)\.([0-9]+)(?:-([a-z0-9]+))?$', version)
+        if not match:
+            raise InvalidVersionError('Version is invalid')
+        return {
+            'version_major': int(match.group(1)),
+            'version_minor': int(match.group(2)),
+            'version_patch': int(match.group(3)),
+            'version_prerelease': match.group(4),
+            'version_prerelease_sort_key': ModuleVersion.get_prerelease_sort_key(match.group(4))
+        }
+
+    @staticmethod
+    def get_prerelease_sort_key(prerelease):
+        """
+        Return key for ordering pre-release of semantic version as a string.
+
+        Each numeric part of the pre-release is prefixed with its two-digit length,
+        so that numeric parts are ordered numerically, e.g. beta2 before beta10.
+        """
+        if prerelease is None:
+            return None
+        return re.sub(
+            r'[0-9]+',
+            lambda numeric_match: '{:02d}{}'.format(len(numeric_match.group(0)), numeric_match.group(0)),
+            prerelease
+        )
+
+    @staticmethod
+    def get_semantic_version_order_by():
+        """
+        Return order by clauses to order module versions by semantic version, newest first.
+
+        Pre-release versions are ordered before the release of the same version.
+        """
+        db = Database.get()
+        return [
+            db.module_version.c.version_major.desc(),
+            db.module_version.c.version_minor.desc(),
+            db.module_version.c.version_patch.desc(),
+            sqlalchemy.case((db.module_version.c.version_prerelease == None, 0), else_=1),
+            db.module_version.c.version_prerelease_sort_key.desc(),
+            db.module_version.c.version.desc()
+        ]
+
     @property
     def is_submodule(self):
         """Whether object is submodule."""
@@ -1636,23 +2428,33 @@ class ModuleVersion(TerraformSpecsObject):
         self._module_provider = module_provider
         self._version = version
         self._cache_db_row = None
+        self._cache_total_downloads = None
         super(ModuleVersion, self).__init__()
 
+    @property
+    def _identity_key(self):
+        """Return key for object in identity map."""
+        return ('module_version', ) + self._module_provider._identity_key[1:] + (self.version, )
+
+    def _select_db_row(self):
+        """Obtain database row for module version."""
+        db = Database.get()
+        select = db.module_version.select().join(
+            db.module_provider, db.module_version.c.module_provider_id == db.module_provider.c.id
+        ).where(
+            db.module_provider.c.namespace == self._module_provider._module._namespace.name,
+            db.module_provider.c.module == self._module_provider._module.name,
+            db.module_provider.c.provider == self._module_provider.name,
+            db.module_version.c.version == self.version
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            return res.fetchone()
+
     def _get_db_row(self):
         """Get object from database"""
         if self._cache_db_row is None:
-            db = Database.get()
-            select = db.module_version.select().join(
-                db.module_provider, db.module_version.c.module_provider_id == db.module_provider.c.id
-            ).where(
-                db.module_provider.c.namespace == self._module_provider._module._namespace.name,
-                db.module_provider.c.module == self._module_provider._module.name,
-                db.module_provider.c.provider == self._module_provider.name,
-                db.module_version.c.version == self.version
-            )
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                self._cache_db_row = res.fetchone()
+            self._cache_db_row = IdentityMap.get_row(self._identity_key, self._select_db_row)
         return self._cache_db_row
 
     def get_terraform_example_version_string(self):
@@ -1750,6 +2552,61 @@ class ModuleVersion(TerraformSpecsObject):
             'Module is not configured with a git URL and direct downloads are disabled'
         )
 
+    def update_source_download_url(self):
+        """
+        Generate and store source download URL of module version.
+
+        Returns the source download URL, or None if no download method is configured.
+        """
+        try:
+            source_download_url = self.get_source_download_url()
+        except NoModuleDownloadMethodConfiguredError:
+            source_download_url = None
+
+        db = Database.get()
+        update = db.module_version.update().where(
+            db.module_version.c.id == self.pk
+        ).values(
+            source_download_url=source_download_url,
+            source_download_url_config_fingerprint=self.get_source_download_url_config_fingerprint()
+        )
+        with db.get_connection() as conn:
+            conn.execute(update)
+
+        # Clear cached DB row
+        self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
+
+        return source_download_url
+
+    @staticmethod
+    def get_source_download_url_config_fingerprint():
+        """Return fingerprint of configuration used to generate source download URLs."""
+        return terrareg.config.Config().get_fingerprint([
+            'ALLOW_MODULE_HOSTING',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_VERSION',
+            'GIT_PROVIDER_CONFIG'
+        ])
+
+    def get_stored_source_download_url(self):
+        """
+        Return stored source download URL of module version.
+
+        If the URL has not been stored or was generated using different
+        configuration, it is re-generated and stored.
+        """
+        source_download_url = self._get_db_row()['source_download_url']
+        if (source_download_url is None or
+                self._get_db_row()['source_download_url_config_fingerprint'] != self.get_source_download_url_config_fingerprint()):
+            source_download_url = self.update_source_download_url()
+
+            # If no download method is configured, obtain error from source download URL generation
+            if source_download_url is None:
+                return self.get_source_download_url()
+
+        return source_download_url
+
     def get_source_browse_url(self, path=None):
         """Return URL to browse the source doe."""
         template = None
@@ -1831,15 +2688,25 @@ class ModuleVersion(TerraformSpecsObject):
         # Mark module version as published
         self.update_attributes(published=True)
 
+        self.update_source_download_url()
+
         # Calculate latest version will take beta flag into account and will only match
         # the current version if the current version is latest and is capable of being the
         # latest version.
-        if (self._module_provider.calculate_latest_version() is not None and
-                self._module_provider.calculate_latest_version().version == self.version):
+        latest_version = self._module_provider.calculate_latest_version()
+        if latest_version is not None and latest_version.version == self.version:
             self._module_provider.update_attributes(latest_version_id=self.pk)
 
-    def get_api_outline(self):
-        """Return dict of basic version details for API response."""
+        # Regenerate details document for the new revision of the module provider
+        self.update_details_document()
+
+    def get_api_outline(self, total_downloads=None):
+        """
+        Return dict of basic version details for API response.
+
+        A pre-calculated total download count can be provided,
+        to avoid obtaining the count for each module version.
+        """
         row = self._get_db_row()
         api_outline = self._module_provider.get_api_outline()
         api_outline.update({
@@ -1849,13 +2716,16 @@ class ModuleVersion(TerraformSpecsObject):
             "description": row['description'],
             "source": self.get_source_base_url(),
             "published_at": row['published_at'].isoformat() if row['published_at'] else None,
-            "downloads": self.get_total_downloads(),
+            "downloads": total_downloads if total_downloads is not None else self.get_total_downloads(),
             "internal": self._get_db_row()['internal']
         })
         return api_outline
 
     def get_total_downloads(self):
         """Obtain total number of downloads for module version."""
+        if self._cache_total_downloads is not None:
+            return self._cache_total_downloads
+
         return terrareg.analytics.AnalyticsEngine.get_module_version_total_downloads(
             module_version=self
         )
@@ -1872,7 +2742,83 @@ class ModuleVersion(TerraformSpecsObject):
         return api_details
 
     def get_terrareg_api_details(self):
-        """Return dict of version details with additional attributes used by terrareg UI."""
+        """
+        Return dict of version details with additional attributes used by terrareg UI.
+
+        Details are obtained from the pre-generated details document,
+        with download count and namespace trust obtained at request time.
+        """
+        api_details = self.get_details_document()
+        api_details.update({
+            "downloads": self.get_total_downloads(),
+            "trusted": self._module_provider._module._namespace.trusted
+        })
+        return api_details
+
+    def get_details_document(self):
+        """
+        Return pre-generated terrareg API details of module version, excluding download count.
+
+        The document is generated when the module version is imported or published.
+        If a document has not been stored for the current revision of the module provider
+        and current configuration, it is regenerated and stored.
+        """
+        db = Database.get()
+        select = sqlalchemy.select(
+            db.details_document.c.document
+        ).select_from(
+            db.details_document
+        ).where(
+            db.details_document.c.module_version_id == self.pk,
+            db.details_document.c.revision == self._module_provider._get_db_row()['revision'],
+            db.details_document.c.config_fingerprint == self.get_details_document_config_fingerprint()
+        )
+        with db.get_connection() as conn:
+            row = conn.execute(select).fetchone()
+
+        if row is not None:
+            return json.loads(Database.decode_blob(row['document']))
+
+        return self.update_details_document()
+
+    def update_details_document(self):
+        """Generate and store terrareg API details document of module version."""
+        details_document = self._generate_terrareg_api_details()
+        del details_document['downloads']
+        encoded_document = Database.encode_blob(json.dumps(details_document))
+        revision = self._module_provider._get_db_row()['revision']
+        config_fingerprint = self.get_details_document_config_fingerprint()
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            res = conn.execute(db.details_document.update().where(
+                db.details_document.c.module_version_id == self.pk
+            ).values(revision=revision, config_fingerprint=config_fingerprint, document=encoded_document))
+
+            if res.rowcount == 0:
+                conn.execute(db.details_document.insert().values(
+                    module_version_id=self.pk,
+                    revision=revision,
+                    config_fingerprint=config_fingerprint,
+                    document=encoded_document
+                ))
+
+        return details_document
+
+    @staticmethod
+    def get_details_document_config_fingerprint():
+        """Return fingerprint of configuration used to generate details documents."""
+        return terrareg.config.Config().get_fingerprint([
+            'ALLOW_MODULE_HOSTING',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_VERSION',
+            'GIT_PROVIDER_CONFIG',
+            'TERRAFORM_EXAMPLE_VERSION_TEMPLATE',
+            'ENABLE_SECURITY_SCANNING'
+        ])
+
+    def _generate_terrareg_api_details(self):
+        """Generate dict of version details with additional attributes used by terrareg UI."""
         api_details = self._module_provider.get_terrareg_api_details()
 
         # Capture versions from module provider API output, as this limits
@@ -1921,6 +2867,29 @@ class ModuleVersion(TerraformSpecsObject):
 
         # Clear cached DB row
         self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
+
+        # Update search tokens if searchable attributes
+        # of the latest version have been modified
+        if (('description' in kwargs or 'owner' in kwargs) and
+                self._module_provider._get_db_row()['latest_version_id'] == self.pk):
+            terrareg.module_search.ModuleSearchIndex.update_module_provider(self._module_provider)
+        # Update in-memory search index if attributes used by search have been modified
+        if [kwarg for kwarg in ['description', 'owner', 'published', 'beta', 'internal'] if kwarg in kwargs]:
+            terrareg.trigram_search.TrigramSearchIndex.update_module_version(self)
+
+        # Regenerate versions document if the listed versions may have changed
+        if 'published' in kwargs or 'beta' in kwargs:
+            self._module_provider.update_versions_document()
+
+        # Re-generate source download URL if custom git clone URL has changed
+        if 'repo_clone_url_template' in kwargs:
+            self.update_source_download_url()
+
+        self._module_provider.increment_revision()
+
+        # Invalidate cached search results
+        terrareg.module_search.ModuleSearch.bump_catalog_revision()
 
     def delete(self, delete_related_analytics=True):
         """Delete module version and all associated submodules."""
@@ -1941,6 +2910,11 @@ class ModuleVersion(TerraformSpecsObject):
         db = Database.get()
 
         with db.get_connection() as conn:
+            # Delete pre-generated details document
+            conn.execute(db.details_document.delete().where(
+                db.details_document.c.module_version_id == self.pk
+            ))
+
             # Delete module from module_version table
             delete_statement = db.module_version.delete().where(
                 db.module_version.c.id == self.pk
@@ -1949,6 +2923,7 @@ class ModuleVersion(TerraformSpecsObject):
 
             # Invalidate cache for previous DB row
             self._cache_db_row = None
+            IdentityMap.evict(self._identity_key)
 
         # Update latest version of parent module
         new_latest_version = self._module_provider.calculate_latest_version()
@@ -1956,6 +2931,9 @@ class ModuleVersion(TerraformSpecsObject):
             latest_version_id=(new_latest_version.pk if new_latest_version is not None else None)
         )
 
+        # Remove version from versions document of module provider
+        self._module_provider.update_versions_document()
+
     def _create_db_row(self):
         """Insert into datadabase, removing any existing duplicate versions."""
         db = Database.get()
@@ -1973,10 +2951,13 @@ class ModuleVersion(TerraformSpecsObject):
                 version=self.version,
                 published=False,
                 beta=self._extracted_beta_flag,
-                internal=False
+                internal=False,
+                **self.get_semantic_version_attributes(self.version)
             )
             conn.execute(insert_statement)
 
+        self._module_provider.increment_revision()
+
         # Migrate analytics from old module version ID to new module version
         if old_module_version_pk is not None:
             terrareg.analytics.AnalyticsEngine.migrate_analytics_to_new_module_version(
@@ -2098,18 +3079,27 @@ class BaseSubmodule(TerraformSpecsObject):
         self._cache_db_row = None
         super(BaseSubmodule, self).__init__()
 
+    @property
+    def _identity_key(self):
+        """Return key for object in identity map."""
+        return (self.TYPE, ) + self._module_version._identity_key[1:] + (self._module_path, )
+
+    def _select_db_row(self):
+        """Obtain database row for submodule."""
+        db = Database.get()
+        select = db.sub_module.select().where(
+            db.sub_module.c.parent_module_version == self._module_version.pk,
+            db.sub_module.c.path == self._module_path,
+            db.sub_module.c.type == self.TYPE
+        )
+        with db.get_connection() as conn:
+            res = conn.execute(select)
+            return res.fetchone()
+
     def _get_db_row(self):
         """Get object from database"""
         if self._cache_db_row is None:
-            db = Database.get()
-            select = db.sub_module.select().where(
-                db.sub_module.c.parent_module_version == self._module_version.pk,
-                db.sub_module.c.path == self._module_path,
-                db.sub_module.c.type == self.TYPE
-            )
-            with db.get_connection() as conn:
-                res = conn.execute(select)
-                self._cache_db_row = res.fetchone()
+            self._cache_db_row = IdentityMap.get_row(self._identity_key, self._select_db_row)
         return self._cache_db_row
 
     def update_attributes(self, **kwargs):
@@ -2123,6 +3113,7 @@ class BaseSubmodule(TerraformSpecsObject):
 
         # Remove cached DB row
         self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
 
     def delete(self):
         """Delete submodule from DB."""
@@ -2141,6 +3132,7 @@ class BaseSubmodule(TerraformSpecsObject):
 
         # Invalidate DB row cache
         self._cache_db_row = None
+        IdentityMap.evict(self._identity_key)
 
     def get_source_browse_url(self):
         """Get formatted source browse URL"""
@@ -2301,8 +3293,17 @@ class ExampleFile:
         """Return DB row for git provider."""
         if self._cache_db_row is None:
             db = Database.get()
-            # Obtain row from git providers table for git provider.
-            select = db.example_file.select().where(
+            # Obtain row from git providers table for git provider,
+            # along with content from blob table
+            select = sqlalchemy.select(
+                db.example_file,
+                db.blob.c.content
+            ).select_from(
+                db.example_file
+            ).outerjoin(
+                db.blob,
+                db.example_file.c.content_blob_id == db.blob.c.id
+            ).where(
                 db.example_file.c.submodule_id == self._example.pk,
                 db.example_file.c.path == self._path
             )
@@ -2313,18 +3314,22 @@ class ExampleFile:
 
     def update_attributes(self, **kwargs):
         """Update DB row."""
-        # Encode columns that are binary blobs in the database
-        for kwarg in kwargs:
-            if kwarg in ['content']:
-                kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
-
         db = Database.get()
+
+        # Store content in blob table, replacing previously referenced blob
+        previous_blob_id = None
+        if 'content' in kwargs:
+            previous_blob_id = self._get_db_row()['content_blob_id']
+            kwargs['content_blob_id'] = Blob.create(kwargs.pop('content'))
+
         update = db.example_file.update().where(
             db.example_file.c.id == self.pk
         ).values(**kwargs)
         with db.get_connection() as conn:
             conn.execute(update)
 
+        Blob.release(previous_blob_id)
+
         # Remove cached DB row
         self._cache_db_row = None
 
@@ -2332,12 +3337,17 @@ class ExampleFile:
         """Delete example file from DB."""
         db = Database.get()
 
+        blob_id = self._get_db_row()['content_blob_id']
+
         with db.get_connection() as conn:
             delete_statement = db.example_file.delete().where(
                 db.example_file.c.id == self.pk
             )
             conn.execute(delete_statement)
 
+        # Remove reference to content blob
+        Blob.release(blob_id)
+
         # Invalidate DB row cache
         self._cache_db_row = None
 
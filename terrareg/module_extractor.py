@@ -169,7 +169,8 @@ class ModuleExtractor:
             readme_content=readme_content,
             terraform_docs=json.dumps(terraform_docs),
             tfsec=json.dumps(tfsec),
-            infracost=json.dumps(infracost) if infracost else None
+            infracost=json.dumps(infracost) if infracost else None,
+            **ModuleDetails.get_tfsec_failure_counts(tfsec)
         )
         return module_details
 
@@ -431,6 +432,23 @@ class ModuleExtractor:
             submodule_class=Example,
             subdirectory=Config().EXAMPLES_DIRECTORY)
 
+        # Regenerate versions document, including details of extracted submodules
+        self._module_version._module_provider.update_versions_document()
+
+        # Invalidate ETags of API responses containing details of module version,
+        # submodules and examples, which do not modify the revision whilst being extracted
+        self._module_version._module_provider.increment_revision()
+
+        # Generate details document for the new revision of the module provider
+        self._module_version.update_details_document()
+
+        # Render README HTML for the configured domain name, which is used by requests to the domain
+        if Config().DOMAIN_NAME:
+            for readme_object in ([self._module_version] +
+                                  self._module_version.get_submodules() +
+                                  self._module_version.get_examples()):
+                readme_object.get_readme_html(server_hostname=Config().DOMAIN_NAME)
+
 
 class ApiUploadModuleExtractor(ModuleExtractor):
     """Extraction of module uploaded via API."""
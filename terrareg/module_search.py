@@ -1,11 +1,20 @@
 
+import base64
+import binascii
+import copy
 import datetime
+import json
 
 import sqlalchemy
+from terrareg.cache import LRUCache
 from terrareg.config import Config
 
 from terrareg.database import Database
+from terrareg.errors import InvalidSearchCursorError
+from terrareg.identity_map import IdentityMap
+import terrareg.analytics
 import terrareg.models
+import terrareg.trigram_search
 from terrareg.filters import NamespaceTrustFilter
 
 
@@ -19,7 +28,7 @@ class ModuleSearchResults(object):
 
     @property
     def count(self):
-        """Return count."""
+        """Return total count of matching module providers, if it was obtained."""
         return self._count
 
     @property
@@ -37,24 +46,206 @@ class ModuleSearchResults(object):
         if self._offset > 0:
             meta_data['prev_offset'] = (self._offset - self._limit) if (self._offset >= self._limit) else 0
 
-        # If the current count of results is greater than the next offset,
+        # If there are further results after the current page,
         # provide the next offset in the metadata
-        next_offset = (self._offset + self._limit)
-        if self.count > next_offset:
-            meta_data['next_offset'] = next_offset
+        if self._has_more:
+            meta_data['next_offset'] = (self._offset + self._limit)
+
+        # Provide cursor for obtaining the next page of results
+        if self._next_cursor:
+            meta_data['next_cursor'] = self._next_cursor
 
         return meta_data
 
-    def __init__(self, offset: int, limit: int, module_providers: list, count: str):
-        """Store member variables"""
+    def __init__(self, offset: int, limit: int, module_providers: list, count: int=None,
+                 has_more: bool=None, next_cursor: str=None):
+        """
+        Store member variables.
+
+        If whether there are further results is not provided,
+        it is determined from the total count.
+        """
         self._offset = offset
         self._limit = limit
         self._module_providers = module_providers
         self._count = count
+        self._has_more = (
+            (count is not None and count > (offset + limit))
+            if has_more is None else
+            has_more
+        )
+        self._next_cursor = next_cursor
+
+
+class ModuleSearchIndex(object):
+    """
+    Maintain search tokens for module providers.
+
+    Tokens are generated from the latest version of each module provider
+    and contain each suffix of the namespace, module, description and owner
+    and the full provider and version, lower-cased and truncated to
+    the length of the token column.
+    A search term is a substring of a field if, and only if, a suffix of the
+    field starts with the search term, so a prefix match of tokens
+    finds all candidate module providers for a search term using the index.
+    Since tokens are truncated, candidates must still be filtered using
+    the original search filters.
+    """
+
+    # Characters that are treated as wildcards or escape
+    # characters in LIKE, in any database backend
+    LIKE_SPECIAL_CHARACTERS = ['%', '_', '\\']
+
+    @staticmethod
+    def _get_token_length():
+        """Return maximum length of tokens."""
+        return Database.get().module_search_token.c.token.type.length
+
+    @classmethod
+    def get_tokens(cls, namespace, module, provider, version, description, owner):
+        """Return set of search tokens for module provider attributes."""
+        token_length = cls._get_token_length()
+        tokens = set()
+        for value in [namespace, module, description, owner]:
+            if not value:
+                continue
+            value = value.lower()
+            for start_index in range(len(value)):
+                tokens.add(value[start_index:start_index + token_length])
+
+        for value in [provider, version]:
+            if value:
+                tokens.add(value.lower()[:token_length])
+
+        return tokens
+
+    @classmethod
+    def _get_term_prefix(cls, query_part):
+        """Return literal prefix of search term, before any LIKE special characters."""
+        prefix = query_part.lower()
+        for special_character in cls.LIKE_SPECIAL_CHARACTERS:
+            prefix = prefix.split(special_character)[0]
+        return prefix[:cls._get_token_length()]
+
+    @classmethod
+    def get_search_term_filter(cls, query_part):
+        """
+        Return filter of module providers matching prefix of search term.
+
+        Returns None if the search term cannot be matched using tokens,
+        e.g. if it starts with a wildcard.
+        """
+        prefix = cls._get_term_prefix(query_part)
+        if not prefix:
+            return None
+
+        db = Database.get()
+        # Match all tokens starting with prefix, using a range,
+        # which can use the token index in all database backends
+        prefix_upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return db.module_provider.c.id.in_(
+            sqlalchemy.select(
+                db.module_search_token.c.module_provider_id
+            ).where(
+                db.module_search_token.c.token >= prefix,
+                db.module_search_token.c.token < prefix_upper_bound
+            )
+        )
+
+    @classmethod
+    def _get_rows_tokens(cls, rows):
+        """Return token rows for module provider rows, joined to latest version."""
+        return [
+            {'module_provider_id': row['id'], 'token': token}
+            for row in rows
+            for token in cls.get_tokens(
+                namespace=row['namespace'], module=row['module'], provider=row['provider'],
+                version=row['version'], description=row['description'], owner=row['owner'])
+        ]
+
+    @staticmethod
+    def _get_token_source_select():
+        """Return select for attributes of module providers used to generate tokens."""
+        db = Database.get()
+        return db.select_module_provider_joined_latest_module_version(
+            db.module_provider.c.id,
+            db.module_provider.c.namespace,
+            db.module_provider.c.module,
+            db.module_provider.c.provider,
+            db.module_version.c.version,
+            db.module_version.c.description,
+            db.module_version.c.owner
+        )
+
+    @classmethod
+    def update_module_provider(cls, module_provider):
+        """Replace tokens for module provider, using current latest version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            rows = conn.execute(cls._get_token_source_select().where(
+                db.module_provider.c.id == module_provider.pk
+            )).fetchall()
+
+            conn.execute(db.module_search_token.delete().where(
+                db.module_search_token.c.module_provider_id == module_provider.pk
+            ))
+            token_rows = cls._get_rows_tokens(rows)
+            if token_rows:
+                conn.execute(db.module_search_token.insert(), token_rows)
+
+    @staticmethod
+    def delete_module_provider(module_provider):
+        """Remove tokens for module provider."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_search_token.delete().where(
+                db.module_search_token.c.module_provider_id == module_provider.pk
+            ))
+
+    @classmethod
+    def rebuild(cls, batch_size=500):
+        """Re-generate tokens for all module providers, returning number of module providers indexed."""
+        db = Database.get()
+        indexed_count = 0
+
+        # Rebuild tokens in a transaction, to avoid searches
+        # occurring against a partially populated index
+        if Database.get_current_transaction() is not None:
+            connection_context = db.get_connection()
+        else:
+            connection_context = db.get_engine().begin()
+
+        with connection_context as conn:
+            conn.execute(db.module_search_token.delete())
+
+            last_id = 0
+            while True:
+                rows = conn.execute(cls._get_token_source_select().where(
+                    db.module_provider.c.id > last_id
+                ).order_by(
+                    db.module_provider.c.id.asc()
+                ).limit(batch_size)).fetchall()
+                if not rows:
+                    break
+
+                last_id = rows[-1]['id']
+                token_rows = cls._get_rows_tokens(rows)
+                if token_rows:
+                    conn.execute(db.module_search_token.insert(), token_rows)
+                indexed_count += len(rows)
+
+        # Invalidate search results cached against the previous index
+        ModuleSearch.bump_catalog_revision()
+
+        return indexed_count
 
 
 class ModuleSearch(object):
 
+    # ID of the row of the catalog_revision table
+    _CATALOG_REVISION_ID = 1
+    _SEARCH_CACHE = None
+
     @classmethod
     def _get_search_query_filter(cls, select: sqlalchemy.sql.selectable.Select, query: str):
         """Filter query based on wildcarded match of fields."""
@@ -62,6 +253,11 @@ class ModuleSearch(object):
         db = Database.get()
         if query:
             for query_part in query.split():
+                # Limit to candidate module providers from search index
+                search_term_filter = ModuleSearchIndex.get_search_term_filter(query_part)
+                if search_term_filter is not None:
+                    select = select.where(search_term_filter)
+
                 wildcarded_query_part = '%{0}%'.format(query_part)
                 select = select.where(
                     sqlalchemy.or_(
@@ -85,6 +281,211 @@ class ModuleSearch(object):
         )
         return select
 
+    @staticmethod
+    def _get_outline_select(module_provider_subquery):
+        """
+        Return select for outline details of module providers in subquery.
+
+        Selects module provider, latest module version,
+        git provider and download count of latest version,
+        in a single query.
+        """
+        db = Database.get()
+        download_count = sqlalchemy.select(
+            db.module_version_download_count.c.download_count
+        ).where(
+            db.module_version_download_count.c.parent_module_version == db.module_version.c.id
+        ).scalar_subquery().label('download_count')
+
+        return sqlalchemy.select(
+            db.module_provider,
+            db.module_version,
+            db.git_provider,
+            download_count
+        ).select_from(
+            module_provider_subquery
+        ).join(
+            db.module_provider,
+            db.module_provider.c.id == module_provider_subquery.c.id
+        ).join(
+            db.module_version,
+            db.module_provider.c.latest_version_id == db.module_version.c.id
+        ).outerjoin(
+            db.git_provider,
+            db.module_provider.c.git_provider_id == db.git_provider.c.id
+        ).order_by(
+            db.module_provider.c.namespace.asc(),
+            db.module_provider.c.module.asc(),
+            db.module_provider.c.provider.asc()
+        )
+
+    @staticmethod
+    def _get_module_provider_from_outline_row(row):
+        """Create module provider, with latest version and git provider populated from outline row."""
+        db = Database.get()
+
+        def get_table_row(table):
+            return {column.name: row[column] for column in table.columns}
+
+        namespace = terrareg.models.Namespace(name=row[db.module_provider.c.namespace])
+        module = terrareg.models.Module(namespace=namespace, name=row[db.module_provider.c.module])
+        module_provider = terrareg.models.ModuleProvider(module=module, name=row[db.module_provider.c.provider])
+        module_provider._cache_db_row = get_table_row(db.module_provider)
+
+        if row[db.git_provider.c.id] is not None:
+            git_provider = terrareg.models.GitProvider(id=row[db.git_provider.c.id])
+            git_provider._row_cache = get_table_row(db.git_provider)
+            module_provider._cache_git_provider = git_provider
+
+        module_version = terrareg.models.ModuleVersion(
+            module_provider=module_provider,
+            version=row[db.module_version.c.version]
+        )
+        module_version._cache_db_row = get_table_row(db.module_version)
+        module_version._cache_total_downloads = row['download_count'] or 0
+        module_provider._cache_latest_version = module_version
+
+        return module_provider
+
+    @classmethod
+    def get_catalog_revision(cls):
+        """
+        Return current revision of module catalog, used to invalidate cached search results.
+
+        The revision is stored in the database, so that modifications made by any server
+        process or maintenance command invalidate cached search results of all server processes.
+        The revision is obtained once for each request.
+        """
+        def load_revision():
+            db = Database.get()
+            with db.get_connection() as conn:
+                row = conn.execute(sqlalchemy.select(
+                    db.catalog_revision.c.revision
+                ).where(
+                    db.catalog_revision.c.id == cls._CATALOG_REVISION_ID
+                )).fetchone()
+            # Default to revision of 0 if the catalog has never been modified
+            return row if row is not None else {'revision': 0}
+
+        return IdentityMap.get_row(('catalog_revision', ), load_revision)['revision']
+
+    @classmethod
+    def bump_catalog_revision(cls):
+        """
+        Increment revision of module catalog, invalidating cached search results.
+
+        The revision is incremented once the current transaction has been committed,
+        so that concurrent searches cannot cache results from before the commit
+        against the new revision.
+        """
+        Database.run_after_commit(cls._increment_catalog_revision)
+
+    @classmethod
+    def _increment_catalog_revision(cls):
+        """Increment revision of module catalog in database."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            Database.execute_upsert(
+                conn,
+                db.catalog_revision.update().where(
+                    db.catalog_revision.c.id == cls._CATALOG_REVISION_ID
+                ).values(
+                    revision=(db.catalog_revision.c.revision + 1)
+                ),
+                db.catalog_revision.insert().values(
+                    id=cls._CATALOG_REVISION_ID,
+                    revision=1
+                )
+            )
+        IdentityMap.evict(('catalog_revision', ))
+
+    @classmethod
+    def get_search_cache(cls):
+        """Return cache for search results and search filters, if enabled."""
+        search_cache_size = Config().SEARCH_CACHE_SIZE
+        if search_cache_size < 1:
+            return None
+        if cls._SEARCH_CACHE is None:
+            cls._SEARCH_CACHE = LRUCache(name='search', max_size=search_cache_size)
+        return cls._SEARCH_CACHE
+
+    @staticmethod
+    def encode_cursor(namespace, module, provider):
+        """Return opaque pagination cursor for results ordered after module provider."""
+        return base64.urlsafe_b64encode(
+            json.dumps([namespace, module, provider]).encode('utf-8')
+        ).decode('utf-8')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return namespace, module and provider names from pagination cursor."""
+        try:
+            cursor_values = json.loads(base64.urlsafe_b64decode(cursor.encode('utf-8')).decode('utf-8'))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidSearchCursorError('Invalid pagination cursor')
+
+        if (not isinstance(cursor_values, list) or len(cursor_values) != 3 or
+                not all([isinstance(value, str) for value in cursor_values])):
+            raise InvalidSearchCursorError('Invalid pagination cursor')
+
+        return tuple(cursor_values)
+
+    @staticmethod
+    def get_cursor_filter(namespace_column, module_column, provider_column, cursor_values):
+        """
+        Return filter for rows ordered after the namespace, module and provider of a cursor.
+
+        The row comparison is expanded, as row value comparisons are not
+        supported by all database backends and are not always able to use indexes.
+        """
+        namespace, module, provider = cursor_values
+        return sqlalchemy.or_(
+            namespace_column > namespace,
+            sqlalchemy.and_(
+                namespace_column == namespace,
+                sqlalchemy.or_(
+                    module_column > module,
+                    sqlalchemy.and_(
+                        module_column == module,
+                        provider_column > provider
+                    )
+                )
+            )
+        )
+
+    @staticmethod
+    def _normalise_query(query):
+        """Normalise whitespace in search query, for use in cache keys."""
+        return ' '.join(query.split()) if query else None
+
+    @staticmethod
+    def _normalise_filter_list(values):
+        """Normalise list of filter values, for use in cache keys."""
+        return tuple(sorted(set(values))) if values else None
+
+    @classmethod
+    def _get_module_providers_from_outline_rows(cls, rows, refresh_download_counts=False):
+        """
+        Create module providers from outline rows.
+
+        If the rows have been cached, refresh_download_counts should be set,
+        as the download counts in the rows may be outdated.
+        """
+        module_providers = [
+            cls._get_module_provider_from_outline_row(row)
+            for row in rows
+        ]
+
+        if refresh_download_counts:
+            download_counts = terrareg.analytics.AnalyticsEngine.get_module_versions_total_downloads(
+                [module_provider._cache_latest_version.pk for module_provider in module_providers]
+            )
+            for module_provider in module_providers:
+                module_version = module_provider._cache_latest_version
+                module_version._cache_total_downloads = download_counts[module_version.pk]
+
+        return module_providers
+
     @classmethod
     def search_module_providers(
         cls,
@@ -96,13 +497,128 @@ class ModuleSearch(object):
         providers: list=None,
         verified: bool=False,
         include_internal: bool=False,
-        namespace_trust_filters: list=NamespaceTrustFilter.UNSPECIFIED):
+        namespace_trust_filters: list=NamespaceTrustFilter.UNSPECIFIED,
+        cursor: str=None,
+        include_count: bool=False):
+        """
+        Search module providers, ordered by namespace, module and provider.
+
+        A cursor, obtained from the meta of previous search results, can be
+        provided to only return module providers after the previous page of results,
+        which is applied before the offset.
+
+        The total count of matching module providers is only obtained if include_count is set.
+        Counts are cached per search, independent of the page, if the search cache is enabled.
+        """
 
         # Limit the limits
         limit = 50 if limit > 50 else limit
         limit = 1 if limit < 1 else limit
         offset = 0 if offset < 0 else offset
 
+        cursor_values = cls.decode_cursor(cursor) if cursor else None
+
+        search_filters = {
+            'query': query,
+            'namespaces': namespaces,
+            'modules': modules,
+            'providers': providers,
+            'verified': verified,
+            'include_internal': include_internal,
+            'namespace_trust_filters': namespace_trust_filters
+        }
+
+        search_cache = cls.get_search_cache()
+        filters_cache_key = (
+            cls.get_catalog_revision() if search_cache is not None else None,
+            cls._normalise_query(query),
+            cls._normalise_filter_list(namespaces),
+            cls._normalise_filter_list(modules),
+            cls._normalise_filter_list(providers),
+            bool(verified),
+            bool(include_internal),
+            (
+                namespace_trust_filters
+                if namespace_trust_filters is NamespaceTrustFilter.UNSPECIFIED else
+                cls._normalise_filter_list([trust_filter.value for trust_filter in namespace_trust_filters])
+            ),
+            tuple(Config().TRUSTED_NAMESPACES)
+        )
+        cache_key = ('search_module_providers', ) + filters_cache_key + (cursor_values, offset, limit)
+        cached_result = search_cache.get(cache_key) if search_cache is not None else None
+
+        # Perform search using in-memory index, if enabled
+        trigram_search_index = terrareg.trigram_search.TrigramSearchIndex.get()
+
+        if cached_result is not None:
+            rows, has_more = cached_result
+            refresh_download_counts = True
+        else:
+            if trigram_search_index is not None:
+                rows, has_more = trigram_search_index.search(
+                    offset=offset,
+                    limit=limit,
+                    cursor_values=cursor_values,
+                    **search_filters
+                )
+                refresh_download_counts = True
+            else:
+                rows, has_more = cls._search_module_provider_rows(
+                    offset=offset,
+                    limit=limit,
+                    cursor_values=cursor_values,
+                    **search_filters
+                )
+                refresh_download_counts = False
+
+            if search_cache is not None:
+                search_cache.set(cache_key, (rows, has_more))
+
+        count = None
+        if include_count:
+            count_cache_key = ('search_module_providers_count', ) + filters_cache_key
+            count = search_cache.get(count_cache_key) if search_cache is not None else None
+            if count is None:
+                if trigram_search_index is not None:
+                    count = trigram_search_index.count(**search_filters)
+                else:
+                    count = cls._count_module_providers(**search_filters)
+
+                if search_cache is not None:
+                    search_cache.set(count_cache_key, count)
+
+        module_providers = cls._get_module_providers_from_outline_rows(
+            rows, refresh_download_counts=refresh_download_counts)
+
+        next_cursor = None
+        if has_more:
+            last_module_provider = module_providers[-1]
+            next_cursor = cls.encode_cursor(
+                namespace=last_module_provider._module._namespace.name,
+                module=last_module_provider._module.name,
+                provider=last_module_provider.name
+            )
+
+        return ModuleSearchResults(
+            offset=offset,
+            limit=limit,
+            module_providers=module_providers,
+            count=count,
+            has_more=has_more,
+            next_cursor=next_cursor
+        )
+
+    @classmethod
+    def _get_search_select(
+        cls,
+        query: str,
+        namespaces: list,
+        modules: list,
+        providers: list,
+        verified: bool,
+        include_internal: bool,
+        namespace_trust_filters: list):
+        """Return select for module providers matching search, ordered by namespace, module and provider."""
         db = Database.get()
         select = db.select_module_provider_joined_latest_module_version(
             db.module_provider
@@ -159,35 +675,65 @@ class ModuleSearch(object):
             db.module_provider.c.module.asc(),
             db.module_provider.c.provider.asc()
         )
+        return select
 
-        limited_search = select.limit(limit).offset(offset)
-        count_search = sqlalchemy.select(sqlalchemy.func.count().label('count')).select_from(select.subquery())
+    @classmethod
+    def _count_module_providers(cls, **search_filters):
+        """Return total count of module providers matching search from database."""
+        db = Database.get()
+        count_search = sqlalchemy.select(
+            sqlalchemy.func.count().label('count')
+        ).select_from(
+            cls._get_search_select(**search_filters).subquery()
+        )
 
         with db.get_connection() as conn:
-            res = conn.execute(limited_search)
-            count_result = conn.execute(count_search)
+            return conn.execute(count_search).fetchone()['count']
 
-            count = count_result.fetchone()['count']
+    @classmethod
+    def _search_module_provider_rows(cls, offset: int, limit: int, cursor_values: tuple, **search_filters):
+        """
+        Return outline rows of page of matching module providers
+        and whether there are further matches after the page from database.
+        """
+        db = Database.get()
+        select = cls._get_search_select(**search_filters)
 
-            module_providers = []
-            for r in res:
-                namespace = terrareg.models.Namespace(name=r['namespace'])
-                module = terrareg.models.Module(namespace=namespace, name=r['module'])
-                module_providers.append(terrareg.models.ModuleProvider(module=module, name=r['provider']))
+        if cursor_values:
+            select = select.where(cls.get_cursor_filter(
+                db.module_provider.c.namespace,
+                db.module_provider.c.module,
+                db.module_provider.c.provider,
+                cursor_values
+            ))
 
-        return ModuleSearchResults(
-            offset=offset,
-            limit=limit,
-            module_providers=module_providers,
-            count=count
-        )
+        # Obtain an additional row, to determine if there are further results
+        limited_search = cls._get_outline_select(select.limit(limit + 1).offset(offset).subquery())
+
+        with db.get_connection() as conn:
+            rows = conn.execute(limited_search).fetchall()
+
+        return rows[:limit], len(rows) > limit
 
     @classmethod
     def get_search_filters(cls, query):
         """Get list of search filters and filter counts."""
+        search_cache = cls.get_search_cache()
+        cache_key = (
+            'get_search_filters',
+            cls.get_catalog_revision() if search_cache is not None else None,
+            cls._normalise_query(query),
+            tuple(Config().TRUSTED_NAMESPACES)
+        )
+        cached_filters = search_cache.get(cache_key) if search_cache is not None else None
+        if cached_filters is not None:
+            return copy.deepcopy(cached_filters)
+
         db = Database.get()
         select = db.select_module_provider_joined_latest_module_version(
-            db.module_provider
+            db.module_provider.c.namespace,
+            db.module_provider.c.provider,
+            db.module_provider.c.verified
         )
 
         main_select = cls._get_search_query_filter(select, query)
@@ -197,76 +743,51 @@ class ModuleSearch(object):
             db.module_version.c.internal == False
         )
 
-        with db.get_connection() as conn:
-            verified_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.module_provider.c.verified==True
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            trusted_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        db.module_provider.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
-
-            contributed_count = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count')]
-                ).select_from(
-                    main_select.where(
-                        ~db.module_provider.c.namespace.in_(tuple(Config().TRUSTED_NAMESPACES))
-                    ).subquery()
-                )
-            ).fetchone()['count']
+        # Obtain counts of matching module providers for each namespace and provider,
+        # in a single pass, from which all filter counts are calculated.
+        matching_module_providers = main_select.cte('matching_module_providers')
+        facet_select = sqlalchemy.select(
+            matching_module_providers.c.namespace,
+            matching_module_providers.c.provider,
+            sqlalchemy.func.count().label('count'),
+            # Cast sum to integer, as it is returned as a decimal by MySQL
+            sqlalchemy.cast(
+                sqlalchemy.func.sum(
+                    sqlalchemy.case((matching_module_providers.c.verified == True, 1), else_=0)
+                ),
+                sqlalchemy.Integer
+            ).label('verified_count')
+        ).select_from(
+            matching_module_providers
+        ).group_by(
+            matching_module_providers.c.namespace,
+            matching_module_providers.c.provider
+        )
 
-            provider_subquery = main_select.group_by(
-                db.module_provider.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
-            provider_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), provider_subquery.c.provider]
-                ).select_from(
-                    provider_subquery
-                ).group_by(provider_subquery.c.provider)
-            )
+        with db.get_connection() as conn:
+            facet_rows = conn.execute(facet_select).fetchall()
+
+        trusted_namespaces = Config().TRUSTED_NAMESPACES
+        filters = {
+            'verified': 0,
+            'trusted_namespaces': 0,
+            'contributed': 0,
+            'providers': {},
+            'namespaces': {}
+        }
+        for row in facet_rows:
+            filters['verified'] += row['verified_count']
+            if row['namespace'] in trusted_namespaces:
+                filters['trusted_namespaces'] += row['count']
+            else:
+                filters['contributed'] += row['count']
+            filters['providers'][row['provider']] = filters['providers'].get(row['provider'], 0) + row['count']
+            filters['namespaces'][row['namespace']] = filters['namespaces'].get(row['namespace'], 0) + row['count']
 
-            namespace_subquery = main_select.group_by(
-                db.module_provider.c.namespace,
-                db.module_provider.c.module,
-                db.module_provider.c.provider
-            ).subquery()
-            namespace_res = conn.execute(
-                sqlalchemy.select(
-                    [sqlalchemy.func.count().label('count'), namespace_subquery.c.namespace]
-                ).select_from(
-                    namespace_subquery
-                ).group_by(namespace_subquery.c.namespace)
-            )
+        if search_cache is not None:
+            search_cache.set(cache_key, copy.deepcopy(filters))
 
-            return {
-                'verified': verified_count,
-                'trusted_namespaces': trusted_count,
-                'contributed': contributed_count,
-                'providers': {
-                    r['provider']: r['count']
-                    for r in provider_res
-                },
-                'namespaces': {
-                    r['namespace']: r['count']
-                    for r in namespace_res
-                }
-            }
+        return filters
 
     @staticmethod
     def get_most_recently_published():
@@ -305,24 +826,24 @@ class ModuleSearch(object):
         db = Database.get()
         counts = sqlalchemy.select(
             [
-                sqlalchemy.func.count().label('download_count'),
+                sqlalchemy.func.sum(db.analytics_daily_rollup.c.download_count).label('download_count'),
                 db.module_provider.c.namespace,
                 db.module_provider.c.module,
                 db.module_provider.c.provider
             ]
         ).select_from(
-            db.analytics
+            db.analytics_daily_rollup
         ).join(
             db.module_version,
-            db.module_version.c.id == db.analytics.c.parent_module_version
+            db.module_version.c.id == db.analytics_daily_rollup.c.module_version_id
         ).join(
             db.module_provider,
             db.module_provider.c.id == db.module_version.c.module_provider_id
         ).where(
-            db.analytics.c.timestamp >= (
+            db.analytics_daily_rollup.c.day >= (
                 datetime.datetime.now() -
                 datetime.timedelta(days=7)
-            ),
+            ).date(),
             db.module_version.c.published == True,
             db.module_version.c.beta == False,
             db.module_version.c.internal == False
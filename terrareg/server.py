@@ -12,7 +12,7 @@ from enum import Enum
 from flask import (
     Config, Flask, request, render_template,
     redirect, make_response, send_from_directory,
-    session, g
+    session, g, after_this_request, Response
 )
 from flask_restful import Resource, Api, reqparse, inputs, abort
 
@@ -20,7 +20,7 @@ import terrareg.config
 from terrareg.database import Database
 from terrareg.errors import (
     InvalidModuleNameError, InvalidModuleProviderNameError, InvalidNamespaceNameError, InvalidVersionError, RepositoryUrlParseError, TerraregError, UploadError, NoModuleVersionAvailableError,
-    NoSessionSetError, IncorrectCSRFTokenError
+    NoSessionSetError, IncorrectCSRFTokenError, InvalidSearchCursorError
 )
 from terrareg.models import (
     Example, ExampleFile, Namespace, Module, ModuleProvider,
@@ -31,6 +31,8 @@ from terrareg.module_search import ModuleSearch
 from terrareg.module_extractor import ApiUploadModuleExtractor, GitModuleExtractor
 from terrareg.analytics import AnalyticsEngine
 from terrareg.filters import NamespaceTrustFilter
+from terrareg.trigram_search import TrigramSearchIndex
+from terrareg.cache import ResponseCache
 
 
 def catch_name_exceptions(f):
@@ -452,6 +454,12 @@ class Server(object):
 
         self._app.secret_key = terrareg.config.Config().SECRET_KEY
 
+        # Start periodic removal of analytics outside of retention period
+        AnalyticsEngine.start_retention_schedule()
+
+        # Build in-memory search index, if enabled
+        TrigramSearchIndex.get()
+
         self._app.run(**kwargs)
 
     def _module_provider_404(self, namespace: Namespace, module: Module,
@@ -708,14 +716,121 @@ class ApiTerraformWellKnown(Resource):
 class ErrorCatchingResource(Resource):
     """Provide resource that catches terrareg errors."""
 
+    # Whether successful GET responses are held in the response cache.
+    # Responses are cached against the ETag values of the request,
+    # so _get_etag_values must be implemented to enable caching.
+    CACHE_RESPONSES = False
+    # Request headers that GET responses vary by, used in response cache keys
+    RESPONSE_CACHE_VARY_HEADERS = []
+
     def _get(self, *args, **kwargs):
         """Placeholder for overridable get method."""
         return {'message': 'The method is not allowed for the requested URL.'}, 405
 
+    def _get_etag_values(self, *args, **kwargs):
+        """
+        Return list of values identifying the current state of the GET response, used to generate an ETag.
+
+        Overridable by subclasses. Must not perform more work than is required to
+        identify the state of the response. Returning None disables ETags for the request.
+        """
+        return None
+
+    def _get_etag(self, etag_values):
+        """Return strong ETag for GET request from ETag values."""
+        return hashlib.sha256(
+            json.dumps([type(self).__name__, request.path] + list(etag_values)).encode('utf-8')
+        ).hexdigest()
+
+    def _get_module_provider_etag_values(self, namespace, name, provider, version=None, include_downloads=False):
+        """
+        Return ETag values for responses derived from module provider and its versions.
+
+        Contains the fingerprint of configuration used to generate the responses,
+        so that responses are not reused after the configuration is changed.
+        """
+        api_revision = ModuleProvider.get_api_revision(
+            namespace=namespace, module=name, provider=provider,
+            version=version, include_downloads=include_downloads
+        )
+        if api_revision is None:
+            return None
+        return api_revision + [self._get_module_provider_config_fingerprint()]
+
+    @staticmethod
+    def _get_module_provider_config_fingerprint():
+        """Return fingerprint of configuration used to generate responses for module providers."""
+        return terrareg.config.Config().get_fingerprint([
+            'TRUSTED_NAMESPACES',
+            'TERRAFORM_EXAMPLE_VERSION_TEMPLATE',
+            'ENABLE_SECURITY_SCANNING',
+            'ALLOW_MODULE_HOSTING',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER',
+            'ALLOW_CUSTOM_GIT_URL_MODULE_VERSION',
+            'GIT_PROVIDER_CONFIG',
+        ])
+
+    def _get_response_cache_key(self):
+        """Return key for GET request in response cache."""
+        return (type(self).__name__, request.full_path) + tuple([
+            request.headers.get(header)
+            for header in self.RESPONSE_CACHE_VARY_HEADERS
+        ])
+
+    def _get_cached_response(self, etag_values, *args, **kwargs):
+        """Return response from response cache, obtaining and caching the response if it is not cached."""
+        cache_key = self._get_response_cache_key()
+        cached_response = ResponseCache.get(cache_key, etag_values)
+        if cached_response is not None:
+            # Rebuild responses that were returned as response objects
+            if isinstance(cached_response, tuple):
+                return make_response(*cached_response)
+            return cached_response
+
+        response = self._get(*args, **kwargs)
+
+        # Only cache successful responses, storing response objects
+        # as their contents, as these cannot be shared between requests
+        if isinstance(response, dict):
+            ResponseCache.set(cache_key, etag_values, response)
+        elif isinstance(response, Response) and response.status_code == 200:
+            ResponseCache.set(
+                cache_key, etag_values,
+                (response.get_data(), response.status_code, list(response.headers))
+            )
+
+        return response
+
     def get(self, *args, **kwargs):
         """Run subclasses get in error handling fashion."""
         try:
+            etag_values = self._get_etag_values(*args, **kwargs)
+            if etag_values is not None:
+                etag = self._get_etag(etag_values)
+
+                # Return not modified before obtaining response,
+                # if client already holds current version of response
+                if request.if_none_match.contains(etag):
+                    response = make_response('', 304)
+                    response.set_etag(etag)
+                    return response
+
+                @after_this_request
+                def add_etag_header(response):
+                    if response.status_code == 200:
+                        response.set_etag(etag)
+                    return response
+
+                if self.CACHE_RESPONSES:
+                    return self._get_cached_response(etag_values, *args, **kwargs)
+
             return self._get(*args, **kwargs)
+        # Handle invalid pagination cursor provided by client
+        except InvalidSearchCursorError as exc:
+            return {
+                "status": "Error",
+                "message": str(exc)
+            }, 400
         except TerraregError as exc:
             return {
                 "status": "Error",
@@ -1165,6 +1280,10 @@ class ApiModuleList(ErrorCatchingResource):
             'verified', type=inputs.boolean,
             default=False, help='Limits modules to only verified modules.'
         )
+        parser.add_argument(
+            'cursor', type=str,
+            default=None, help='Pagination cursor, obtained from next_cursor of previous page.'
+        )
 
         args = parser.parse_args()
 
@@ -1172,7 +1291,8 @@ class ApiModuleList(ErrorCatchingResource):
             providers=args.providers,
             verified=args.verified,
             offset=args.offset,
-            limit=args.limit
+            limit=args.limit,
+            cursor=args.cursor
         )
 
         return {
@@ -1228,6 +1348,10 @@ class ApiModuleSearch(ErrorCatchingResource):
             'include_count', type=inputs.boolean, default=False,
             help='Whether to include total result count. This is not part of the Terraform API spec.'
         )
+        parser.add_argument(
+            'cursor', type=str,
+            default=None, help='Pagination cursor, obtained from next_cursor of previous page.'
+        )
 
         args = parser.parse_args()
 
@@ -1250,7 +1374,9 @@ class ApiModuleSearch(ErrorCatchingResource):
             verified=args.verified,
             namespace_trust_filters=namespace_trust_filters,
             offset=args.offset,
-            limit=args.limit
+            limit=args.limit,
+            cursor=args.cursor,
+            include_count=args.include_count
         )
 
         res = {
@@ -1278,13 +1404,18 @@ class ApiNamespaceModules(ErrorCatchingResource):
             'limit', type=int,
             default=10, help='Pagination limit'
         )
+        parser.add_argument(
+            'cursor', type=str,
+            default=None, help='Pagination cursor, obtained from next_cursor of previous page.'
+        )
         args = parser.parse_args()
 
         search_results = ModuleSearch.search_module_providers(
             offset=args.offset,
             limit=args.limit,
             namespaces=[namespace],
-            include_internal=True
+            include_internal=True,
+            cursor=args.cursor
         )
 
         if not search_results.module_providers:
@@ -1310,6 +1441,10 @@ class ApiModuleDetails(ErrorCatchingResource):
             'limit', type=int,
             default=10, help='Pagination limit'
         )
+        parser.add_argument(
+            'cursor', type=str,
+            default=None, help='Pagination cursor, obtained from next_cursor of previous page.'
+        )
         args = parser.parse_args()
 
         namespace, _ = Namespace.extract_analytics_token(namespace)
@@ -1318,7 +1453,8 @@ class ApiModuleDetails(ErrorCatchingResource):
             offset=args.offset,
             limit=args.limit,
             namespaces=[namespace],
-            modules=[name]
+            modules=[name],
+            cursor=args.cursor
         )
 
         if not search_results.module_providers:
@@ -1335,6 +1471,13 @@ class ApiModuleDetails(ErrorCatchingResource):
 
 class ApiModuleProviderDetails(ErrorCatchingResource):
 
+    CACHE_RESPONSES = True
+
+    def _get_etag_values(self, namespace, name, provider):
+        """Return ETag values from module provider revision and downloads of latest version."""
+        namespace, _ = Namespace.extract_analytics_token(namespace)
+        return self._get_module_provider_etag_values(namespace, name, provider, include_downloads=True)
+
     def _get(self, namespace, name, provider):
         """Return list of version."""
 
@@ -1352,6 +1495,13 @@ class ApiModuleProviderDetails(ErrorCatchingResource):
 
 class ApiModuleVersionDetails(ErrorCatchingResource):
 
+    CACHE_RESPONSES = True
+
+    def _get_etag_values(self, namespace, name, provider, version):
+        """Return ETag values from module provider revision and downloads of version."""
+        namespace, _ = Namespace.extract_analytics_token(namespace)
+        return self._get_module_provider_etag_values(namespace, name, provider, version=version, include_downloads=True)
+
     def _get(self, namespace, name, provider, version):
         """Return list of version."""
 
@@ -1369,6 +1519,13 @@ class ApiModuleVersionDetails(ErrorCatchingResource):
 
 class ApiModuleVersions(ErrorCatchingResource):
 
+    CACHE_RESPONSES = True
+
+    def _get_etag_values(self, namespace, name, provider):
+        """Return ETag values from module provider revision."""
+        namespace, _ = Namespace.extract_analytics_token(namespace)
+        return self._get_module_provider_etag_values(namespace, name, provider)
+
     def _get(self, namespace, name, provider):
         """Return list of version."""
 
@@ -1376,46 +1533,64 @@ class ApiModuleVersions(ErrorCatchingResource):
         namespace = Namespace(namespace)
         module = Module(namespace=namespace, name=name)
         module_provider = ModuleProvider(module=module, name=provider)
-        return {
-            "modules": [
-                {
-                    "source": "{namespace}/{module}/{provider}".format(
-                        namespace=namespace.name,
-                        module=module.name,
-                        provider=module_provider.name
-                    ),
-                    "versions": [
-                        {
-                            "version": v.version,
-                            "root": {
-                                # @TODO: Add providers/depdencies
-                                "providers": [],
-                                "dependencies": []
-                            },
-                            # @TODO: Add submodule information
-                            "submodules": []
-                        }
-                        for v in module_provider.get_versions()
-                    ]
-                }
-            ]
-        }
+
+        # Return pre-generated versions document, without re-encoding
+        return make_response(module_provider.get_versions_document(), 200, {'Content-Type': 'application/json'})
 
 
 class ApiModuleVersionDownload(ErrorCatchingResource):
     """Provide download endpoint."""
 
+    def _get_module_version_for_download(self, namespace, name, provider, version):
+        """
+        Return module version and its source download URL.
+
+        The source download URL and the database rows of the module provider and module version
+        are held in the response cache against the ETag values of the module provider.
+        The response itself is not cached, as the analytics token must be checked
+        and the download recorded for every request.
+        Returns None for both values if the module version does not exist.
+        """
+        cache_key = (type(self).__name__, namespace, name, provider, version)
+        etag_values = self._get_module_provider_etag_values(namespace, name, provider)
+
+        cached_download = ResponseCache.get(cache_key, etag_values) if etag_values is not None else None
+        if cached_download is not None:
+            module_provider_row, module_version_row, source_download_url = cached_download
+            module_version = ModuleVersion.get_for_download_from_rows(
+                namespace=namespace, module=name, provider=provider, version=version,
+                module_provider_row=module_provider_row,
+                module_version_row=module_version_row
+            )
+            return module_version, source_download_url
+
+        module_version = ModuleVersion.get_for_download(
+            namespace=namespace, module=name, provider=provider, version=version)
+        if module_version is None:
+            return None, None
+
+        source_download_url = module_version.get_stored_source_download_url()
+        if etag_values is not None:
+            ResponseCache.set(cache_key, etag_values, (
+                dict(module_version._module_provider._get_db_row()),
+                dict(module_version._get_db_row()),
+                source_download_url
+            ))
+        return module_version, source_download_url
+
     def _get(self, namespace, name, provider, version):
         """Provide download header for location to download source."""
         namespace, analytics_token = Namespace.extract_analytics_token(namespace)
-        namespace = Namespace(namespace)
-        module = Module(namespace=namespace, name=name)
-        module_provider = ModuleProvider(module=module, name=provider)
-        module_version = ModuleVersion.get(module_provider=module_provider, version=version)
+        module_version, source_download_url = self._get_module_version_for_download(
+            namespace=namespace, name=name, provider=provider, version=version)
 
         if module_version is None:
             return self._get_404_response()
 
+        module_provider = module_version._module_provider
+        module = module_provider._module
+        namespace = module._namespace
+
         auth_token = None
         auth_token_match = re.match(r'Bearer (.*)', request.headers.get('Authorization', ''))
         if auth_token_match:
@@ -1452,7 +1627,7 @@ class ApiModuleVersionDownload(ErrorCatchingResource):
             )
 
         resp = make_response('', 204)
-        resp.headers['X-Terraform-Get'] = module_version.get_source_download_url()
+        resp.headers['X-Terraform-Get'] = source_download_url
         return resp
 
 
@@ -1628,33 +1803,58 @@ class ApiTerraregNamespaceModules(ErrorCatchingResource):
             'limit', type=int,
             default=10, help='Pagination limit'
         )
+        parser.add_argument(
+            'cursor', type=str,
+            default=None, help='Pagination cursor, obtained from next_cursor of previous page.'
+        )
         args = parser.parse_args()
 
+        cursor_values = ModuleSearch.decode_cursor(args.cursor) if args.cursor else None
+
         namespace_obj = Namespace(name=namespace)
-        module_providers = [
-            module_provider
-            for module in namespace_obj.get_all_modules()
-            for module_provider in module.get_providers()
-        ]
-        if not module_providers:
+        module_providers = namespace_obj.get_module_providers(
+            offset=args.offset,
+            limit=args.limit,
+            cursor_values=cursor_values
+        )
+        # Only check whether the namespace contains any module providers
+        # if the requested page is empty
+        if not module_providers and not namespace_obj.get_all_modules():
             return self._get_404_response()
 
         meta = {
             'limit': args.limit,
             'current_offset': args.offset
         }
-        if len(module_providers) > (args.offset + args.limit):
+        if len(module_providers) > args.limit:
+            module_providers = module_providers[:args.limit]
             meta['next_offset'] = (args.offset + args.limit)
+            meta['next_cursor'] = ModuleSearch.encode_cursor(
+                namespace=namespace_obj.name,
+                module=module_providers[-1]._module.name,
+                provider=module_providers[-1].name
+            )
         if args.offset > 0:
             meta['prev_offset'] = max(args.offset - args.limit, 0)
 
+        latest_versions = [
+            (module_provider, module_provider.get_latest_version())
+            for module_provider in module_providers
+        ]
+        # Obtain download counts for all latest versions in a single query
+        total_downloads = AnalyticsEngine.get_module_versions_total_downloads([
+            latest_version.pk
+            for _, latest_version in latest_versions
+            if latest_version is not None
+        ])
+
         return {
             "meta": meta,
             "modules": [
                 module_provider.get_api_outline()
-                if module_provider.get_latest_version() is None else
-                module_provider.get_latest_version().get_api_outline()
-                for module_provider in module_providers[args.offset:args.offset + args.limit]
+                if latest_version is None else
+                latest_version.get_api_outline(total_downloads=total_downloads[latest_version.pk])
+                for module_provider, latest_version in latest_versions
             ]
         }
 
@@ -1662,6 +1862,10 @@ class ApiTerraregNamespaceModules(ErrorCatchingResource):
 class ApiTerraregModuleProviderDetails(ErrorCatchingResource):
     """Interface to obtain module provider details."""
 
+    def _get_etag_values(self, namespace, name, provider):
+        """Return ETag values from module provider revision and downloads of latest version."""
+        return self._get_module_provider_etag_values(namespace, name, provider, include_downloads=True)
+
     def _get(self, namespace, name, provider):
         """Return details about module version."""
         namespace = Namespace(namespace)
@@ -1683,6 +1887,10 @@ class ApiTerraregModuleProviderDetails(ErrorCatchingResource):
 class ApiTerraregModuleVersionDetails(ErrorCatchingResource):
     """Interface to obtain module verison details."""
 
+    def _get_etag_values(self, namespace, name, provider, version=None):
+        """Return ETag values from module provider revision and downloads of version."""
+        return self._get_module_provider_etag_values(namespace, name, provider, version=version, include_downloads=True)
+
     def _get(self, namespace, name, provider, version=None):
         """Return details about module version."""
         namespace = Namespace(namespace)
@@ -1717,6 +1925,11 @@ class ApiTerraregModuleVersionVariableTemplate(ErrorCatchingResource):
 class ApiTerraregModuleVersionReadmeHtml(ErrorCatchingResource):
     """Provide variable template for module version."""
 
+    def _get_etag_values(self, namespace, name, provider, version):
+        """Return ETag values from module provider revision and request host, used in rendered README."""
+        etag_values = self._get_module_provider_etag_values(namespace, name, provider)
+        return etag_values + [request.host] if etag_values is not None else None
+
     def _get(self, namespace, name, provider, version):
         """Return variable template."""
         namespace = Namespace(namespace)
@@ -2169,6 +2382,10 @@ class ApiTerraregModuleVersionPublish(ErrorCatchingResource):
 class ApiTerraregModuleVerisonSubmodules(ErrorCatchingResource):
     """Interface to obtain list of submodules in module version."""
 
+    def _get_etag_values(self, namespace, name, provider, version):
+        """Return ETag values from module provider revision."""
+        return self._get_module_provider_etag_values(namespace, name, provider)
+
     def _get(self, namespace, name, provider, version):
         """Return list of submodules."""
         namespace = Namespace(name=namespace)
@@ -2194,6 +2411,10 @@ class ApiTerraregModuleVerisonSubmodules(ErrorCatchingResource):
 class ApiTerraregSubmoduleDetails(ErrorCatchingResource):
     """Interface to obtain submodule details."""
 
+    def _get_etag_values(self, namespace, name, provider, version, submodule):
+        """Return ETag values from module provider revision."""
+        return self._get_module_provider_etag_values(namespace, name, provider)
+
     def _get(self, namespace, name, provider, version, submodule):
         """Return details of submodule."""
         namespace_obj = Namespace(name=namespace)
@@ -2215,6 +2436,11 @@ class ApiTerraregSubmoduleDetails(ErrorCatchingResource):
 class ApiTerraregSubmoduleReadmeHtml(ErrorCatchingResource):
     """Interface to obtain submodule REAMDE in HTML format."""
 
+    def _get_etag_values(self, namespace, name, provider, version, submodule):
+        """Return ETag values from module provider revision and request host, used in rendered README."""
+        etag_values = self._get_module_provider_etag_values(namespace, name, provider)
+        return etag_values + [request.host] if etag_values is not None else None
+
     def _get(self, namespace, name, provider, version, submodule):
         """Return HTML formatted README of submodule."""
         namespace_obj = Namespace(name=namespace)
@@ -2236,6 +2462,10 @@ class ApiTerraregSubmoduleReadmeHtml(ErrorCatchingResource):
 class ApiTerraregModuleVersionExamples(ErrorCatchingResource):
     """Interface to obtain list of examples in module version."""
 
+    def _get_etag_values(self, namespace, name, provider, version):
+        """Return ETag values from module provider revision."""
+        return self._get_module_provider_etag_values(namespace, name, provider)
+
     def _get(self, namespace, name, provider, version):
         """Return list of examples."""
         namespace = Namespace(name=namespace)
@@ -2261,6 +2491,10 @@ class ApiTerraregModuleVersionExamples(ErrorCatchingResource):
 class ApiTerraregExampleDetails(ErrorCatchingResource):
     """Interface to obtain example details."""
 
+    def _get_etag_values(self, namespace, name, provider, version, example):
+        """Return ETag values from module provider revision."""
+        return self._get_module_provider_etag_values(namespace, name, provider)
+
     def _get(self, namespace, name, provider, version, example):
         """Return details of example."""
         namespace_obj = Namespace(name=namespace)
@@ -2282,6 +2516,11 @@ class ApiTerraregExampleDetails(ErrorCatchingResource):
 class ApiTerraregExampleReadmeHtml(ErrorCatchingResource):
     """Interface to obtain example REAMDE in HTML format."""
 
+    def _get_etag_values(self, namespace, name, provider, version, example):
+        """Return ETag values from module provider revision and request host, used in rendered README."""
+        etag_values = self._get_module_provider_etag_values(namespace, name, provider)
+        return etag_values + [request.host] if etag_values is not None else None
+
     def _get(self, namespace, name, provider, version, example):
         """Return HTML formatted README of example."""
         namespace_obj = Namespace(name=namespace)
@@ -0,0 +1,339 @@
+"""Provide in-memory trigram index for module search."""
+
+import re
+import threading
+
+from terrareg.config import Config
+from terrareg.database import Database
+from terrareg.filters import NamespaceTrustFilter
+import terrareg.module_search
+
+
+class TrigramSearchIndex(object):
+    """
+    In-memory index of searchable module providers.
+
+    Contains each module provider with a published, non-beta latest version,
+    along with the database rows required to return search results.
+
+    Search terms are matched using the same rules as the database search:
+    namespace, module, description and owner must contain the term and
+    provider and version must match the term, case-insensitively,
+    with LIKE wildcards in search terms being honoured.
+    Candidate module providers for a search term are obtained from the
+    trigrams of the term, which are then filtered by the matching rules.
+    """
+
+    _INSTANCE = None
+    _INSTANCE_LOCK = threading.Lock()
+
+    # Fields matched by whether they contain the search term
+    CONTAINS_FIELDS = ['namespace', 'module', 'description', 'owner']
+    # Fields matched by whether they match the search term
+    EXACT_FIELDS = ['provider', 'version']
+
+    @classmethod
+    def get(cls):
+        """
+        Return in-memory search index, if enabled.
+
+        The index is built from the database on first use.
+        """
+        if not Config().SEARCH_IN_MEMORY_INDEX:
+            return None
+
+        with cls._INSTANCE_LOCK:
+            if cls._INSTANCE is None:
+                instance = cls()
+                instance.build()
+                cls._INSTANCE = instance
+            return cls._INSTANCE
+
+    @classmethod
+    def reset(cls):
+        """Remove in-memory search index, causing it to be rebuilt on next use."""
+        with cls._INSTANCE_LOCK:
+            cls._INSTANCE = None
+
+    @classmethod
+    def update_module_provider(cls, module_provider):
+        """
+        Update module provider in index, if the index has been built.
+
+        If called within a database transaction, the index is updated once the transaction is committed.
+        """
+        if cls._INSTANCE is None:
+            return
+        module_provider_pk = module_provider.pk
+
+        def update_index():
+            instance = cls._INSTANCE
+            if instance is not None:
+                instance._load_module_provider(module_provider_pk)
+
+        Database.run_after_commit(update_index)
+
+    @classmethod
+    def update_module_version(cls, module_version):
+        """
+        Update module provider in index if module version is the latest version, if the index has been built.
+
+        If called within a database transaction, the index is updated once the transaction is committed.
+        """
+        if cls._INSTANCE is None:
+            return
+        module_provider = module_version._module_provider
+        module_version_pk = module_version.pk
+        module_provider_pk = module_provider.pk
+
+        def update_index():
+            instance = cls._INSTANCE
+            if instance is None:
+                return
+            module_provider_row = module_provider._get_db_row()
+            if module_provider_row is not None and module_provider_row['latest_version_id'] == module_version_pk:
+                instance._load_module_provider(module_provider_pk)
+
+        Database.run_after_commit(update_index)
+
+    @classmethod
+    def delete_module_provider(cls, module_provider):
+        """
+        Remove module provider from index, if the index has been built.
+
+        If called within a database transaction, the index is updated once the transaction is committed.
+        """
+        if cls._INSTANCE is None:
+            return
+        module_provider_pk = module_provider.pk
+
+        def update_index():
+            instance = cls._INSTANCE
+            if instance is not None:
+                instance._remove_entry(module_provider_pk)
+
+        Database.run_after_commit(update_index)
+
+    @staticmethod
+    def get_trigrams(value):
+        """Return set of trigrams in value."""
+        return set([value[index:index + 3] for index in range(len(value) - 2)])
+
+    @staticmethod
+    def _get_like_pattern(like_pattern):
+        """Convert LIKE pattern to case-insensitive regular expression."""
+        return re.compile(
+            ''.join([
+                '.*' if character == '%' else
+                '.' if character == '_' else
+                re.escape(character)
+                for character in like_pattern
+            ]),
+            re.IGNORECASE | re.DOTALL
+        )
+
+    def __init__(self):
+        """Setup member variables."""
+        self._lock = threading.Lock()
+        # Index entries, keyed by module provider ID
+        self._entries = {}
+        # Module provider IDs for each trigram of contains fields
+        self._trigram_ids = {}
+        # Module provider IDs for each value of exact fields
+        self._exact_ids = {}
+
+    def _get_outline_select(self):
+        """Return select for outline rows of searchable module providers."""
+        db = Database.get()
+        return terrareg.module_search.ModuleSearch._get_outline_select(
+            db.select_module_provider_joined_latest_module_version(
+                db.module_provider.c.id
+            ).where(
+                db.module_version.c.published == True,
+                db.module_version.c.beta == False
+            ).subquery()
+        )
+
+    def build(self):
+        """Populate index with all searchable module providers."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            rows = conn.execute(self._get_outline_select()).fetchall()
+
+        with self._lock:
+            for row in rows:
+                self._add_entry(row)
+
+    def _load_module_provider(self, module_provider_id):
+        """Replace entry for module provider from database."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            row = conn.execute(self._get_outline_select().where(
+                db.module_provider.c.id == module_provider_id
+            )).fetchone()
+
+        with self._lock:
+            self._remove_entry(module_provider_id, lock=False)
+            if row is not None:
+                self._add_entry(row)
+
+    def _get_entry_keys(self, entry):
+        """Return trigrams of contains fields and lower-cased values of exact fields for entry."""
+        trigrams = set()
+        for field in self.CONTAINS_FIELDS:
+            if entry[field]:
+                trigrams |= self.get_trigrams(entry[field].lower())
+        exact_values = set([
+            entry[field].lower()
+            for field in self.EXACT_FIELDS
+            if entry[field]
+        ])
+        return trigrams, exact_values
+
+    def _add_entry(self, row):
+        """Add entry for outline row to index. Must be called whilst holding lock."""
+        db = Database.get()
+        entry = {
+            'id': row[db.module_provider.c.id],
+            'namespace': row[db.module_provider.c.namespace],
+            'module': row[db.module_provider.c.module],
+            'provider': row[db.module_provider.c.provider],
+            'version': row[db.module_version.c.version],
+            'description': row[db.module_version.c.description],
+            'owner': row[db.module_version.c.owner],
+            'verified': row[db.module_provider.c.verified],
+            'internal': row[db.module_version.c.internal],
+            'row': row
+        }
+        self._entries[entry['id']] = entry
+
+        trigrams, exact_values = self._get_entry_keys(entry)
+        for trigram in trigrams:
+            self._trigram_ids.setdefault(trigram, set()).add(entry['id'])
+        for exact_value in exact_values:
+            self._exact_ids.setdefault(exact_value, set()).add(entry['id'])
+
+    def _remove_entry(self, module_provider_id, lock=True):
+        """Remove entry for module provider from index."""
+        if lock:
+            with self._lock:
+                return self._remove_entry(module_provider_id, lock=False)
+
+        entry = self._entries.pop(module_provider_id, None)
+        if entry is None:
+            return
+
+        trigrams, exact_values = self._get_entry_keys(entry)
+        for trigram in trigrams:
+            self._trigram_ids[trigram].discard(module_provider_id)
+            if not self._trigram_ids[trigram]:
+                del self._trigram_ids[trigram]
+        for exact_value in exact_values:
+            self._exact_ids[exact_value].discard(module_provider_id)
+            if not self._exact_ids[exact_value]:
+                del self._exact_ids[exact_value]
+
+    def _get_term_candidate_ids(self, query_part):
+        """
+        Return IDs of candidate module providers for search term.
+
+        Returns None if all module providers are candidates.
+        """
+        lower_query_part = query_part.lower()
+        if '%' in lower_query_part or '_' in lower_query_part or len(lower_query_part) < 3:
+            return None
+
+        candidate_ids = None
+        for trigram in self.get_trigrams(lower_query_part):
+            trigram_ids = self._trigram_ids.get(trigram, set())
+            candidate_ids = trigram_ids if candidate_ids is None else (candidate_ids & trigram_ids)
+
+        return candidate_ids | self._exact_ids.get(lower_query_part, set())
+
+    def _matches_term(self, entry, contains_pattern, exact_pattern):
+        """Return whether entry matches search term patterns."""
+        for field in self.CONTAINS_FIELDS:
+            if entry[field] and contains_pattern.fullmatch(entry[field]):
+                return True
+        for field in self.EXACT_FIELDS:
+            if entry[field] and exact_pattern.fullmatch(entry[field]):
+                return True
+        return False
+
+    def search(self, offset, limit, cursor_values=None, **search_filters):
+        """
+        Return outline rows of page of module providers matching query and filters
+        and whether there are further matches after the page.
+
+        If cursor values are provided, only module providers ordered after the
+        cursor's namespace, module and provider are returned in the page.
+
+        Download counts in returned rows are not maintained, so must be obtained separately.
+        """
+        matches = self._get_matches(**search_filters)
+
+        if cursor_values:
+            matches = [
+                entry
+                for entry in matches
+                if (entry['namespace'], entry['module'], entry['provider']) > tuple(cursor_values)
+            ]
+        page_matches = matches[offset:offset + limit + 1]
+
+        return [entry['row'] for entry in page_matches[:limit]], len(page_matches) > limit
+
+    def count(self, **search_filters):
+        """Return total count of module providers matching query and filters."""
+        return len(self._get_matches(**search_filters))
+
+    def _get_matches(self, query=None, namespaces=None, modules=None, providers=None,
+                     verified=False, include_internal=False,
+                     namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED):
+        """Return entries matching query and filters, ordered by namespace, module and provider."""
+        query_parts = query.split() if query else []
+
+        with self._lock:
+            # Obtain candidates from intersection of candidates for each search term
+            candidate_ids = None
+            for query_part in query_parts:
+                term_candidate_ids = self._get_term_candidate_ids(query_part)
+                if term_candidate_ids is not None:
+                    candidate_ids = term_candidate_ids if candidate_ids is None else (candidate_ids & term_candidate_ids)
+
+            candidates = (
+                list(self._entries.values())
+                if candidate_ids is None else
+                [self._entries[candidate_id] for candidate_id in candidate_ids]
+            )
+
+        term_patterns = [
+            (self._get_like_pattern('%{0}%'.format(query_part)), self._get_like_pattern(query_part))
+            for query_part in query_parts
+        ]
+        trusted_namespaces = Config().TRUSTED_NAMESPACES
+        include_trusted = include_contributed = True
+        if namespace_trust_filters is not NamespaceTrustFilter.UNSPECIFIED and namespace_trust_filters:
+            include_trusted = NamespaceTrustFilter.TRUSTED_NAMESPACES in namespace_trust_filters
+            include_contributed = NamespaceTrustFilter.CONTRIBUTED in namespace_trust_filters
+
+        matches = []
+        for entry in candidates:
+            if not all([self._matches_term(entry, *patterns) for patterns in term_patterns]):
+                continue
+            if providers and entry['provider'] not in providers:
+                continue
+            if namespaces and entry['namespace'] not in namespaces:
+                continue
+            if modules and entry['module'] not in modules:
+                continue
+            if verified and not entry['verified']:
+                continue
+            if not include_internal and entry['internal']:
+                continue
+            is_trusted = entry['namespace'] in trusted_namespaces
+            if (is_trusted and not include_trusted) or (not is_trusted and not include_contributed):
+                continue
+            matches.append(entry)
+
+        matches.sort(key=lambda entry: (entry['namespace'], entry['module'], entry['provider']))
+        return matches
@@ -100,8 +100,15 @@ class BaseTest:
             conn.execute(db.module_provider.delete())
             conn.execute(db.example_file.delete())
             conn.execute(db.module_details.delete())
+            conn.execute(db.blob.delete())
             conn.execute(db.git_provider.delete())
             conn.execute(db.analytics.delete())
+            conn.execute(db.module_version_download_count.delete())
+            conn.execute(db.analytics_daily_rollup.delete())
+            conn.execute(db.module_search_token.delete())
+            conn.execute(db.versions_document.delete())
+            conn.execute(db.details_document.delete())
+            conn.execute(db.readme_html.delete())
             conn.execute(db.session.delete())
 
         # Setup test git providers
@@ -168,7 +175,8 @@ class BaseTest:
                             'beta': False,
                             'published_at': datetime.now(),
                             'internal': False,
-                            'module_details_id': module_details.pk
+                            'module_details_id': module_details.pk,
+                            **ModuleVersion.get_semantic_version_attributes(version_number)
                         }
 
                         insert = Database.get().module_version.insert().values(
@@ -240,3 +248,7 @@ class BaseTest:
                                 example_file = ExampleFile.create(example=example, path=example_file_path)
                                 example_file.update_attributes(content=example_config['example_files'][example_file_path])
 
+                    # Regenerate versions document, including submodules created after publishing
+                    if module_provider_test_data.get('versions'):
+                        module_provider.update_versions_document()
+
@@ -0,0 +1,87 @@
+
+from unittest import mock
+
+from terrareg.analytics import AnalyticsEngine, AnalyticsWriteBehindQueue
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestAnalyticsWriteBehindQueue(AnalyticsIntegrationTest):
+    """Test write-behind recording of analytics."""
+
+    def _get_module_version(self):
+        """Return test module version."""
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'secondmodule'), 'testprovider'), '1.1.1')
+
+    def _record_download(self, module_version):
+        """Record download of module version."""
+        AnalyticsEngine.record_module_version_download(
+            module_version=module_version, terraform_version='1.0.0',
+            analytics_token='write-behind-app', user_agent=None, auth_token=None)
+
+    def test_write_behind_queue(self):
+        """Test queued downloads are recorded when flushed and dropped when the queue is full."""
+        module_version = self._get_module_version()
+        original_downloads = module_version.get_total_downloads()
+
+        # Create queue, without starting background thread
+        queue = AnalyticsWriteBehindQueue(batch_size=2, flush_interval=60, max_queue_size=3)
+        with mock.patch('terrareg.config.Config.ANALYTICS_WRITE_BEHIND', True), \
+                mock.patch('terrareg.analytics.AnalyticsEngine._WRITE_BEHIND_QUEUE', queue):
+
+            for _ in range(4):
+                self._record_download(module_version)
+
+            # Ensure downloads have been queued and not recorded
+            assert queue.depth == 3
+            assert queue.dropped_count == 1
+            assert module_version.get_total_downloads() == original_downloads
+
+            # Ensure metrics are reported
+            metrics = AnalyticsEngine.get_prometheus_metrics()
+            assert 'analytics_write_behind_queue_depth 3' in metrics
+            assert 'analytics_write_behind_dropped_events 1' in metrics
+
+            queue.flush()
+
+            assert queue.depth == 0
+            assert module_version.get_total_downloads() == original_downloads + 3
+
+    def test_write_behind_queue_drained_on_stop(self):
+        """Test background thread records downloads and remaining downloads are recorded when stopped."""
+        module_version = self._get_module_version()
+        original_downloads = module_version.get_total_downloads()
+
+        queue = AnalyticsWriteBehindQueue(batch_size=100, flush_interval=60, max_queue_size=1000)
+        with mock.patch('atexit.register'):
+            queue.start()
+
+        with mock.patch('terrareg.config.Config.ANALYTICS_WRITE_BEHIND', True), \
+                mock.patch('terrareg.analytics.AnalyticsEngine._WRITE_BEHIND_QUEUE', queue):
+            for _ in range(5):
+                self._record_download(module_version)
+
+        queue.stop()
+
+        assert queue.depth == 0
+        assert queue.dropped_count == 0
+        assert module_version.get_total_downloads() == original_downloads + 5
+
+        # Ensure downloads are dropped after the queue has been stopped
+        assert queue.add({}) is False
+        assert queue.dropped_count == 1
+
+    def test_write_behind_queue_failed_flush(self):
+        """Test failure to record queued downloads is logged and the downloads are dropped."""
+        queue = AnalyticsWriteBehindQueue(batch_size=2, flush_interval=60, max_queue_size=10)
+        for _ in range(3):
+            queue.add({})
+
+        with mock.patch('terrareg.analytics.AnalyticsEngine._insert_analytics_rows', side_effect=Exception('Unittest error')), \
+                mock.patch('terrareg.analytics.logger') as mock_logger:
+            queue.flush()
+
+        assert queue.depth == 0
+        assert queue.dropped_count == 3
+        assert mock_logger.exception.call_count == 2
+        mock_logger.exception.assert_called_with('Failed to record %d module downloads', 1)
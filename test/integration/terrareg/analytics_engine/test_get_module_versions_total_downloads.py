@@ -0,0 +1,48 @@
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestGetModuleVersionsTotalDownloads(AnalyticsIntegrationTest):
+    """Test get_module_versions_total_downloads method."""
+
+    def _get_module_version(self, module_id):
+        """Return module version for ID."""
+        namespace, module, provider, version = module_id.split('/')
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace(namespace), module), provider), version)
+
+    def test_get_module_versions_total_downloads(self):
+        """Test obtaining download counts for multiple module versions."""
+        self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+
+        module_versions = [
+            self._get_module_version(module_id)
+            for module_id in [
+                'testnamespace/publishedmodule/testprovider/1.4.0',
+                'testnamespace/publishedmodule/testprovider/1.5.0',
+                'testnamespace/publishedmodule/secondprovider/1.0.0',
+                'testnamespace/unusedmodule/testprovider/1.2.0',
+            ]
+        ]
+
+        result = AnalyticsEngine.get_module_versions_total_downloads(
+            [module_version.pk for module_version in module_versions]
+        )
+
+        assert result == {
+            module_versions[0].pk: 2,
+            module_versions[1].pk: 8,
+            module_versions[2].pk: 2,
+            # Ensure module version without analytics has a count of 0
+            module_versions[3].pk: 0
+        }
+
+        # Ensure counts match those for individual module versions
+        for module_version in module_versions:
+            assert result[module_version.pk] == AnalyticsEngine.get_module_version_total_downloads(module_version)
+            assert module_version.get_api_outline(total_downloads=result[module_version.pk]) == module_version.get_api_outline()
+
+    def test_get_module_versions_total_downloads_without_module_versions(self):
+        """Test obtaining download counts for an empty list of module versions."""
+        assert AnalyticsEngine.get_module_versions_total_downloads([]) == {}
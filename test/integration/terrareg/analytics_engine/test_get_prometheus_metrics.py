@@ -2,12 +2,44 @@
 
 from unittest import mock
 from terrareg.analytics import AnalyticsEngine
+from terrareg.cache import LRUCache
 from . import AnalyticsIntegrationTest
 
 
+# Exclude cache metrics from caches created by other tests
+@mock.patch('terrareg.cache.CacheBackend.get_caches', mock.MagicMock(return_value=[]))
 class TestGetPrometheusMetrics(AnalyticsIntegrationTest):
     """Test get_prometheus_metrics method."""
 
+    def test_get_prometheus_cache_metrics(self):
+        """Test cache statistics are included in metrics."""
+        cache = LRUCache(name='unittest-metrics', max_size=1)
+        cache.set('first', 'value')
+        cache.get('first')
+        cache.get('doesnotexist')
+        cache.set('second', 'value')
+
+        with mock.patch('terrareg.cache.CacheBackend.get_caches', mock.MagicMock(return_value=[cache])):
+            metrics = AnalyticsEngine.get_prometheus_metrics()
+
+        assert """
+# HELP cache_hits Number of cache lookups that returned a cached value
+# TYPE cache_hits counter
+cache_hits{cache="unittest-metrics"} 1
+# HELP cache_misses Number of cache lookups that did not find a cached value
+# TYPE cache_misses counter
+cache_misses{cache="unittest-metrics"} 1
+# HELP cache_hit_ratio Ratio of cache lookups that returned a cached value
+# TYPE cache_hit_ratio gauge
+cache_hit_ratio{cache="unittest-metrics"} 0.5
+# HELP cache_evictions Number of cache entries removed due to the cache size limit
+# TYPE cache_evictions counter
+cache_evictions{cache="unittest-metrics"} 1
+# HELP cache_size Number of entries in cache
+# TYPE cache_size gauge
+cache_size{cache="unittest-metrics"} 1
+""".strip() in metrics
+
     def test_get_prometheus_with_no_modules(self):
         """Test function with no analytics recorded or module providers."""
         get_total_count_mock = mock.MagicMock(return_value=0)
@@ -0,0 +1,74 @@
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestModuleVersionDownloadCount(AnalyticsIntegrationTest):
+    """Test maintenance of module version download counts."""
+
+    def _get_module_version(self, module_id):
+        """Return module version for ID."""
+        namespace, module, provider, version = module_id.split('/')
+        return ModuleVersion.get(ModuleProvider.get(Module(Namespace(namespace), module), provider), version)
+
+    def _get_download_count_row(self, module_version_pk):
+        """Return row from download count table for module version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return conn.execute(db.module_version_download_count.select().where(
+                db.module_version_download_count.c.parent_module_version == module_version_pk
+            )).fetchone()
+
+    def _get_analytics_count(self, module_version_pk):
+        """Return number of analytics rows for module version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return len(conn.execute(db.analytics.select().where(
+                db.analytics.c.parent_module_version == module_version_pk
+            )).fetchall())
+
+    def test_download_count_maintained(self):
+        """Test that download counts are incremented, migrated and deleted alongside analytics."""
+        self._import_test_analytics(self._TEST_ANALYTICS_DATA)
+
+        # Ensure download counts match number of analytics rows
+        for module_id in self._TEST_ANALYTICS_DATA:
+            module_version = self._get_module_version(module_id)
+            expected_count = len(self._TEST_ANALYTICS_DATA[module_id])
+            assert self._get_download_count_row(module_version.pk)['download_count'] == expected_count
+            assert self._get_analytics_count(module_version.pk) == expected_count
+            assert AnalyticsEngine.get_module_version_total_downloads(module_version) == expected_count
+
+        assert AnalyticsEngine.get_total_downloads() == sum(
+            len(analytics) for analytics in self._TEST_ANALYTICS_DATA.values())
+
+        # Ensure module versions without downloads return 0
+        unused_module_version = self._get_module_version('testnamespace/unusedmodule/testprovider/1.2.0')
+        assert self._get_download_count_row(unused_module_version.pk) is None
+        assert AnalyticsEngine.get_module_version_total_downloads(unused_module_version) == 0
+
+        # Migrate analytics from module version to module version without downloads
+        old_module_version = self._get_module_version('testnamespace/publishedmodule/secondprovider/1.0.0')
+        AnalyticsEngine.migrate_analytics_to_new_module_version(
+            old_version_version_pk=old_module_version.pk,
+            new_module_version=unused_module_version)
+
+        assert self._get_download_count_row(old_module_version.pk) is None
+        assert self._get_download_count_row(unused_module_version.pk)['download_count'] == 2
+
+        # Migrate analytics to module version with existing downloads
+        module_version = self._get_module_version('testnamespace/secondmodule/testprovider/1.1.1')
+        AnalyticsEngine.migrate_analytics_to_new_module_version(
+            old_version_version_pk=unused_module_version.pk,
+            new_module_version=module_version)
+
+        assert self._get_download_count_row(unused_module_version.pk) is None
+        assert self._get_download_count_row(module_version.pk)['download_count'] == 4
+        assert self._get_analytics_count(module_version.pk) == 4
+
+        # Delete analytics for module version
+        AnalyticsEngine.delete_analytics_for_module_version(module_version)
+        assert self._get_download_count_row(module_version.pk) is None
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == 0
@@ -0,0 +1,126 @@
+
+import datetime
+import unittest.mock
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from . import AnalyticsIntegrationTest
+
+
+class TestPurgeAnalytics(AnalyticsIntegrationTest):
+    """Test removal of analytics outside of retention period."""
+
+    def _get_analytics_ids(self, module_version):
+        """Return IDs of analytics for module version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return [
+                row['id']
+                for row in conn.execute(db.analytics.select().where(
+                    db.analytics.c.parent_module_version == module_version.pk
+                ).order_by(db.analytics.c.id))
+            ]
+
+    def _insert_analytics(self, module_version, days_ago, analytics_token):
+        """Insert analytics row for module version."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.analytics.insert().values(
+                parent_module_version=module_version.pk,
+                timestamp=datetime.datetime.now() - datetime.timedelta(days=days_ago),
+                analytics_token=analytics_token,
+                auth_token=None,
+                environment=None
+            ))
+
+    def test_purge_analytics(self):
+        """Test purging old analytics in batches, retaining latest row for each token."""
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), '1.4.0')
+        AnalyticsEngine.delete_analytics_for_module_version(module_version)
+
+        for days_ago in [100, 90, 80, 70]:
+            self._insert_analytics(module_version, days_ago, 'old-application')
+        for days_ago in [100, 50, 5]:
+            self._insert_analytics(module_version, days_ago, 'recent-application')
+        analytics_ids = self._get_analytics_ids(module_version)
+
+        original_stats = AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider)
+        original_total = AnalyticsEngine.get_module_version_total_downloads(module_version)
+
+        with unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30), \
+                unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_BATCH_SIZE', 2):
+            assert AnalyticsEngine.purge_analytics() == 5
+
+        # Latest row for old-application and rows
+        # within retention period should remain
+        assert self._get_analytics_ids(module_version) == [analytics_ids[3], analytics_ids[6]]
+        token_versions = AnalyticsEngine.get_module_provider_token_versions(module_version._module_provider)
+        assert token_versions['old-application']['module_version'] == '1.4.0'
+        assert token_versions['recent-application']['module_version'] == '1.4.0'
+
+        # Ensure download stats and counts are not modified
+        assert AnalyticsEngine.get_module_provider_download_stats(module_version._module_provider) == original_stats
+        assert AnalyticsEngine.get_module_version_total_downloads(module_version) == original_total
+
+        # Ensure re-running does not remove further analytics
+        with unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30):
+            assert AnalyticsEngine.purge_analytics() == 0
+
+    def test_purge_analytics_disabled(self):
+        """Test analytics are not removed when retention is not configured."""
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), '1.4.0')
+        self._insert_analytics(module_version, 1000, 'old-application')
+        analytics_ids = self._get_analytics_ids(module_version)
+
+        with unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 0):
+            assert AnalyticsEngine.purge_analytics() == 0
+            assert AnalyticsEngine.start_retention_schedule() is None
+
+        assert self._get_analytics_ids(module_version) == analytics_ids
+
+    def test_rollup_analytics_respects_retention(self):
+        """Test rollups are not re-generated for days outside of retention period."""
+        db = Database.get()
+        module_version = ModuleVersion.get(ModuleProvider.get(Module(Namespace('testnamespace'), 'publishedmodule'), 'testprovider'), '1.4.0')
+        old_day = datetime.date.today() - datetime.timedelta(days=60)
+        with db.get_connection() as conn:
+            conn.execute(db.analytics_daily_rollup.insert().values(
+                module_provider_id=module_version._module_provider.pk,
+                module_version_id=module_version.pk,
+                day=old_day,
+                environment='Default',
+                analytics_token='purged-application',
+                auth_token_provided=False,
+                download_count=5
+            ))
+
+        with unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30):
+            AnalyticsEngine.rollup_analytics()
+
+        with db.get_connection() as conn:
+            rows = conn.execute(db.analytics_daily_rollup.select().where(
+                db.analytics_daily_rollup.c.analytics_token == 'purged-application'
+            )).fetchall()
+        assert [(row['day'], row['download_count']) for row in rows] == [(old_day, 5)]
+
+    def test_retention_schedule_logs_failure(self):
+        """Test failure to remove analytics in retention schedule is logged and the schedule continues."""
+        class StopSchedule(Exception):
+            pass
+
+        with unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_DAYS', 30), \
+                unittest.mock.patch('terrareg.config.Config.ANALYTICS_RETENTION_INTERVAL', 1), \
+                unittest.mock.patch('threading.Thread') as mock_thread:
+            AnalyticsEngine.start_retention_schedule()
+        run_retention_schedule = mock_thread.call_args.kwargs['target']
+
+        with unittest.mock.patch('terrareg.analytics.AnalyticsEngine.purge_analytics', side_effect=Exception('Unittest error')), \
+                unittest.mock.patch('time.sleep', side_effect=StopSchedule), \
+                unittest.mock.patch('terrareg.analytics.logger') as mock_logger:
+            try:
+                run_retention_schedule()
+            except StopSchedule:
+                pass
+
+        mock_logger.exception.assert_called_once_with('Failed to remove analytics outside of retention period')
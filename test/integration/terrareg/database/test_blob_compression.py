@@ -0,0 +1,96 @@
+
+
+from terrareg.database import Database
+from terrareg.models import ModuleDetails
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestBlobCompression(TerraregIntegrationTest):
+
+    def test_encode_decode_blob(self):
+        """Test large blob values are compressed and all values are decoded."""
+        small_value = 'small value'
+        assert Database.encode_blob(small_value) == small_value.encode('utf-8')
+        assert Database.decode_blob(Database.encode_blob(small_value)) == small_value
+
+        large_value = '{"results": [' + ', '.join(['{"status": 1}'] * 100) + ']}'
+        encoded_value = Database.encode_blob(large_value)
+        assert Database.is_compressed_blob(encoded_value)
+        assert len(encoded_value) < len(large_value)
+        assert Database.decode_blob(encoded_value) == large_value
+
+        # Ensure uncompressed values, stored before compression was added, are decoded
+        assert Database.is_compressed_blob(large_value.encode('utf-8')) is False
+        assert Database.decode_blob(large_value.encode('utf-8')) == large_value
+
+        assert Database.encode_blob(None) == b''
+        assert Database.decode_blob(None) is None
+
+    def test_recompress_blobs(self):
+        """Test recompression of existing uncompressed blob values."""
+        large_readme = 'Large README content\n' * 100
+        small_readme = 'Small README'
+        db = Database.get()
+
+        # Store uncompressed values
+        blob_ids = []
+        for index, readme_content in enumerate([large_readme, small_readme, large_readme + 'other']):
+            with db.get_connection() as conn:
+                blob_ids.append(conn.execute(db.blob.insert().values(
+                    hash='test-recompress-{}'.format(index),
+                    reference_count=1,
+                    content=readme_content.encode('utf-8')
+                )).inserted_primary_key[0])
+
+        try:
+            assert db.recompress_blobs(batch_size=2) >= 2
+
+            with db.get_connection() as conn:
+                rows = conn.execute(db.blob.select().where(
+                    db.blob.c.id.in_(blob_ids)
+                ).order_by(db.blob.c.id)).fetchall()
+
+            assert [Database.is_compressed_blob(row['content']) for row in rows] == [True, False, True]
+            assert [Database.decode_blob(row['content']) for row in rows] == [large_readme, small_readme, large_readme + 'other']
+
+            # Ensure compressed values are not re-encoded
+            assert db.recompress_blobs(batch_size=2) == 0
+
+        finally:
+            with db.get_connection() as conn:
+                conn.execute(db.blob.delete().where(db.blob.c.id.in_(blob_ids)))
+
+    def test_recompress_readme_html(self):
+        """Test recompression of uncompressed README HTML, which uses a composite primary key."""
+        large_html = '<p>Large README HTML</p>\n' * 100
+        db = Database.get()
+        module_details = ModuleDetails.create()
+
+        # Store uncompressed HTML for multiple server hostnames of the same module details
+        server_hostnames = ['recompress-a.example.com', 'recompress-b.example.com']
+        with db.get_connection() as conn:
+            for server_hostname in server_hostnames:
+                conn.execute(db.readme_html.insert().values(
+                    module_details_id=module_details.pk,
+                    server_hostname=server_hostname,
+                    html=(large_html + server_hostname).encode('utf-8')
+                ))
+
+        try:
+            # Ensure all rows are processed when batches split rows of the same module details
+            assert db.recompress_blobs(batch_size=1) >= 2
+
+            with db.get_connection() as conn:
+                rows = conn.execute(db.readme_html.select().where(
+                    db.readme_html.c.module_details_id == module_details.pk
+                ).order_by(db.readme_html.c.server_hostname)).fetchall()
+
+            assert [Database.is_compressed_blob(row['html']) for row in rows] == [True, True]
+            assert [Database.decode_blob(row['html']) for row in rows] == [
+                large_html + server_hostname for server_hostname in server_hostnames
+            ]
+
+            assert db.recompress_blobs(batch_size=1) == 0
+
+        finally:
+            module_details.delete()
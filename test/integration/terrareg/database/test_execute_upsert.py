@@ -0,0 +1,74 @@
+
+import unittest.mock
+
+from terrareg.database import Database
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+class TestExecuteUpsert(TerraregIntegrationTest):
+
+    _TEST_MODULE_VERSION_PK = 987654
+
+    def _get_statements(self, download_count):
+        """Return update and insert statements to increment download count of test row."""
+        db = Database.get()
+        table = db.module_version_download_count
+        return (
+            table.update().where(
+                table.c.parent_module_version == self._TEST_MODULE_VERSION_PK
+            ).values(
+                download_count=(table.c.download_count + download_count)
+            ),
+            table.insert().values(
+                parent_module_version=self._TEST_MODULE_VERSION_PK,
+                download_count=download_count
+            )
+        )
+
+    def _get_download_count(self, conn):
+        """Return download count of test row."""
+        db = Database.get()
+        return conn.execute(db.module_version_download_count.select().where(
+            db.module_version_download_count.c.parent_module_version == self._TEST_MODULE_VERSION_PK
+        )).fetchone()['download_count']
+
+    def teardown_method(self, method):
+        """Remove test row."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_version_download_count.delete().where(
+                db.module_version_download_count.c.parent_module_version == self._TEST_MODULE_VERSION_PK
+            ))
+        super(TestExecuteUpsert, self).teardown_method(method)
+
+    def test_insert_and_update(self):
+        """Test row is inserted if it does not exist and updated if it does."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            assert Database.execute_upsert(conn, *self._get_statements(2)) is not None
+            assert self._get_download_count(conn) == 2
+
+            assert Database.execute_upsert(conn, *self._get_statements(3)) is None
+            assert self._get_download_count(conn) == 5
+
+    def test_row_inserted_before_insert(self):
+        """Test row is updated if it is inserted by another connection after the update statement."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            original_execute = conn.execute
+            concurrent_update, concurrent_insert = self._get_statements(4)
+
+            def execute(statement, *args, **kwargs):
+                res = original_execute(statement, *args, **kwargs)
+                # Insert row after first update statement,
+                # as if performed by another connection
+                if execute.call_count == 0:
+                    original_execute(concurrent_insert)
+                execute.call_count += 1
+                return res
+            execute.call_count = 0
+
+            with unittest.mock.patch.object(conn, 'execute', side_effect=execute):
+                assert Database.execute_upsert(conn, *self._get_statements(3)) is None
+
+            assert self._get_download_count(conn) == 7
@@ -0,0 +1,117 @@
+
+import threading
+import unittest.mock
+
+from terrareg.database import Database
+from terrareg.identity_map import IdentityMap
+from terrareg.models import Module, ModuleVersion, Namespace, ModuleProvider
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+class TestIdentityMap(TerraregIntegrationTest):
+
+    def _get_module_provider(self):
+        """Return test module provider."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='wrongversionorder')
+        return ModuleProvider.get(module=module, name='testprovider')
+
+    def test_no_identity_map_outside_of_context(self):
+        """Test that objects are not shared outside of a request or identity map context."""
+        assert IdentityMap.get_current() is None
+
+        module_provider = self._get_module_provider()
+        assert self._get_module_provider() is not module_provider
+
+        module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+        assert ModuleVersion.get(module_provider=module_provider, version='1.5.4') is not module_version
+
+    def test_objects_shared_within_context(self):
+        """Test that the same object and row are returned for the same natural key."""
+        with IdentityMap.context():
+            module_provider = self._get_module_provider()
+            assert self._get_module_provider() is module_provider
+
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+            assert ModuleVersion.get(module_provider=module_provider, version='1.5.4') is module_version
+
+            # Ensure a new object with the same key obtains the same row
+            new_module_version = ModuleVersion(module_provider=module_provider, version='1.5.4')
+            assert new_module_version._get_db_row() is module_version._get_db_row()
+
+            # Ensure different versions are not shared
+            assert ModuleVersion.get(module_provider=module_provider, version='2.1.0') is not module_version
+
+        # Ensure identity map is removed after context
+        assert IdentityMap.get_current() is None
+
+    def test_context_local_to_thread(self):
+        """Test that identity map context is not shared with other threads."""
+        other_thread_identity_maps = []
+
+        def get_other_thread_identity_map():
+            other_thread_identity_maps.append(IdentityMap.get_current())
+
+        with IdentityMap.context() as identity_map:
+            assert IdentityMap.get_current() is identity_map
+
+            thread = threading.Thread(target=get_other_thread_identity_map)
+            thread.start()
+            thread.join()
+
+        assert other_thread_identity_maps == [None]
+
+    def test_rows_shared_within_request_context(self, test_request_context):
+        """Test that rows are only queried once per request."""
+        with test_request_context:
+            module_provider = self._get_module_provider()
+            module_provider._get_db_row()
+
+            with unittest.mock.patch('terrareg.models.ModuleProvider._select_db_row') as mock_select_db_row:
+                new_module_provider = ModuleProvider(module=module_provider._module, name='testprovider')
+                assert new_module_provider._get_db_row() is module_provider._get_db_row()
+                mock_select_db_row.assert_not_called()
+
+    def test_non_existent_rows_not_cached(self):
+        """Test that non-existent objects are not cached."""
+        with IdentityMap.context() as identity_map:
+            namespace = Namespace(name='testnamespace')
+            module = Module(namespace=namespace, name='wrongversionorder')
+            assert ModuleProvider.get(module=module, name='doesnotexist') is None
+            assert identity_map._rows == {}
+
+    def test_update_attributes_evicts_row(self):
+        """Test that updating an object removes the row from the identity map."""
+        with IdentityMap.context():
+            module_provider = self._get_module_provider()
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+            original_row = module_version._get_db_row()
+            original_owner = original_row['owner']
+
+            try:
+                module_version.update_attributes(owner='Updated owner')
+
+                new_module_version = ModuleVersion.get(module_provider=module_provider, version='1.5.4')
+                assert new_module_version is not module_version
+                assert new_module_version._get_db_row() is not original_row
+                assert new_module_version._get_db_row()['owner'] == 'Updated owner'
+            finally:
+                module_version.update_attributes(owner=original_owner)
+
+    def test_delete_evicts_row(self):
+        """Test that deleting an object removes the row from the identity map."""
+        with IdentityMap.context():
+            namespace = Namespace(name='testnamespace')
+            module = Module(namespace=namespace, name='identitymapdelete')
+            ModuleProvider.get(module=module, name='testprovider', create=True)
+            module_provider = ModuleProvider.get(module=module, name='testprovider')
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+            assert module_version is not None
+
+            module_provider.delete()
+
+            assert ModuleVersion.get(module_provider=module_provider, version='1.0.0') is None
+            assert ModuleProvider.get(module=module, name='testprovider') is None
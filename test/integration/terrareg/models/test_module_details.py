@@ -7,7 +7,7 @@ import pytest
 import sqlalchemy
 
 from terrareg.database import Database
-from terrareg.models import Example, ExampleFile, Module, ModuleDetails, Namespace, ModuleProvider, ModuleVersion
+from terrareg.models import Blob, Example, ExampleFile, Module, ModuleDetails, Namespace, ModuleProvider, ModuleVersion
 import terrareg.errors
 from test.integration.terrareg import TerraregIntegrationTest
 
@@ -84,3 +84,177 @@ class TestModuleDetails(TerraregIntegrationTest):
             ).fetchone()
 
         assert res == None
+
+    def test_column_loading(self):
+        """Test blob columns are only obtained when used"""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(
+            readme_content='test readme content',
+            terraform_docs='{"test": "output"}',
+            tfsec='{"results": [{"status": 0}]}'
+        )
+
+        module_details = ModuleDetails(id=module_details.pk)
+        with unittest.mock.patch('terrareg.models.ModuleDetails._select_columns',
+                                 side_effect=module_details._select_columns) as mock_select_columns:
+            assert module_details.tfsec == {'results': [{'status': 0}]}
+            mock_select_columns.assert_called_once_with(['tfsec'])
+
+            # Ensure obtained column is not re-obtained
+            assert module_details.tfsec == {'results': [{'status': 0}]}
+            mock_select_columns.assert_called_once_with(['tfsec'])
+
+            assert module_details.readme_content == Database.encode_blob('test readme content')
+            mock_select_columns.assert_called_with(['readme_content'])
+            assert mock_select_columns.call_count == 2
+
+    def test_column_loading_with_required_columns(self):
+        """Test required blob columns are obtained in a single query"""
+        module_details = ModuleDetails.create()
+        module_details.update_attributes(
+            readme_content='test readme content',
+            terraform_docs='{"test": "output"}'
+        )
+
+        module_details = ModuleDetails(id=module_details.pk, columns=['readme_content', 'terraform_docs'])
+        with unittest.mock.patch('terrareg.models.ModuleDetails._select_columns',
+                                 side_effect=module_details._select_columns) as mock_select_columns:
+            assert module_details.terraform_docs == Database.encode_blob('{"test": "output"}')
+            assert module_details.readme_content == Database.encode_blob('test readme content')
+            mock_select_columns.assert_called_once_with(['readme_content', 'terraform_docs'])
+
+    def test_column_loading_non_existent(self):
+        """Test obtaining columns of non-existent module details"""
+        module_details = ModuleDetails(id=999999)
+        assert module_details.readme_content is None
+        assert module_details.tfsec == {'results': None}
+        assert module_details.infracost == {}
+
+    def test_tfsec_failure_counts(self):
+        """Test tfsec failure counts are calculated when tfsec output is stored"""
+        module_details = ModuleDetails.create()
+        assert module_details.tfsec_failure_counts == {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+
+        module_details.update_attributes(tfsec=json.dumps({'results': [
+            {'status': 0, 'severity': 'CRITICAL'},
+            {'status': 0, 'severity': 'HIGH'},
+            {'status': 0, 'severity': 'HIGH'},
+            {'status': 1, 'severity': 'MEDIUM'},
+            {'status': 0, 'severity': 'LOW'},
+            {'status': 0, 'severity': 'UNKNOWN'},
+        ]}))
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            row = conn.execute(db.module_details.select().where(
+                db.module_details.c.id == module_details.pk
+            )).fetchone()
+        assert row['tfsec_critical_count'] == 1
+        assert row['tfsec_high_count'] == 2
+        assert row['tfsec_medium_count'] == 0
+        assert row['tfsec_low_count'] == 2
+
+        # Ensure counts are obtained without obtaining tfsec output
+        module_details = ModuleDetails(id=module_details.pk)
+        with unittest.mock.patch('terrareg.models.ModuleDetails._select_columns',
+                                 side_effect=module_details._select_columns) as mock_select_columns:
+            assert module_details.tfsec_failure_counts == {'critical': 1, 'high': 2, 'medium': 0, 'low': 2}
+            mock_select_columns.assert_called_once_with(ModuleDetails.TFSEC_FAILURE_COUNT_COLUMNS)
+
+        # Ensure no failures are returned when security scanning is disabled
+        with unittest.mock.patch('terrareg.config.Config.ENABLE_SECURITY_SCANNING', False):
+            assert module_details.tfsec_failure_counts == {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+
+        module_details.update_attributes(tfsec=json.dumps({'results': None}))
+        assert ModuleDetails(id=module_details.pk).tfsec_failure_counts == {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+
+    def test_blob_deduplication(self):
+        """Test identical blob values are stored once and removed when no longer referenced"""
+        db = Database.get()
+
+        def get_blob_row(module_details, column):
+            with db.get_connection() as conn:
+                return conn.execute(db.blob.select().select_from(db.module_details).join(
+                    db.blob,
+                    db.blob.c.id == db.module_details.c['{}_blob_id'.format(column)]
+                ).where(
+                    db.module_details.c.id == module_details.pk
+                )).fetchone()
+
+        first_module_details = ModuleDetails.create()
+        first_module_details.update_attributes(readme_content='duplicate readme content', terraform_docs='{"first": "output"}')
+        second_module_details = ModuleDetails.create()
+        second_module_details.update_attributes(readme_content='duplicate readme content', terraform_docs='{"second": "output"}')
+
+        # Ensure README content is shared
+        readme_blob = get_blob_row(first_module_details, 'readme_content')
+        assert get_blob_row(second_module_details, 'readme_content')['id'] == readme_blob['id']
+        assert readme_blob['reference_count'] == 2
+        assert get_blob_row(first_module_details, 'terraform_docs')['id'] != get_blob_row(second_module_details, 'terraform_docs')['id']
+
+        assert ModuleDetails(id=first_module_details.pk).readme_content == Database.encode_blob('duplicate readme content')
+        assert ModuleDetails(id=second_module_details.pk).readme_content == Database.encode_blob('duplicate readme content')
+
+        # Ensure updating value removes reference to previous blob
+        first_module_details.update_attributes(readme_content='updated readme content')
+        assert get_blob_row(second_module_details, 'readme_content')['reference_count'] == 1
+        assert ModuleDetails(id=second_module_details.pk).readme_content == Database.encode_blob('duplicate readme content')
+
+        # Ensure blobs are removed once no longer referenced
+        first_terraform_docs_blob_id = get_blob_row(first_module_details, 'terraform_docs')['id']
+        first_module_details.delete()
+        second_module_details.delete()
+        with db.get_connection() as conn:
+            assert conn.execute(db.blob.select().where(
+                db.blob.c.id.in_([readme_blob['id'], first_terraform_docs_blob_id])
+            )).fetchall() == []
+
+    def test_blob_none_value(self):
+        """Test no blob is stored for values of None"""
+        db = Database.get()
+        module_details = ModuleDetails.create()
+        try:
+            module_details.update_attributes(readme_content='readme content')
+            module_details.update_attributes(readme_content=None)
+
+            with db.get_connection() as conn:
+                assert conn.execute(sqlalchemy.select(db.module_details.c.readme_content_blob_id).where(
+                    db.module_details.c.id == module_details.pk
+                )).scalar() is None
+            assert ModuleDetails(id=module_details.pk).readme_content is None
+        finally:
+            module_details.delete()
+
+    def test_blob_created_concurrently(self):
+        """Test reference is added to blob that is created by another connection after the blob is checked for"""
+        db = Database.get()
+        content = 'concurrently created blob content'
+        try:
+            with db.get_connection() as conn:
+                original_execute = conn.execute
+
+                def execute(statement, *args, **kwargs):
+                    res = original_execute(statement, *args, **kwargs)
+                    # Insert blob after first update statement,
+                    # as if performed by another connection
+                    if execute.call_count == 0:
+                        original_execute(db.blob.insert().values(
+                            hash=Blob.get_hash(content),
+                            reference_count=1,
+                            content=Database.encode_blob(content)
+                        ))
+                    execute.call_count += 1
+                    return res
+                execute.call_count = 0
+
+                with unittest.mock.patch.object(conn, 'execute', side_effect=execute), \
+                        unittest.mock.patch.object(db, 'get_connection', return_value=conn):
+                    blob_id = Blob.create(content)
+
+            with db.get_connection() as conn:
+                row = conn.execute(db.blob.select().where(db.blob.c.id == blob_id)).fetchone()
+            assert row['hash'] == Blob.get_hash(content)
+            assert row['reference_count'] == 2
+        finally:
+            with db.get_connection() as conn:
+                conn.execute(db.blob.delete().where(db.blob.c.hash == Blob.get_hash(content)))
@@ -1,9 +1,10 @@
 
+import json
 from unittest import mock
 import pytest
 from terrareg.database import Database
 
-from terrareg.models import Module, ModuleVersion, Namespace, ModuleProvider
+from terrareg.models import GitProvider, Module, ModuleDetails, ModuleVersion, Namespace, ModuleProvider, Submodule
 import terrareg.errors
 from test.integration.terrareg import TerraregIntegrationTest
 
@@ -90,6 +91,24 @@ class TestModuleProvider(TerraregIntegrationTest):
             '0.1.1', '0.0.9'
         ]
 
+    def test_module_provider_get_versions_pre_release_order(self):
+        """Test that pre-release versions are ordered before the release of the same version."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='prereleaseorder')
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+        try:
+            for version in ['1.0.0-beta', '1.0.0', '0.9.0', '1.0.0-alpha', '1.0.1-alpha', '1.0.0-beta10', '1.0.0-beta2']:
+                module_version = ModuleVersion(module_provider=module_provider, version=version)
+                module_version.prepare_module()
+                module_version.publish()
+
+            assert [mv.version for mv in module_provider.get_versions()] == [
+                '1.0.1-alpha', '1.0.0', '1.0.0-beta10', '1.0.0-beta2', '1.0.0-beta', '1.0.0-alpha', '0.9.0'
+            ]
+            assert module_provider.calculate_latest_version().version == '1.0.0'
+        finally:
+            module_provider.delete()
+
     def test_module_provider_get_latest_version(self):
         """
         Test that a module provider with versions in the wrong order return correct
@@ -276,3 +295,180 @@ class TestModuleProvider(TerraregIntegrationTest):
             for mv_pk in module_version_pks:
                 res = conn.execute(db.module_version.select().where(db.module_version.c.id==mv_pk))
                 assert res.fetchone() is None
+
+    def test_get_versions_document(self):
+        """Test versions document is generated from published versions, including providers and submodules."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='versions-document')
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+        module_provider_pk = module_provider.pk
+
+        try:
+            # Ensure document is empty before any versions are published
+            assert json.loads(module_provider.get_versions_document()) == {
+                'modules': [{'source': 'testnamespace/versions-document/testprovider', 'versions': []}]
+            }
+
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+            module_details = ModuleDetails.create()
+            module_details.update_attributes(terraform_docs=json.dumps({
+                'providers': [{'name': 'random', 'alias': None, 'version': '>= 3.0.0'}]
+            }))
+            module_version.update_attributes(module_details_id=module_details.pk)
+
+            submodule = Submodule.create(module_version=module_version, module_path='modules/submodule')
+            submodule_details = ModuleDetails.create()
+            submodule_details.update_attributes(terraform_docs=json.dumps({
+                'providers': [{'name': 'hashicorp/aws', 'alias': None, 'version': None}]
+            }))
+            submodule.update_attributes(module_details_id=submodule_details.pk)
+
+            # Ensure unpublished version is not present in document
+            assert json.loads(module_provider.get_versions_document())['modules'][0]['versions'] == []
+
+            module_version.publish()
+
+            assert json.loads(module_provider.get_versions_document()) == {
+                'modules': [{
+                    'source': 'testnamespace/versions-document/testprovider',
+                    'versions': [{
+                        'version': '1.0.0',
+                        'root': {
+                            'providers': [{'name': 'random', 'namespace': 'hashicorp', 'source': '', 'version': '>= 3.0.0'}],
+                            'dependencies': []
+                        },
+                        'submodules': [{
+                            'path': 'modules/submodule',
+                            'providers': [{'name': 'aws', 'namespace': 'hashicorp', 'source': '', 'version': ''}],
+                            'dependencies': []
+                        }]
+                    }]
+                }]
+            }
+
+            # Publish further version and ensure document is regenerated
+            module_version_2 = ModuleVersion(module_provider=module_provider, version='1.1.0')
+            module_version_2.prepare_module()
+            module_version_2.publish()
+            assert [
+                version['version']
+                for version in json.loads(module_provider.get_versions_document())['modules'][0]['versions']
+            ] == ['1.1.0', '1.0.0']
+
+            # Delete version and ensure it is removed from document
+            module_version_2.delete()
+            assert [
+                version['version']
+                for version in json.loads(module_provider.get_versions_document())['modules'][0]['versions']
+            ] == ['1.0.0']
+
+        finally:
+            module_provider.delete()
+
+        # Ensure stored document is removed with module provider
+        db = Database.get()
+        with db.get_connection() as conn:
+            assert conn.execute(db.versions_document.select().where(
+                db.versions_document.c.module_provider_id == module_provider_pk
+            )).fetchone() is None
+
+    def test_get_api_revision(self):
+        """Test API revision is incremented by modifications to module provider and versions."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='api-revision')
+
+        assert ModuleProvider.get_api_revision(
+            namespace='testnamespace', module='api-revision', provider='testprovider') is None
+
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+
+        try:
+            def get_api_revision(**kwargs):
+                return ModuleProvider.get_api_revision(
+                    namespace='testnamespace', module='api-revision', provider='testprovider', **kwargs)
+
+            revision = get_api_revision()[0]
+
+            module_provider.update_attributes(verified=True)
+            assert get_api_revision()[0] > revision
+            revision = get_api_revision()[0]
+
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+            assert get_api_revision()[0] > revision
+            revision = get_api_revision()[0]
+
+            module_version.publish()
+            assert get_api_revision()[0] > revision
+            revision = get_api_revision()[0]
+
+            # Ensure creating another provider for the module increments the revision,
+            # as the providers of the module are returned in API responses
+            second_module_provider = ModuleProvider.get(module=module, name='secondprovider', create=True)
+            assert get_api_revision()[0] > revision
+            revision = get_api_revision()[0]
+
+            second_module_provider.delete()
+            assert get_api_revision()[0] > revision
+            revision = get_api_revision()[0]
+
+            # Ensure download count of latest version or given version is returned
+            assert get_api_revision(include_downloads=True) == [revision, 0]
+            db = Database.get()
+            with db.get_connection() as conn:
+                conn.execute(db.module_version_download_count.insert().values(
+                    parent_module_version=module_version.pk,
+                    download_count=12
+                ))
+            assert get_api_revision(include_downloads=True) == [revision, 12]
+            assert get_api_revision(version='1.0.0', include_downloads=True) == [revision, 12]
+            assert get_api_revision(version='1.1.0', include_downloads=True) == [revision, 0]
+
+            module_version.delete()
+            assert get_api_revision()[0] > revision
+
+        finally:
+            module_provider.delete()
+
+    def test_git_provider_config_changes_increment_revision(self):
+        """Test API revision of module providers using git provider is incremented when git provider config is modified."""
+        def get_api_revision(module='git-provider-urls'):
+            return ModuleProvider.get_api_revision(
+                namespace='repo_url_tests', module=module, provider='test')[0]
+
+        def get_git_provider_config(**kwargs):
+            config = {
+                'name': 'repo_url_tests',
+                'base_url': 'https://base-url.com/{namespace}/{module}-{provider}',
+                'browse_url': 'https://browse-url.com/{namespace}/{module}-{provider}/browse/{tag}/{path}suffix',
+                'clone_url': 'ssh://clone-url.com/{namespace}/{module}-{provider}'
+            }
+            config.update(kwargs)
+            return json.dumps([config])
+
+        revision = get_api_revision()
+        other_revision = get_api_revision(module='module-provider-urls')
+        try:
+            # Ensure revision is not modified if git provider config is unchanged
+            with mock.patch('terrareg.config.Config.GIT_PROVIDER_CONFIG', get_git_provider_config()):
+                GitProvider.initialise_from_config()
+            assert get_api_revision() == revision
+
+            with mock.patch('terrareg.config.Config.GIT_PROVIDER_CONFIG', get_git_provider_config(
+                    browse_url='https://new-browse-url.com/{namespace}/{module}-{provider}/browse/{tag}/{path}')):
+                GitProvider.initialise_from_config()
+            assert get_api_revision() > revision
+            revision = get_api_revision()
+
+            with mock.patch('terrareg.config.Config.GIT_PROVIDER_CONFIG', get_git_provider_config(
+                    clone_url='ssh://new-clone-url.com/{namespace}/{module}-{provider}')):
+                GitProvider.initialise_from_config()
+            assert get_api_revision() > revision
+
+            # Ensure revision of module provider not using the git provider is not modified
+            assert get_api_revision(module='module-provider-urls') == other_revision
+
+        finally:
+            with mock.patch('terrareg.config.Config.GIT_PROVIDER_CONFIG', get_git_provider_config()):
+                GitProvider.initialise_from_config()
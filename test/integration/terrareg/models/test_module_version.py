@@ -1,4 +1,5 @@
 
+import json
 from datetime import datetime
 import unittest.mock
 import pytest
@@ -50,6 +51,22 @@ class TestModuleVersion(TerraregIntegrationTest):
         module_version = ModuleVersion(module_provider=module_provider, version=version)
         assert module_version._extracted_beta_flag == beta
 
+    @pytest.mark.parametrize('version,expected_attributes', [
+        ('1.1.1', (1, 1, 1, None, None)),
+        ('13.14.16', (13, 14, 16, None, None)),
+        ('01.010.09', (1, 10, 9, None, None)),
+        ('1.2.3-alpha', (1, 2, 3, 'alpha', 'alpha')),
+        ('1.2.2-123', (1, 2, 2, '123', '03123')),
+        ('1.2.2-beta2', (1, 2, 2, 'beta2', 'beta012')),
+        ('1.2.2-rc10a1', (1, 2, 2, 'rc10a1', 'rc0210a011'))
+    ])
+    def test_get_semantic_version_attributes(self, version, expected_attributes):
+        """Test parsing of semantic version components of module versions"""
+        assert ModuleVersion.get_semantic_version_attributes(version) == dict(zip(
+            ['version_major', 'version_minor', 'version_patch', 'version_prerelease', 'version_prerelease_sort_key'],
+            expected_attributes
+        ))
+
     def test_create_db_row(self):
         """Test creating DB row"""
         namespace = Namespace(name='testcreation')
@@ -75,10 +92,16 @@ class TestModuleVersion(TerraregIntegrationTest):
 
         assert new_db_row['beta'] == False
 
+        assert new_db_row['version_major'] == 1
+        assert new_db_row['version_minor'] == 0
+        assert new_db_row['version_patch'] == 0
+        assert new_db_row['version_prerelease'] == None
+        assert new_db_row['version_prerelease_sort_key'] == None
+
         for attr in ['description', 'module_details_id', 'owner',
                      'published_at', 'repo_base_url_template',
                      'repo_browse_url_template', 'repo_clone_url_template',
-                     'variable_template']:
+                     'source_download_url', 'variable_template']:
             assert new_db_row[attr] == None
 
     def test_create_beta_version(self):
@@ -153,7 +176,7 @@ class TestModuleVersion(TerraregIntegrationTest):
                 id=10004,
                 submodule_id=10002,
                 path='testfile.tf',
-                content=None
+                content_blob_id=None
             ))
 
             # Create download analytics
@@ -635,6 +658,40 @@ module &quot;test-usage3&quot; {
 
             assert module_version.get_readme_html(server_hostname='example.com').strip() == expected_output.strip()
 
+    def test_get_readme_html_stored(self):
+        """Test get_readme_html stores rendered HTML for the domain name and removes it when module details are updated."""
+        module_version = ModuleVersion(ModuleProvider(Module(Namespace('moduledetails'), 'readme-tests'), 'provider'), '1.0.0')
+        module_version.module_details.update_attributes(readme_content='# Stored README')
+        assert module_version.module_details.get_readme_html(server_hostname='example.com') is None
+
+        with unittest.mock.patch('terrareg.config.Config.DOMAIN_NAME', 'example.com'):
+            assert module_version.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+            assert module_version.module_details.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+
+            # Ensure stored HTML is returned without rendering README
+            with unittest.mock.patch('terrareg.models.ModuleVersion._render_readme_html') as mock_render_readme_html:
+                assert module_version.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+                mock_render_readme_html.assert_not_called()
+
+                # Ensure HTML is rendered, but not stored, for other hostnames
+                mock_render_readme_html.return_value = '<p>Other hostname</p>'
+                assert module_version.get_readme_html(server_hostname='other.example.com') == '<p>Other hostname</p>'
+                mock_render_readme_html.assert_called_once_with('other.example.com')
+
+            assert module_version.module_details.get_readme_html(server_hostname='other.example.com') is None
+            assert module_version.module_details.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+
+            # Ensure HTML is rendered again after configuration used in README is modified
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_EXAMPLE_VERSION_TEMPLATE', '= {major}.{minor}.{patch}'):
+                assert module_version.module_details.get_readme_html(server_hostname='example.com') is None
+                assert module_version.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+                assert module_version.module_details.get_readme_html(server_hostname='example.com').strip() == '<h1>Stored README</h1>'
+
+            # Ensure updating module details removes stored HTML
+            module_version.module_details.update_attributes(readme_content='# Updated README')
+            assert module_version.module_details.get_readme_html(server_hostname='example.com') is None
+            assert module_version.get_readme_html(server_hostname='example.com').strip() == '<h1>Updated README</h1>'
+
     def test_git_path(self):
         """Test git_path property"""
         # Ensure the git_path from the module provider is returned
@@ -1182,3 +1239,160 @@ module &quot;test-usage3&quot; {
 
         finally:
             module_provider.update_git_path(None)
+
+    def test_stored_source_download_url(self):
+        """Ensure stored source download URL is generated on publish and re-generated on git configuration changes."""
+        namespace = Namespace(name='testcreation')
+        module = Module(namespace=namespace, name='test-stored-download-url')
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+
+        try:
+            module_provider.update_repo_clone_url_template('ssh://example.com/{namespace}/{module}-{provider}.git')
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+
+            # Ensure URL is not stored before the module version is published
+            assert module_version._get_db_row()['source_download_url'] is None
+
+            module_version.publish()
+            assert module_version._get_db_row()['source_download_url'] == 'git::ssh://example.com/testcreation/test-stored-download-url-testprovider.git?ref=1.0.0'
+
+            # Ensure stored URL is updated when git configuration of module provider changes
+            module_provider.update_git_path('subdir')
+            module_provider.update_git_tag_format('v{version}')
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+            assert module_version._get_db_row()['source_download_url'] == 'git::ssh://example.com/testcreation/test-stored-download-url-testprovider.git//subdir?ref=v1.0.0'
+            assert module_version.get_stored_source_download_url() == module_version.get_source_download_url()
+
+        finally:
+            module_provider.delete()
+
+    def test_get_stored_source_download_url_populates_missing_url(self):
+        """Ensure source download URL is generated and stored when not already stored."""
+        namespace = Namespace(name='repo_url_tests')
+        module = Module(namespace=namespace, name='git-provider-urls')
+        module_provider = ModuleProvider.get(module=module, name='test')
+        module_version = ModuleVersion.get(module_provider=module_provider, version='1.1.0')
+
+        db = Database.get()
+        with db.get_connection() as conn:
+            conn.execute(db.module_version.update().where(
+                db.module_version.c.id == module_version.pk
+            ).values(source_download_url=None))
+        module_version = ModuleVersion.get(module_provider=module_provider, version='1.1.0')
+
+        assert module_version.get_stored_source_download_url() == 'git::ssh://clone-url.com/repo_url_tests/git-provider-urls-test?ref=1.1.0'
+        assert ModuleVersion.get(module_provider=module_provider, version='1.1.0')._get_db_row()['source_download_url'] == 'git::ssh://clone-url.com/repo_url_tests/git-provider-urls-test?ref=1.1.0'
+
+    def test_get_stored_source_download_url_regenerated_on_config_change(self):
+        """Ensure stored source download URL is re-generated when configuration used to generate it is modified."""
+        namespace = Namespace(name='repo_url_tests')
+        module = Module(namespace=namespace, name='module-provider-urls')
+        module_provider = ModuleProvider.get(module=module, name='test')
+        module_version = ModuleVersion.get(module_provider=module_provider, version='1.2.0')
+
+        try:
+            assert module_version.get_stored_source_download_url() == 'git::ssh://mp-clone-url.com/repo_url_tests/module-provider-urls-test?ref=1.2.0'
+
+            with unittest.mock.patch('terrareg.config.Config.ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER', False):
+                module_version = ModuleVersion.get(module_provider=module_provider, version='1.2.0')
+                assert module_version.get_stored_source_download_url() == '/v1/terrareg/modules/repo_url_tests/module-provider-urls/test/1.2.0/source.zip'
+                assert ModuleVersion.get(module_provider=module_provider, version='1.2.0')._get_db_row()['source_download_url'] == '/v1/terrareg/modules/repo_url_tests/module-provider-urls/test/1.2.0/source.zip'
+
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.2.0')
+            assert module_version.get_stored_source_download_url() == 'git::ssh://mp-clone-url.com/repo_url_tests/module-provider-urls-test?ref=1.2.0'
+
+        finally:
+            ModuleVersion.get(module_provider=module_provider, version='1.2.0').update_source_download_url()
+
+    def test_get_for_download(self):
+        """Ensure module version for download is obtained with a single query."""
+        db = Database.get()
+        with unittest.mock.patch.object(db, 'get_connection', wraps=db.get_connection) as mock_get_connection:
+            module_version = ModuleVersion.get_for_download('repo_url_tests', 'git-provider-urls', 'test', '1.1.0')
+
+            assert module_version.version == '1.1.0'
+            assert module_version._module_provider.name == 'test'
+            assert module_version._get_db_row()['module_provider_id'] == module_version._module_provider._get_db_row()['id']
+            mock_get_connection.assert_called_once()
+
+        assert ModuleVersion.get_for_download('repo_url_tests', 'git-provider-urls', 'test', '5.2.1') is None
+        assert ModuleVersion.get_for_download('repo_url_tests', 'doesnotexist', 'test', '1.1.0') is None
+
+    def test_get_for_download_from_rows(self):
+        """Ensure module version for download is created from rows without performing queries."""
+        module_version = ModuleVersion.get_for_download('repo_url_tests', 'git-provider-urls', 'test', '1.1.0')
+        module_provider_row = module_version._module_provider._get_db_row()
+        module_version_row = module_version._get_db_row()
+
+        db = Database.get()
+        with unittest.mock.patch.object(db, 'get_connection', wraps=db.get_connection) as mock_get_connection:
+            cached_module_version = ModuleVersion.get_for_download_from_rows(
+                'repo_url_tests', 'git-provider-urls', 'test', '1.1.0',
+                module_provider_row=module_provider_row,
+                module_version_row=module_version_row
+            )
+
+            assert cached_module_version.pk == module_version.pk
+            assert cached_module_version._module_provider.pk == module_version._module_provider.pk
+            mock_get_connection.assert_not_called()
+
+        # Ensure rows are not shared with the module version
+        assert cached_module_version._get_db_row() is not module_version_row
+
+    def test_details_document(self):
+        """Ensure details document is stored on publish and regenerated after changes to the module provider."""
+        namespace = Namespace(name='testcreation')
+        module = Module(namespace=namespace, name='test-details-document')
+        module_provider = ModuleProvider.get(module=module, name='testprovider', create=True)
+
+        try:
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+            module_version.update_attributes(description='Original description')
+            module_version.publish()
+
+            db = Database.get()
+            def get_stored_document():
+                with db.get_connection() as conn:
+                    return conn.execute(db.details_document.select().where(
+                        db.details_document.c.module_version_id == module_version.pk
+                    )).fetchone()
+
+            # Ensure document is stored for current revision of module provider on publish
+            stored_document = get_stored_document()
+            assert stored_document['revision'] == module_provider._get_db_row()['revision']
+            expected_details = module_version._generate_terrareg_api_details()
+            del expected_details['downloads']
+            assert json.loads(Database.decode_blob(stored_document['document'])) == expected_details
+
+            # Ensure download count is obtained at request time
+            with unittest.mock.patch('terrareg.models.ModuleVersion.get_total_downloads', unittest.mock.MagicMock(return_value=23)):
+                assert module_version.get_terrareg_api_details() == dict(expected_details, downloads=23)
+
+            # Ensure document is regenerated after module version is modified
+            module_version.update_attributes(description='Updated description')
+            module_version = ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+            assert module_version.get_terrareg_api_details()['description'] == 'Updated description'
+            stored_document = get_stored_document()
+            assert stored_document['revision'] == ModuleProvider.get(module=module, name='testprovider')._get_db_row()['revision']
+            assert json.loads(Database.decode_blob(stored_document['document']))['description'] == 'Updated description'
+
+            # Ensure document is regenerated after configuration used in document is modified
+            with unittest.mock.patch('terrareg.config.Config.TERRAFORM_EXAMPLE_VERSION_TEMPLATE', '= {major}.{minor}.{patch}'):
+                module_version = ModuleVersion.get(module_provider=module_provider, version='1.0.0')
+                assert module_version.get_terrareg_api_details()['terraform_example_version_string'] == '= 1.0.0'
+                stored_document = get_stored_document()
+                assert stored_document['config_fingerprint'] == ModuleVersion.get_details_document_config_fingerprint()
+                assert json.loads(Database.decode_blob(stored_document['document']))['terraform_example_version_string'] == '= 1.0.0'
+
+            # Ensure document is removed when module version is deleted
+            module_version_pk = module_version.pk
+            module_version.delete()
+            with db.get_connection() as conn:
+                assert conn.execute(db.details_document.select().where(
+                    db.details_document.c.module_version_id == module_version_pk
+                )).fetchone() is None
+
+        finally:
+            module_provider.delete()
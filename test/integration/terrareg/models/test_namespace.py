@@ -42,3 +42,29 @@ class TestNamespace(TerraregIntegrationTest):
     def test_get_total_count(self):
         """Test get_total_count method"""
         assert Namespace.get_total_count() == 11
+
+    @pytest.mark.parametrize('limit', [1, 2, 3, 50])
+    def test_get_module_providers_cursor_pages(self, limit):
+        """Test paging through module providers in namespace using cursors."""
+        namespace = Namespace(name='modulesearch')
+        expected_module_providers = [
+            (module.name, module_provider.name)
+            for module in namespace.get_all_modules()
+            for module_provider in module.get_providers()
+        ]
+        expected_module_providers.sort()
+
+        module_providers = []
+        cursor_values = None
+        while True:
+            page = namespace.get_module_providers(offset=0, limit=limit, cursor_values=cursor_values)
+            assert len(page) <= limit + 1
+            module_providers += [
+                (module_provider._module.name, module_provider.name)
+                for module_provider in page[:limit]
+            ]
+            if len(page) <= limit:
+                break
+            cursor_values = ('modulesearch', page[limit - 1]._module.name, page[limit - 1].name)
+
+        assert module_providers == expected_module_providers
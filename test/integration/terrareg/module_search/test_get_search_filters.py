@@ -1,6 +1,9 @@
 
 from unittest import mock
 import pytest
+import sqlalchemy
+
+from terrareg.database import Database
 
 from terrareg.models import Module, ModuleProvider, Namespace
 from terrareg.module_search import ModuleSearch
@@ -132,3 +135,47 @@ class TestGetSearchFilters(TerraregIntegrationTest):
         assert results == {'providers': {'aws': 11, 'gcp': 2},
                            'namespaces': {'modulesearch': 8, 'modulesearch-contributed': 2, 'modulesearch-trusted': 3},
                            'contributed': 2, 'trusted_namespaces': 11, 'verified': 3}
+
+    def test_single_query(self):
+        """Test that all search filters are obtained using a single query."""
+        executed_statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args, **kwargs):
+            executed_statements.append(statement)
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            with mock.patch('terrareg.config.Config.TRUSTED_NAMESPACES', ['modulesearch-trusted']), \
+                    mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0):
+                results = ModuleSearch.get_search_filters(query='modulesearch')
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert len(executed_statements) == 1
+        assert results['trusted_namespaces'] == 3
+        assert results['contributed'] == 10
+
+    def test_filter_counts_are_integers(self):
+        """Test that filter counts are integers, casting aggregated counts that are returned as decimals by some databases."""
+        executed_statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args, **kwargs):
+            executed_statements.append(statement)
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            with mock.patch('terrareg.config.Config.TRUSTED_NAMESPACES', ['modulesearch-trusted']), \
+                    mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0):
+                results = ModuleSearch.get_search_filters(query='modulesearch')
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert 'CAST(sum(' in executed_statements[0]
+        for filter_name in ['verified', 'trusted_namespaces', 'contributed']:
+            assert type(results[filter_name]) is int
+        for filter_name in ['providers', 'namespaces']:
+            assert results[filter_name]
+            for count in results[filter_name].values():
+                assert type(count) is int
@@ -0,0 +1,123 @@
+
+from unittest import mock
+import pytest
+
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import ModuleSearch, ModuleSearchIndex
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+# Disable search cache, to compare results from each search method
+@mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0)
+class TestModuleSearchIndex(TerraregIntegrationTest):
+    """Test search token index used by module search."""
+
+    def _get_module_provider_ids(self, query):
+        """Return IDs of all module providers matching search query."""
+        result = ModuleSearch.search_module_providers(offset=0, limit=50, query=query, include_internal=True)
+        assert 'next_offset' not in result.meta
+        return [module_provider.pk for module_provider in result.module_providers]
+
+    def _get_tokens(self, module_provider):
+        """Return search tokens for module provider."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            return set([
+                row['token']
+                for row in conn.execute(db.module_search_token.select().where(
+                    db.module_search_token.c.module_provider_id == module_provider.pk
+                ))
+            ])
+
+    def test_get_tokens(self):
+        """Test generation of tokens from module provider attributes."""
+        with mock.patch('terrareg.module_search.ModuleSearchIndex._get_token_length', mock.MagicMock(return_value=4)):
+            assert ModuleSearchIndex.get_tokens(
+                namespace='Ns', module='mod', provider='Provider', version='1.0.0',
+                description=None, owner='') == set([
+                    # Namespace and module suffixes
+                    'ns', 's', 'mod', 'od', 'd',
+                    # Truncated provider and version
+                    'prov', '1.0.'
+                ])
+
+    @pytest.mark.parametrize('query', [
+        'contributedmodule',
+        'CONTRIBUTEDMODULE',
+        'modulesearch contributedmodule',
+        # Term longer than token length
+        'contributedmodule-oneversion',
+        'description-search-published',
+        # Exact matches of provider and version
+        'aws',
+        'aw',
+        '1.0.0',
+        '2.0.0-beta',
+        # Terms containing LIKE wildcards
+        'contributed_odule',
+        'contributed%oneversion',
+        '%oneversion',
+        '_ontributedmodule',
+        'doesnotexist',
+    ])
+    def test_results_match_search_without_index(self, query):
+        """Test that search results are not modified by the search index."""
+        expected_ids = None
+        with mock.patch('terrareg.module_search.ModuleSearchIndex.get_search_term_filter', mock.MagicMock(return_value=None)):
+            expected_ids = self._get_module_provider_ids(query)
+            expected_filters = ModuleSearch.get_search_filters(query=query)
+
+        assert self._get_module_provider_ids(query) == expected_ids
+        assert ModuleSearch.get_search_filters(query=query) == expected_filters
+
+    def test_tokens_maintained_on_publish_and_delete(self):
+        """Test that tokens are updated when latest version is published and removed when deleted."""
+        namespace = Namespace(name='testnamespace')
+        module = Module(namespace=namespace, name='searchindex')
+        ModuleProvider.get(module=module, name='testprovider', create=True)
+        module_provider = ModuleProvider.get(module=module, name='testprovider')
+        try:
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+
+            # Ensure unpublished module versions are not indexed
+            assert self._get_tokens(module_provider) == set()
+
+            module_version.update_attributes(description='Indexed Description')
+            module_version.publish()
+            assert 'indexed desc' in self._get_tokens(module_provider)
+            assert module_provider.pk in self._get_module_provider_ids('indexed')
+
+            # Ensure modifying description of latest version updates tokens
+            module_version.update_attributes(description='Replaced Description')
+            assert 'indexed desc' not in self._get_tokens(module_provider)
+            assert 'replaced des' in self._get_tokens(module_provider)
+            assert module_provider.pk not in self._get_module_provider_ids('indexed')
+
+            module_version.delete()
+            assert self._get_tokens(module_provider) == set()
+        finally:
+            module_provider.delete()
+
+    def test_rebuild(self):
+        """Test re-generating tokens for all module providers."""
+        db = Database.get()
+        with db.get_connection() as conn:
+            original_tokens = set([
+                (row['module_provider_id'], row['token'])
+                for row in conn.execute(db.module_search_token.select())
+            ])
+            conn.execute(db.module_search_token.delete())
+
+        assert self._get_module_provider_ids('contributedmodule') == []
+
+        indexed_count = ModuleSearchIndex.rebuild(batch_size=5)
+        assert indexed_count > 5
+
+        with db.get_connection() as conn:
+            assert set([
+                (row['module_provider_id'], row['token'])
+                for row in conn.execute(db.module_search_token.select())
+            ]) == original_tokens
+        assert self._get_module_provider_ids('contributedmodule') != []
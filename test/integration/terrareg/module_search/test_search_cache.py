@@ -0,0 +1,217 @@
+
+from unittest import mock
+
+import pytest
+import sqlalchemy
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.cache import LRUCache
+from terrareg.database import Database
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import ModuleSearch
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+class TestSearchCache(TerraregIntegrationTest):
+    """Test caching of search results and search filters."""
+
+    def setup_method(self, method):
+        """Replace search cache with empty cache."""
+        super(TestSearchCache, self).setup_method(method)
+        self._search_cache = LRUCache(name='search', max_size=10)
+        self._search_cache_patch = mock.patch('terrareg.module_search.ModuleSearch._SEARCH_CACHE', self._search_cache)
+        self._search_cache_patch.start()
+
+    def teardown_method(self, method):
+        """Restore search cache."""
+        self._search_cache_patch.stop()
+        super(TestSearchCache, self).teardown_method(method)
+
+    def _count_statements(self, func):
+        """Return result of function and number of statements executed."""
+        executed_statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args, **kwargs):
+            executed_statements.append(statement)
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = func()
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(executed_statements)
+
+    def _get_module_provider_ids(self, result):
+        """Return module provider IDs from search result."""
+        return [module_provider.pk for module_provider in result.module_providers]
+
+    def test_search_results_cached(self):
+        """Test that repeated searches are obtained from cache."""
+        search = lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='  contributedmodule ', include_count=True)
+        result, statement_count = self._count_statements(search)
+        # Ensure catalog revision, page of results and count are obtained
+        assert statement_count == 3
+        # Ensure both the page of results and the count were not cached
+        assert self._search_cache.misses == 2
+
+        # Ensure cached results only require catalog revision and download counts to be obtained
+        cached_result, statement_count = self._count_statements(
+            lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule', include_count=True))
+        assert statement_count == 2
+        assert self._search_cache.hits == 2
+        assert self._get_module_provider_ids(cached_result) == self._get_module_provider_ids(result)
+        assert cached_result.count == result.count
+        assert cached_result.meta == result.meta
+
+        # Ensure different filters are not obtained from cache
+        verified_result = ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule', verified=True, include_count=True)
+        assert self._search_cache.misses == 4
+        assert verified_result.count == 0
+
+    def test_count_cached_independent_of_page(self):
+        """Test that total count is cached for search and re-used for other pages."""
+        search = lambda offset: ModuleSearch.search_module_providers(
+            offset=offset, limit=1, query='contributedmodule', include_count=True)
+        result, statement_count = self._count_statements(lambda: search(0))
+        assert statement_count == 3
+
+        # Ensure only the catalog revision and page of results are obtained for the next page
+        next_result, statement_count = self._count_statements(lambda: search(1))
+        assert statement_count == 2
+        assert next_result.count == result.count
+
+    def test_download_counts_refreshed(self):
+        """Test that download counts are not obtained from cache."""
+        namespace = Namespace(name='modulesearch')
+        module_provider = ModuleProvider.get(Module(namespace, 'contributedmodule-oneversion'), 'aws')
+        search = lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule-oneversion')
+
+        original_downloads = search().module_providers[0].get_latest_version().get_total_downloads()
+        AnalyticsEngine.record_module_version_download(
+            module_version=module_provider.get_latest_version(),
+            analytics_token='search-cache-test',
+            terraform_version=None,
+            user_agent='Terraform/1.1.1',
+            auth_token=None
+        )
+
+        assert search().module_providers[0].get_latest_version().get_total_downloads() == original_downloads + 1
+        assert self._search_cache.hits == 1
+
+    def test_search_filters_cached(self):
+        """Test that search filters are cached and are not modified by callers."""
+        filters = ModuleSearch.get_search_filters(query='modulesearch')
+        filters['providers']['aws'] = 0
+
+        # Ensure only the catalog revision is obtained
+        cached_filters, statement_count = self._count_statements(
+            lambda: ModuleSearch.get_search_filters(query='modulesearch'))
+        assert statement_count == 1
+        assert cached_filters['providers']['aws'] != 0
+
+        # Ensure change in trusted namespaces is not obtained from cache
+        with mock.patch('terrareg.config.Config.TRUSTED_NAMESPACES', ['modulesearch']):
+            trusted_filters = ModuleSearch.get_search_filters(query='modulesearch')
+        assert trusted_filters['trusted_namespaces'] != cached_filters['trusted_namespaces']
+
+    def test_invalidated_by_verified_change(self):
+        """Test that cached results are invalidated when verified flag of module provider changes."""
+        module_provider = ModuleProvider.get(Module(Namespace('modulesearch'), 'contributedmodule-oneversion'), 'aws')
+        search = lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule-oneversion', verified=True, include_count=True)
+
+        assert search().count == 0
+        original_revision = ModuleSearch.get_catalog_revision()
+        try:
+            module_provider.update_attributes(verified=True)
+            assert ModuleSearch.get_catalog_revision() > original_revision
+            assert search().count == 1
+        finally:
+            module_provider.update_attributes(verified=False)
+        assert search().count == 0
+
+    def test_invalidated_by_publish_and_delete(self):
+        """Test that cached results are invalidated when module versions are published and deleted."""
+        module = Module(Namespace('modulesearch'), 'searchcachemodule')
+        ModuleProvider.get(module=module, name='aws', create=True)
+        module_provider = ModuleProvider.get(module=module, name='aws')
+        search = lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='searchcachemodule', include_count=True)
+        filters = lambda: ModuleSearch.get_search_filters(query='searchcachemodule')
+        try:
+            assert search().count == 0
+            assert filters()['namespaces'] == {}
+
+            module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+            module_version.prepare_module()
+            module_version.publish()
+            assert self._get_module_provider_ids(search()) == [module_provider.pk]
+            assert filters()['namespaces'] == {'modulesearch': 1}
+
+            module_version.delete()
+            assert search().count == 0
+            assert filters()['namespaces'] == {}
+        finally:
+            module_provider.delete()
+
+    def test_catalog_revision_obtained_once_per_request(self, test_request_context):
+        """Test that catalog revision is only obtained from the database once for each request."""
+        with test_request_context:
+            ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule')
+            _, statement_count = self._count_statements(
+                lambda: ModuleSearch.get_search_filters(query='contributedmodule'))
+            # Ensure only the search filters are obtained
+            assert statement_count == 1
+
+    def test_invalidated_by_other_process(self):
+        """Test that cached results are invalidated when the catalog revision is incremented by another process."""
+        search = lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule-oneversion')
+        search()
+        search()
+        assert self._search_cache.hits == 1
+
+        # Increment revision in database, as performed by another server process
+        db = Database.get()
+        original_revision = ModuleSearch.get_catalog_revision()
+        with db.get_connection() as conn:
+            Database.execute_upsert(
+                conn,
+                db.catalog_revision.update().values(revision=(db.catalog_revision.c.revision + 1)),
+                db.catalog_revision.insert().values(id=1, revision=1)
+            )
+        assert ModuleSearch.get_catalog_revision() == original_revision + 1
+
+        search()
+        assert self._search_cache.hits == 1
+        assert self._search_cache.misses == 2
+
+    def test_revision_incremented_after_commit(self, test_request_context):
+        """Test that catalog revision is only incremented once the database transaction has been committed."""
+        db = Database.get()
+
+        def get_stored_revision():
+            with db.get_connection() as conn:
+                return conn.execute(sqlalchemy.select(db.catalog_revision.c.revision)).scalar() or 0
+
+        original_revision = get_stored_revision()
+        with test_request_context:
+            # Ensure revision is not incremented when transaction is rolled back
+            with Database.start_transaction() as transaction_context:
+                ModuleSearch.bump_catalog_revision()
+                transaction_context.transaction.rollback()
+            assert get_stored_revision() == original_revision
+
+            # Ensure revision is incremented once, after the transaction is committed
+            with Database.start_transaction():
+                ModuleSearch.bump_catalog_revision()
+                ModuleSearch.bump_catalog_revision()
+                assert get_stored_revision() == original_revision
+            assert get_stored_revision() == original_revision + 1
+
+    def test_disabled(self):
+        """Test that search results are not cached when cache is disabled."""
+        with mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0):
+            assert ModuleSearch.get_search_cache() is None
+            ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule')
+            ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule')
+        assert self._search_cache.size == 0
@@ -0,0 +1,95 @@
+
+from unittest import mock
+
+import pytest
+
+from terrareg.errors import InvalidSearchCursorError
+from terrareg.module_search import ModuleSearch
+from terrareg.trigram_search import TrigramSearchIndex
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+@mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0)
+class TestSearchCursor(TerraregIntegrationTest):
+    """Test cursor pagination of search results."""
+
+    def teardown_method(self, method):
+        """Remove any in-memory index built by test."""
+        TrigramSearchIndex.reset()
+        super(TestSearchCursor, self).teardown_method(method)
+
+    def _get_ids(self, module_providers):
+        """Return IDs of module providers."""
+        return [module_provider.id for module_provider in module_providers]
+
+    def test_encode_decode_cursor(self):
+        """Test that cursor values are returned from encoded cursor."""
+        cursor = ModuleSearch.encode_cursor(namespace='testnamespace', module='testmodule', provider='aws')
+        assert ModuleSearch.decode_cursor(cursor) == ('testnamespace', 'testmodule', 'aws')
+
+    @pytest.mark.parametrize('cursor', [
+        'not a cursor',
+        # Valid base64, invalid JSON
+        'bm90anNvbg==',
+        # JSON that does not contain three strings
+        ModuleSearch.encode_cursor('a', 'b', 'c')[:-4],
+        'WyJhIiwgImIiXQ==',
+        'WzEsIDIsIDNd',
+    ])
+    def test_invalid_cursor(self, cursor):
+        """Test that invalid cursors raise an error."""
+        with pytest.raises(InvalidSearchCursorError):
+            ModuleSearch.search_module_providers(offset=0, limit=10, cursor=cursor)
+
+    @pytest.mark.parametrize('in_memory_index', [False, True])
+    @pytest.mark.parametrize('limit', [1, 2, 3])
+    @pytest.mark.parametrize('query', [None, 'contributedmodule'])
+    def test_cursor_pages(self, in_memory_index, limit, query):
+        """Test that paging using cursors returns all results in order."""
+        with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', in_memory_index):
+            all_results = ModuleSearch.search_module_providers(offset=0, limit=50, query=query, include_internal=True)
+            assert 'next_cursor' not in all_results.meta
+
+            module_provider_ids = []
+            cursor = None
+            while True:
+                results = ModuleSearch.search_module_providers(
+                    offset=0, limit=limit, query=query, include_internal=True, cursor=cursor)
+                assert len(results.module_providers) <= limit
+                module_provider_ids += self._get_ids(results.module_providers)
+
+                cursor = results.meta.get('next_cursor')
+                if cursor is None:
+                    break
+
+        assert len(module_provider_ids) > limit
+        assert module_provider_ids == self._get_ids(all_results.module_providers)
+
+    def test_next_cursor_when_page_filled(self):
+        """Test next cursor is provided only when further results exist."""
+        all_results = ModuleSearch.search_module_providers(offset=0, limit=50, query='contributedmodule')
+        count = len(all_results.module_providers)
+
+        results = ModuleSearch.search_module_providers(offset=0, limit=count, query='contributedmodule')
+        assert 'next_cursor' not in results.meta
+
+        results = ModuleSearch.search_module_providers(offset=0, limit=count - 1, query='contributedmodule')
+        last_module_provider = all_results.module_providers[count - 2]
+        assert ModuleSearch.decode_cursor(results.meta['next_cursor']) == (
+            last_module_provider._module._namespace.name,
+            last_module_provider._module.name,
+            last_module_provider.name
+        )
+
+    def test_offset_applied_after_cursor(self):
+        """Test that offset is applied relative to the cursor."""
+        all_results = ModuleSearch.search_module_providers(offset=0, limit=50, include_internal=True)
+        first_module_provider = all_results.module_providers[0]
+        cursor = ModuleSearch.encode_cursor(
+            namespace=first_module_provider._module._namespace.name,
+            module=first_module_provider._module.name,
+            provider=first_module_provider.name
+        )
+
+        results = ModuleSearch.search_module_providers(offset=2, limit=3, include_internal=True, cursor=cursor)
+        assert self._get_ids(results.module_providers) == self._get_ids(all_results.module_providers[3:6])
@@ -1,6 +1,9 @@
 
 from unittest import mock
 import pytest
+import sqlalchemy
+
+from terrareg.database import Database
 from terrareg.filters import NamespaceTrustFilter
 
 from terrareg.models import Module, ModuleProvider, Namespace
@@ -36,7 +39,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             query='contributedmodule-oneversion',
             offset=offset,
-            limit=limit
+            limit=limit,
+            include_count=True
         )
 
         expected_meta = {
@@ -74,7 +78,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
                 query='mixedsearch',
                 offset=0,
                 limit=1,
-                namespace_trust_filters=namespace_trust_filter
+                namespace_trust_filters=namespace_trust_filter,
+                include_count=True
             )
 
         assert result.count == expected_result_count
@@ -93,7 +98,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         """Test offset and limit params of module search."""
         result = ModuleSearch.search_module_providers(
             offset=offset, limit=2,
-            query='searchbynamesp'
+            query='searchbynamesp',
+            include_count=True
         )
 
         assert result.count == 5
@@ -117,6 +123,41 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         for expected_module_provider in expected_results:
             assert expected_module_provider in resulting_module_provider_ids
 
+    @pytest.mark.parametrize('offset,expected_next_offset', [
+        (0, 2),
+        (2, 4),
+        (3, None),
+        (4, None),
+        (5, None)
+    ])
+    def test_offset_limit_without_count(self, offset, expected_next_offset):
+        """Test that next offset is provided without obtaining total count."""
+        executed_statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args, **kwargs):
+            executed_statements.append(statement)
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            with mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0):
+                result = ModuleSearch.search_module_providers(
+                    offset=offset, limit=2,
+                    query='searchbynamesp'
+                )
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        # Ensure count query was not executed
+        assert len(executed_statements) == 1
+        assert result.count is None
+
+        assert len(result.module_providers) == min(max(5 - offset, 0), 2)
+        if expected_next_offset is None:
+            assert 'next_offset' not in result.meta
+        else:
+            assert result.meta['next_offset'] == expected_next_offset
+
     @pytest.mark.parametrize('verified_flag,expected_module_provider_ids', [
         # Search with flag unset
         (None, ['searchbynamespace/searchbymodulename1/searchbyprovideraws',
@@ -141,7 +182,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
             query='searchbynamesp',
-            verified=verified_flag
+            verified=verified_flag,
+            include_count=True
         )
 
         assert result.count == len(expected_module_provider_ids)
@@ -164,7 +206,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
             query=module_name,
-            namespaces=['modulesearch']
+            namespaces=['modulesearch'],
+            include_count=True
         )
 
         # Ensure that if at least one version is present,
@@ -195,7 +238,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         # Perform search with namespace in query
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
-            query=namespace
+            query=namespace,
+            include_count=True
         )
 
         assert result.count == len(expected_module_provider_ids)
@@ -225,7 +269,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
             query='',
-            namespaces=[namespace]
+            namespaces=[namespace],
+            include_count=True
         )
 
         resulting_module_provider_ids = [
@@ -264,7 +309,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         # Perform search with module name in query
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
-            query=module_name_search
+            query=module_name_search,
+            include_count=True
         )
 
         assert result.count == len(expected_module_provider_ids)
@@ -296,7 +342,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
             query='',
-            modules=[module_name_search]
+            modules=[module_name_search],
+            include_count=True
         )
 
         resulting_module_provider_ids = [
@@ -331,7 +378,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         # Perform search with provider name in query
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
-            query=provider_name_search
+            query=provider_name_search,
+            include_count=True
         )
 
         assert result.count == len(expected_module_provider_ids)
@@ -363,7 +411,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=50,
             query='',
-            providers=[provider_name_search]
+            providers=[provider_name_search],
+            include_count=True
         )
 
         resulting_module_provider_ids = [
@@ -381,7 +430,8 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=10,
             query='DESCRIPTION-Search',
-            namespaces=['modulesearch']
+            namespaces=['modulesearch'],
+            include_count=True
         )
 
         # Ensure that only one result is returned
@@ -402,8 +452,39 @@ class TestSearchModuleProviders(TerraregIntegrationTest):
         result = ModuleSearch.search_module_providers(
             offset=0, limit=10,
             query=search_query,
-            namespaces=['modulesearch']
+            namespaces=['modulesearch'],
+            include_count=True
         )
 
         # Ensure that no results are returned
         assert result.count == 0
+
+    def test_search_results_outline_query_count(self):
+        """Test that search results are populated with all outline details using a constant number of queries."""
+        executed_statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args, **kwargs):
+            executed_statements.append(statement)
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            with mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0):
+                result = ModuleSearch.search_module_providers(offset=0, limit=50, include_internal=True, include_count=True)
+            outlines = [
+                module_provider.get_latest_version().get_api_outline()
+                for module_provider in result.module_providers
+            ]
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert len(result.module_providers) == result.count
+        # Ensure only the search query and count query were executed
+        assert len(executed_statements) == 2
+
+        # Ensure outlines match those of module providers obtained without search
+        for module_provider, outline in zip(result.module_providers, outlines):
+            namespace = Namespace(name=module_provider._module._namespace.name)
+            module = Module(namespace=namespace, name=module_provider._module.name)
+            new_module_provider = ModuleProvider.get(module=module, name=module_provider.name)
+            assert outline == new_module_provider.get_latest_version().get_api_outline()
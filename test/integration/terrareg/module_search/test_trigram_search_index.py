@@ -0,0 +1,152 @@
+
+from unittest import mock
+import pytest
+
+from terrareg.database import Database
+from terrareg.filters import NamespaceTrustFilter
+from terrareg.models import Module, ModuleProvider, ModuleVersion, Namespace
+from terrareg.module_search import ModuleSearch
+from terrareg.trigram_search import TrigramSearchIndex
+from test.integration.terrareg import TerraregIntegrationTest
+from test import test_request_context
+
+
+# Disable search cache, to compare results from each search method
+@mock.patch('terrareg.config.Config.SEARCH_CACHE_SIZE', 0)
+class TestTrigramSearchIndex(TerraregIntegrationTest):
+    """Test in-memory search index."""
+
+    def setup_method(self, method):
+        """Remove any in-memory index built by previous tests."""
+        super(TestTrigramSearchIndex, self).setup_method(method)
+        TrigramSearchIndex.reset()
+
+    def teardown_method(self, method):
+        """Remove in-memory index built by test."""
+        TrigramSearchIndex.reset()
+        super(TestTrigramSearchIndex, self).teardown_method(method)
+
+    def _get_search_results(self, **kwargs):
+        """Return module provider IDs, latest versions, download counts and meta of search results."""
+        result = ModuleSearch.search_module_providers(include_count=True, **kwargs)
+        return (
+            [
+                (module_provider.pk, module_provider.get_latest_version().version,
+                 module_provider.get_latest_version().get_total_downloads())
+                for module_provider in result.module_providers
+            ],
+            result.count,
+            result.meta
+        )
+
+    def test_get_trigrams(self):
+        """Test trigrams generated for value."""
+        assert TrigramSearchIndex.get_trigrams('ab') == set()
+        assert TrigramSearchIndex.get_trigrams('abcda') == set(['abc', 'bcd', 'cda'])
+
+    def test_disabled(self):
+        """Test that index is not used when disabled."""
+        with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', False):
+            assert TrigramSearchIndex.get() is None
+            ModuleSearch.search_module_providers(offset=0, limit=10, query='contributedmodule')
+        assert TrigramSearchIndex._INSTANCE is None
+
+    @pytest.mark.parametrize('search_kwargs', [
+        {'offset': 0, 'limit': 50},
+        {'offset': 5, 'limit': 10},
+        {'offset': 0, 'limit': 50, 'include_internal': True},
+        {'offset': 0, 'limit': 50, 'query': 'contributedmodule'},
+        {'offset': 0, 'limit': 2, 'query': 'contributedmodule'},
+        {'offset': 0, 'limit': 50, 'query': 'CONTRIBUTEDmodule oneversion'},
+        {'offset': 0, 'limit': 50, 'query': 'description-search'},
+        {'offset': 0, 'limit': 50, 'query': 'aws'},
+        {'offset': 0, 'limit': 50, 'query': 'aw'},
+        {'offset': 0, 'limit': 50, 'query': '1.2.3'},
+        {'offset': 0, 'limit': 50, 'query': 'contributed_odule'},
+        {'offset': 0, 'limit': 50, 'query': '%oneversion'},
+        {'offset': 0, 'limit': 50, 'query': 'doesnotexist'},
+        {'offset': 0, 'limit': 50, 'query': 'module', 'providers': ['gcp']},
+        {'offset': 0, 'limit': 50, 'namespaces': ['modulesearch', 'modulesearch-trusted']},
+        {'offset': 0, 'limit': 50, 'modules': ['mixedsearch-result']},
+        {'offset': 0, 'limit': 50, 'query': 'module', 'verified': True},
+        {'offset': 0, 'limit': 50, 'namespace_trust_filters': [NamespaceTrustFilter.TRUSTED_NAMESPACES]},
+        {'offset': 0, 'limit': 50, 'namespace_trust_filters': [NamespaceTrustFilter.CONTRIBUTED]},
+        {'offset': 0, 'limit': 50, 'namespace_trust_filters': [
+            NamespaceTrustFilter.TRUSTED_NAMESPACES, NamespaceTrustFilter.CONTRIBUTED]},
+    ])
+    def test_results_match_database_search(self, search_kwargs):
+        """Test that results from in-memory index match database search."""
+        with mock.patch('terrareg.config.Config.TRUSTED_NAMESPACES', ['modulesearch-trusted']):
+            with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', False):
+                expected_results = self._get_search_results(**search_kwargs)
+
+            with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', True):
+                assert self._get_search_results(**search_kwargs) == expected_results
+                assert TrigramSearchIndex._INSTANCE is not None
+
+    def test_incremental_updates(self):
+        """Test that index is updated when module versions are published and deleted."""
+        with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', True):
+            # Build index
+            TrigramSearchIndex.get()
+
+            namespace = Namespace(name='testnamespace')
+            module = Module(namespace=namespace, name='trigramindex')
+            ModuleProvider.get(module=module, name='testprovider', create=True)
+            module_provider = ModuleProvider.get(module=module, name='testprovider')
+            try:
+                module_version = ModuleVersion(module_provider=module_provider, version='1.0.0')
+                module_version.prepare_module()
+                module_version.update_attributes(description='Original Description')
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='original', include_count=True).count == 0
+
+                module_version.publish()
+                results = ModuleSearch.search_module_providers(offset=0, limit=50, query='original')
+                assert [mp.pk for mp in results.module_providers] == [module_provider.pk]
+
+                # Update attributes of latest version
+                module_version.update_attributes(description='Replaced Description')
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='original', include_count=True).count == 0
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='replaced', include_count=True).count == 1
+
+                # Update attributes of module provider
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='replaced', verified=True, include_count=True).count == 0
+                module_provider.update_attributes(verified=True)
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='replaced', verified=True, include_count=True).count == 1
+
+                module_version.delete()
+                assert ModuleSearch.search_module_providers(offset=0, limit=50, query='replaced', include_count=True).count == 0
+            finally:
+                module_provider.delete()
+
+    def test_updates_applied_after_commit(self, test_request_context):
+        """Test that index is only updated once the database transaction has been committed."""
+        with mock.patch('terrareg.config.Config.SEARCH_IN_MEMORY_INDEX', True):
+            index = TrigramSearchIndex.get()
+
+            module_provider = ModuleProvider.get(Module(Namespace('modulesearch'), 'contributedmodule-oneversion'), 'aws')
+            module_version = module_provider.get_latest_version()
+            original_description = module_version.description
+            try:
+                with test_request_context:
+                    # Ensure index is not updated when transaction is rolled back
+                    with Database.start_transaction() as transaction_context:
+                        module_version.update_attributes(description='Rolledback Description')
+                        transaction_context.transaction.rollback()
+                    assert index.count(query='rolledback') == 0
+
+                    # Ensure index is updated once transaction is committed
+                    with Database.start_transaction():
+                        module_version.update_attributes(description='Committed Description')
+                        assert index.count(query='committed') == 0
+                    assert index.count(query='committed') == 1
+
+                    # Ensure index is not updated when an exception is raised in the transaction
+                    with pytest.raises(Exception, match='Test exception'):
+                        with Database.start_transaction():
+                            module_version.update_attributes(description='Failed Description')
+                            raise Exception('Test exception')
+                    assert index.count(query='failed') == 0
+                    assert index.count(query='committed') == 1
+            finally:
+                module_version.update_attributes(description=original_description)
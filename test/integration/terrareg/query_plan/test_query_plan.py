@@ -0,0 +1,131 @@
+
+import contextlib
+import re
+
+import pytest
+import sqlalchemy
+
+from terrareg.analytics import AnalyticsEngine
+from terrareg.database import Database
+from terrareg.models import (
+    ExampleFile, Module, ModuleProvider,
+    ModuleVersion, Namespace
+)
+from terrareg.module_search import ModuleSearch
+from test.integration.terrareg import TerraregIntegrationTest
+
+
+# Tables that are expected to grow with the number of
+# modules/downloads, which must not be fully scanned
+# by queries for individual objects.
+LARGE_TABLES = [
+    'module_provider',
+    'module_version',
+    'module_details',
+    'submodule',
+    'example_file',
+    'analytics',
+    'module_version_download_count',
+    'analytics_daily_rollup',
+    'module_search_token',
+]
+
+
+def _get_module_provider():
+    """Return test module provider."""
+    return ModuleProvider.get(Module(Namespace('moduledetails'), 'readme-tests'), 'provider')
+
+
+def _get_module_version():
+    """Return test module version."""
+    return ModuleVersion.get(_get_module_provider(), '1.0.0')
+
+
+class TestQueryPlan(TerraregIntegrationTest):
+    """
+    Test query plans of queries performed by models, search and analytics.
+
+    Each operation is run, capturing the queries that it executes,
+    and each query is explained to find full table scans of large tables.
+    Operations that are inherently unbounded (e.g. text search and global
+    aggregates) must explicitly list the tables that they are expected to scan.
+    """
+
+    @contextlib.contextmanager
+    def _capture_statements(self):
+        """Capture SELECT statements executed by engine."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                statements.append((statement, parameters))
+
+        engine = Database.get().get_engine()
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            sqlalchemy.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    def _get_scanned_tables(self, statement, parameters):
+        """Return list of tables that are fully scanned by statement."""
+        engine = Database.get().get_engine()
+        scanned_tables = []
+        with engine.connect() as conn:
+            if engine.dialect.name == 'sqlite':
+                for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters):
+                    match = re.match(r'^SCAN (\w+)', row['detail'])
+                    if match:
+                        scanned_tables.append(match.group(1))
+
+            elif engine.dialect.name == 'mysql':
+                for row in conn.exec_driver_sql('EXPLAIN ' + statement, parameters):
+                    if row['type'] in ['ALL', 'index']:
+                        scanned_tables.append(row['table'])
+
+            else:
+                pytest.skip('Query plans not supported for database dialect: {}'.format(engine.dialect.name))
+
+        return [table for table in scanned_tables if table in LARGE_TABLES]
+
+    @pytest.mark.parametrize('operation, allowed_scans', [
+        # Lookups of individual objects
+        (lambda: _get_module_provider()._get_db_row(), []),
+        (lambda: _get_module_version()._get_db_row(), []),
+        (lambda: _get_module_provider().get_versions(), []),
+        (lambda: _get_module_provider().get_latest_version(), []),
+        (lambda: _get_module_provider().calculate_latest_version(), []),
+        (lambda: _get_module_version().get_submodules(), []),
+        (lambda: _get_module_version().get_examples(), []),
+        (lambda: [example.get_files() for example in _get_module_version().get_examples()], []),
+        (lambda: ExampleFile.get_by_path(_get_module_version(), 'examples/testreadmeexample/main.tf').content, []),
+
+        # Analytics for individual objects
+        (lambda: AnalyticsEngine.get_module_version_total_downloads(_get_module_version()), []),
+        (lambda: AnalyticsEngine.get_module_versions_total_downloads([_get_module_version().pk]), []),
+        (lambda: AnalyticsEngine.get_module_provider_download_stats(_get_module_provider()), []),
+        (lambda: AnalyticsEngine.get_module_provider_token_versions(_get_module_provider()), []),
+
+        # Namespace filtered search
+        (lambda: ModuleSearch.search_module_providers(offset=0, limit=10, namespaces=['moduledetails']), []),
+
+        # Text search and global aggregates are expected to scan
+        (lambda: ModuleSearch.search_module_providers(offset=0, limit=10, query='readme'), ['module_provider']),
+        (lambda: ModuleSearch.get_search_filters(query='readme'), ['module_provider']),
+        (lambda: ModuleSearch.get_most_recently_published(), ['module_provider']),
+        (lambda: ModuleSearch.get_most_downloaded_module_provider_this_Week(), []),
+        (lambda: AnalyticsEngine.get_total_downloads(), ['module_version_download_count']),
+        (lambda: AnalyticsEngine.get_global_module_usage_counts(), ['analytics_daily_rollup']),
+    ])
+    def test_query_plan(self, operation, allowed_scans):
+        """Test that queries performed by operation do not scan large tables."""
+        with self._capture_statements() as statements:
+            operation()
+
+        assert statements
+
+        for statement, parameters in statements:
+            scanned_tables = self._get_scanned_tables(statement, parameters)
+            unexpected_scans = [table for table in scanned_tables if table not in allowed_scans]
+            assert not unexpected_scans, 'Full table scan of {} in: {}'.format(
+                ', '.join(unexpected_scans), statement)
@@ -1,12 +1,14 @@
 
 import datetime
 import functools
+import json
 import secrets
 import unittest.mock
 
 import pytest
 
 from terrareg.database import Database
+from terrareg.errors import NoModuleDownloadMethodConfiguredError
 from terrareg.models import (
     GitProvider, Module, ModuleDetails,
     ModuleProvider, ModuleVersion, Namespace, Session
@@ -146,10 +148,26 @@ class MockModuleDetails(ModuleDetails):
         return module_details
 
     def update_attributes(self, **kwargs):
+        for kwarg in kwargs:
+            if kwarg in self.BLOB_COLUMNS:
+                kwargs[kwarg] = Database.encode_blob(kwargs[kwarg])
         TEST_MODULE_DETAILS[str(self._id)].update(**kwargs)
+        self._cache_columns = {}
 
-    def _get_db_row(self):
-        return dict(TEST_MODULE_DETAILS[str(self._id)])
+    def get_readme_html(self, server_hostname):
+        """Return no stored README HTML."""
+        return None
+
+    def update_readme_html(self, server_hostname, readme_html):
+        """Do not store README HTML."""
+        pass
+
+    def _select_columns(self, columns):
+        row = dict(TEST_MODULE_DETAILS[str(self._id)])
+        # Calculate tfsec failure counts, as performed when updating module details
+        tfsec = Database.decode_blob(row.get('tfsec'))
+        row.update(self.get_tfsec_failure_counts(json.loads(tfsec) if tfsec else None))
+        return {column: row.get(column) for column in columns}
 
 
 class MockModuleVersion(ModuleVersion):
@@ -169,10 +187,43 @@ class MockModuleVersion(ModuleVersion):
             None
         )
 
+    @classmethod
+    def get_for_download(cls, namespace, module, provider, version):
+        """Return mocked module version for download."""
+        namespace_obj = MockNamespace(name=namespace)
+        module_obj = MockModule(namespace=namespace_obj, name=module)
+        module_provider = MockModuleProvider(module=module_obj, name=provider)
+        return cls.get(module_provider=module_provider, version=version)
+
+    @classmethod
+    def get_for_download_from_rows(cls, namespace, module, provider, version, module_provider_row, module_version_row):
+        """Return mocked module version for download, ignoring rows."""
+        namespace_obj = MockNamespace(name=namespace)
+        module_obj = MockModule(namespace=namespace_obj, name=module)
+        module_provider = MockModuleProvider(module=module_obj, name=provider)
+        return cls(module_provider=module_provider, version=version)
+
     def update_attributes(self, **kwargs):
         """Mock updating module version attributes"""
         self._unittest_data.update(kwargs)
 
+    def get_details_document(self):
+        """Return generated details document, without storing."""
+        return self.update_details_document()
+
+    def update_details_document(self):
+        """Return generated details document, without storing."""
+        details_document = self._generate_terrareg_api_details()
+        del details_document['downloads']
+        return details_document
+
+    def update_source_download_url(self):
+        """Return generated source download URL, without storing."""
+        try:
+            return self.get_source_download_url()
+        except NoModuleDownloadMethodConfiguredError:
+            return None
+
     def _get_db_row(self):
         """Return mock DB row"""
         if self._unittest_data is None:
@@ -195,7 +246,12 @@ class MockModuleVersion(ModuleVersion):
             'internal': self._unittest_data.get('internal', False),
             'published': self._unittest_data.get('published', False),
             'beta': self._unittest_data.get('beta', False),
-            'module_details_id': self._unittest_data.get('module_details_id', None)
+            'module_details_id': self._unittest_data.get('module_details_id', None),
+            'source_download_url': self._unittest_data.get('source_download_url', None),
+            'source_download_url_config_fingerprint': self._unittest_data.get(
+                'source_download_url_config_fingerprint',
+                self.get_source_download_url_config_fingerprint()
+            )
         }
 
 
@@ -309,6 +365,21 @@ class MockNamespace(Namespace):
                       {})
         ]
 
+    def get_module_providers(self, offset: int, limit: int, cursor_values: tuple=None):
+        """Return page of module providers in namespace."""
+        module_providers = sorted([
+            module_provider
+            for module in self.get_all_modules()
+            for module_provider in module.get_providers()
+        ], key=lambda module_provider: (module_provider._module.name, module_provider.name))
+        if cursor_values:
+            module_providers = [
+                module_provider
+                for module_provider in module_providers
+                if (self.name, module_provider._module.name, module_provider.name) > tuple(cursor_values)
+            ]
+        return module_providers[offset:offset + limit + 1]
+
     @property
     def _unittest_data(self):
         """Return unit test data structure for namespace."""
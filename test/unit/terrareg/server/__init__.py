@@ -19,7 +19,9 @@ def mocked_search_module_providers(request):
             namespaces: list=None,
             providers: list=None,
             verified: bool=False,
-            namespace_trust_filters: list=NamespaceTrustFilter.UNSPECIFIED):
+            namespace_trust_filters: list=NamespaceTrustFilter.UNSPECIFIED,
+            cursor: str=None,
+            include_count: bool=False):
         return ModuleSearchResults(offset=offset, limit=limit, count=0, module_providers=[])
 
     magic_mock = unittest.mock.MagicMock(
@@ -48,7 +48,7 @@ class TestApiModuleDetails(TerraregUnitTest):
         assert res.status_code == 200
 
         mocked_search_module_providers.assert_called_once_with(
-            offset=0, limit=10, namespaces=['testnamespace'], modules=['lonelymodule'])
+            offset=0, limit=10, namespaces=['testnamespace'], modules=['lonelymodule'], cursor=None)
 
     @setup_test_data()
     def test_unverified_module(self, client, mocked_server_namespace_fixture,
@@ -83,7 +83,7 @@ class TestApiModuleDetails(TerraregUnitTest):
         assert res.status_code == 200
 
         mocked_search_module_providers.assert_called_once_with(
-            offset=0, limit=10, namespaces=['testnamespace'], modules=['unverifiedmodule'])
+            offset=0, limit=10, namespaces=['testnamespace'], modules=['unverifiedmodule'], cursor=None)
 
     def test_non_existent_module(self, client, mocked_server_namespace_fixture,
                                  mocked_search_module_providers):
@@ -104,7 +104,7 @@ class TestApiModuleDetails(TerraregUnitTest):
         assert res.status_code == 404
 
         mocked_search_module_providers.assert_called_once_with(
-            offset=0, limit=10, namespaces=['doesnotexist'], modules=['unittestdoesnotexist'])
+            offset=0, limit=10, namespaces=['doesnotexist'], modules=['unittestdoesnotexist'], cursor=None)
 
     @setup_test_data()
     def test_analytics_token(self, client, mocked_server_namespace_fixture,
@@ -148,5 +148,5 @@ class TestApiModuleDetails(TerraregUnitTest):
         }
         assert res.status_code == 200
         mocked_search_module_providers.assert_called_once_with(
-            offset=0, limit=10, namespaces=['testnamespace'], modules=['lonelymodule'])
+            offset=0, limit=10, namespaces=['testnamespace'], modules=['lonelymodule'], cursor=None)
 
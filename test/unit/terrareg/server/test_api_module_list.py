@@ -21,7 +21,7 @@ class TestApiModuleList(TerraregUnitTest):
             'meta': {'current_offset': 0, 'limit': 10}, 'modules': []
         }
 
-        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=0, limit=10)
+        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=0, limit=10, cursor=None)
 
     def test_with_limit_offset(self, client, mocked_search_module_providers):
         """Call with limit and offset"""
@@ -32,7 +32,7 @@ class TestApiModuleList(TerraregUnitTest):
             'meta': {'current_offset': 23, 'limit': 12, 'prev_offset': 11}, 'modules': []
         }
 
-        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=23, limit=12)
+        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=23, limit=12, cursor=None)
 
     def test_with_provider_filter(self, client, mocked_search_module_providers):
         """Call with provider limit"""
@@ -43,7 +43,7 @@ class TestApiModuleList(TerraregUnitTest):
             'meta': {'current_offset': 0, 'limit': 10}, 'modules': []
         }
 
-        ModuleSearch.search_module_providers.assert_called_with(providers=['testprovider'], verified=False, offset=0, limit=10)
+        ModuleSearch.search_module_providers.assert_called_with(providers=['testprovider'], verified=False, offset=0, limit=10, cursor=None)
 
     def test_with_verified_false(self, client, mocked_search_module_providers):
         """Call with verified flag as false"""
@@ -53,7 +53,7 @@ class TestApiModuleList(TerraregUnitTest):
         assert res.json == {
             'meta': {'current_offset': 0, 'limit': 10}, 'modules': []
         }
-        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=0, limit=10)
+        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=0, limit=10, cursor=None)
 
 
     def test_with_verified_true(self, client, mocked_search_module_providers):
@@ -64,7 +64,14 @@ class TestApiModuleList(TerraregUnitTest):
         assert res.json == {
             'meta': {'current_offset': 0, 'limit': 10}, 'modules': []
         }
-        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=True, offset=0, limit=10)
+        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=True, offset=0, limit=10, cursor=None)
+
+    def test_with_cursor(self, client, mocked_search_module_providers):
+        """Call with pagination cursor"""
+        res = client.get('/v1/modules?cursor=testcursor')
+
+        assert res.status_code == 200
+        ModuleSearch.search_module_providers.assert_called_with(providers=None, verified=False, offset=0, limit=10, cursor='testcursor')
 
     @setup_test_data()
     def test_with_module_response(self, client, mocked_search_module_providers):
@@ -1,5 +1,7 @@
 
 from unittest import mock
+
+from terrareg.cache import LRUCache
 from test.unit.terrareg import (
     MockModuleProvider, MockModule, MockNamespace,
     mocked_server_namespace_fixture,
@@ -98,3 +100,95 @@ class TestApiModuleProviderDetails(TerraregUnitTest):
 
         assert res.json == test_module_provider.get_latest_version().get_api_details()
         assert res.status_code == 200
+
+    @setup_test_data()
+    def test_etag(self, client, mocked_server_namespace_fixture):
+        """Test ETag is returned and conditional request returns not modified without obtaining module details"""
+        with mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[5, 10]) as mock_get_api_revision:
+            res = client.get('/v1/modules/test_token-name__testnamespace/mock-module/testprovider')
+
+            assert res.status_code == 200
+            etag = res.headers['ETag']
+            assert etag
+
+            mock_get_api_revision.assert_called_once_with(
+                namespace='testnamespace', module='mock-module', provider='testprovider',
+                version=None, include_downloads=True)
+
+            with mock.patch('terrareg.models.ModuleProvider.get_latest_version') as mock_get_latest_version:
+                res = client.get('/v1/modules/test_token-name__testnamespace/mock-module/testprovider',
+                                 headers={'If-None-Match': etag})
+
+                assert res.status_code == 304
+                assert res.data == b''
+                assert res.headers['ETag'] == etag
+                mock_get_latest_version.assert_not_called()
+
+        # Ensure ETag changes with revision and download count of module provider
+        for api_revision in [[6, 10], [5, 11]]:
+            with mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=api_revision):
+                res = client.get('/v1/modules/test_token-name__testnamespace/mock-module/testprovider',
+                                 headers={'If-None-Match': etag})
+
+                assert res.status_code == 200
+                assert res.headers['ETag'] != etag
+
+    @setup_test_data()
+    def test_etag_changes_with_config(self, client, mocked_server_namespace_fixture):
+        """Test ETag changes when configuration used to generate the response is changed"""
+        with mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[5, 10]):
+            res = client.get('/v1/modules/testnamespace/mock-module/testprovider')
+            assert res.status_code == 200
+            etag = res.headers['ETag']
+
+            for config_name, config_value in [
+                    ('TRUSTED_NAMESPACES', ['testnamespace']),
+                    ('TERRAFORM_EXAMPLE_VERSION_TEMPLATE', '>= {major}.{minor}.{patch}'),
+                    ('ENABLE_SECURITY_SCANNING', False),
+                    ('ALLOW_MODULE_HOSTING', False),
+                    ('ALLOW_CUSTOM_GIT_URL_MODULE_PROVIDER', False),
+                    ('ALLOW_CUSTOM_GIT_URL_MODULE_VERSION', False),
+                    ('GIT_PROVIDER_CONFIG', '[{"name": "Test Provider"}]')]:
+                with mock.patch('terrareg.config.Config.{}'.format(config_name), config_value):
+                    res = client.get('/v1/modules/testnamespace/mock-module/testprovider',
+                                     headers={'If-None-Match': etag})
+
+                    assert res.status_code == 200
+                    assert res.headers['ETag'] != etag
+
+    def test_etag_non_existent_module_provider(self, client, mocked_server_namespace_fixture):
+        """Test ETag is not returned for non-existent module provider"""
+        res = client.get('/v1/modules/doesnotexist/unittestdoesnotexist/unittestproviderdoesnotexist')
+
+        assert res.status_code == 404
+        assert 'ETag' not in res.headers
+
+    @setup_test_data()
+    def test_response_cache(self, client, mocked_server_namespace_fixture):
+        """Test responses are returned from response cache, until the module provider revision changes"""
+        response_cache = LRUCache(name='unittest-response-provider-details', max_size=10)
+        with mock.patch('terrareg.cache.ResponseCache._BACKEND', response_cache):
+            with mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[5, 10]):
+                res = client.get('/v1/modules/testnamespace/mock-module/testprovider')
+                assert res.status_code == 200
+                expected_response = res.json
+
+                with mock.patch('terrareg.models.ModuleProvider.get_latest_version') as mock_get_latest_version:
+                    res = client.get('/v1/modules/testnamespace/mock-module/testprovider')
+
+                    assert res.status_code == 200
+                    assert res.json == expected_response
+                    assert res.headers['ETag']
+                    mock_get_latest_version.assert_not_called()
+
+            assert response_cache.hits == 1
+            assert response_cache.misses == 1
+
+            # Ensure cached response is not used after revision changes
+            with mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[6, 10]):
+                res = client.get('/v1/modules/testnamespace/mock-module/testprovider')
+                assert res.status_code == 200
+                assert res.json == expected_response
+
+            assert response_cache.hits == 1
+            assert response_cache.misses == 2
@@ -1,5 +1,6 @@
 
 from terrareg.module_search import ModuleSearch, ModuleSearchResults
+from terrareg.errors import InvalidSearchCursorError
 from terrareg.filters import NamespaceTrustFilter
 from test.unit.terrareg import (
     MockModuleProvider, MockModule, MockNamespace,
@@ -28,7 +29,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='unittestteststring', namespaces=None, providers=None, verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_limit_offset(self, client, mocked_search_module_providers):
         """Call with limit and offset"""
@@ -41,7 +42,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=None, providers=None, verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=23, limit=12)
+            offset=23, limit=12, cursor=None, include_count=False)
 
     def test_with_provider(self, client, mocked_search_module_providers):
         """Call with provider filter"""
@@ -54,7 +55,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=None, providers=['testprovider'], verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_multiple_providers(self, client, mocked_search_module_providers):
         """Call with multiple provider filters."""
@@ -67,7 +68,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=None, providers=['testprovider1', 'unittestprovider2'], verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_namespace(self, client, mocked_search_module_providers):
         """Call with namespace filter"""
@@ -80,7 +81,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=['testnamespace'], providers=None, verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_multiple_namespaces(self, client, mocked_search_module_providers):
         """Call with namespace filter"""
@@ -93,7 +94,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=['testnamespace', 'unittestnamespace2'], providers=None, verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_namespace_trust_filters(self, client, mocked_search_module_providers):
         """Call with trusted namespace/contributed filters"""
@@ -115,7 +116,7 @@ class TestApiModuleSearch(TerraregUnitTest):
             ModuleSearch.search_module_providers.assert_called_with(
                 query='test', namespaces=None, providers=None, verified=False,
                 namespace_trust_filters=namespace_filter[1],
-                offset=0, limit=10)
+                offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_verified_false(self, client, mocked_search_module_providers):
         """Call with verified flag as false"""
@@ -128,7 +129,7 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=None, providers=None, verified=False,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
 
     def test_with_verified_true(self, client, mocked_search_module_providers):
         """Test call with verified as true"""
@@ -141,7 +142,31 @@ class TestApiModuleSearch(TerraregUnitTest):
         ModuleSearch.search_module_providers.assert_called_with(
             query='test', namespaces=None, providers=None, verified=True,
             namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
-            offset=0, limit=10)
+            offset=0, limit=10, cursor=None, include_count=False)
+
+    def test_with_include_count(self, client, mocked_search_module_providers):
+        """Test call with include_count, ensuring the count is only requested when required"""
+        res = client.get('/v1/modules/search?q=test&include_count=true')
+
+        assert res.status_code == 200
+        assert res.json == {
+            'meta': {'current_offset': 0, 'limit': 10}, 'modules': [], 'count': 0
+        }
+        ModuleSearch.search_module_providers.assert_called_with(
+            query='test', namespaces=None, providers=None, verified=False,
+            namespace_trust_filters=NamespaceTrustFilter.UNSPECIFIED,
+            offset=0, limit=10, cursor=None, include_count=True)
+
+    def test_with_invalid_cursor(self, client, mocked_search_module_providers):
+        """Test call with invalid pagination cursor"""
+        def raise_invalid_cursor(*args, **kwargs):
+            raise InvalidSearchCursorError('Invalid pagination cursor')
+        mocked_search_module_providers.side_effect = raise_invalid_cursor
+
+        res = client.get('/v1/modules/search?q=test&cursor=invalid')
+
+        assert res.status_code == 400
+        assert res.json == {'status': 'Error', 'message': 'Invalid pagination cursor'}
 
     @setup_test_data()
     def test_with_single_module_response(self, client, mocked_search_module_providers):
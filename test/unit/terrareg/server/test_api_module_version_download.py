@@ -3,6 +3,7 @@ import unittest.mock
 
 from terrareg.models import Namespace
 from terrareg.analytics import AnalyticsEngine
+from terrareg.cache import LRUCache
 from test.unit.terrareg import (
     MockModuleProvider, MockModuleVersion, MockModule, MockNamespace,
     mocked_server_namespace_fixture,
@@ -164,3 +165,75 @@ class TestApiModuleVersionDownload(TerraregUnitTest):
         )
         assert AnalyticsEngine.record_module_version_download.call_args.kwargs['module_version'].id == test_module_version.id
 
+
+    @setup_test_data({
+        'testnamespace': {
+            'testmodulename': {
+                'testprovider': {
+                    'id': 1,
+                    'latest_version': '2.4.1',
+                    'versions': {'2.4.1': {
+                        'published': True,
+                        'source_download_url': 'git::https://example.com/stored-url?ref=2.4.1'
+                    }}
+                }
+            }
+        }
+    })
+    def test_stored_source_download_url(
+        self, client, mocked_server_namespace_fixture,
+        mock_record_module_version_download):
+        """Test stored source download URL of module version is returned"""
+        with unittest.mock.patch('test.unit.terrareg.MockModuleVersion.get_source_download_url') as mock_get_source_download_url:
+            res = client.get(
+                '/v1/modules/test_token-name__testnamespace/testmodulename/testprovider/2.4.1/download',
+                headers={'X-Terraform-Version': 'TestTerraformVersion',
+                         'User-Agent': 'TestUserAgent'}
+            )
+            mock_get_source_download_url.assert_not_called()
+
+        assert res.status_code == 204
+        assert res.headers['X-Terraform-Get'] == 'git::https://example.com/stored-url?ref=2.4.1'
+        AnalyticsEngine.record_module_version_download.assert_called_once()
+
+    @setup_test_data()
+    def test_cached_download(
+        self, client, mocked_server_namespace_fixture,
+        mock_record_module_version_download):
+        """Test module version download is cached, whilst still checking analytics token and recording downloads"""
+        response_cache = LRUCache(name='unittest-response-download', max_size=10)
+        with unittest.mock.patch('terrareg.cache.ResponseCache._BACKEND', response_cache), \
+                unittest.mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[5]):
+            res = client.get('/v1/modules/test_token-name__testnamespace/testmodulename/testprovider/2.4.1/download')
+            assert res.status_code == 204
+            assert res.headers['X-Terraform-Get'] == '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip'
+            assert response_cache.misses == 1
+
+            with unittest.mock.patch('test.unit.terrareg.MockModuleVersion.get_for_download') as mock_get_for_download, \
+                    unittest.mock.patch('test.unit.terrareg.MockModuleVersion.get_stored_source_download_url') as mock_get_stored_source_download_url:
+                # Ensure cached download, using a different analytics token, is recorded
+                res = client.get('/v1/modules/other-token__testnamespace/testmodulename/testprovider/2.4.1/download')
+                assert res.status_code == 204
+                assert res.headers['X-Terraform-Get'] == '/v1/terrareg/modules/testnamespace/testmodulename/testprovider/2.4.1/source.zip'
+
+                assert AnalyticsEngine.record_module_version_download.call_count == 2
+                assert AnalyticsEngine.record_module_version_download.call_args.kwargs['analytics_token'] == 'other-token'
+                assert AnalyticsEngine.record_module_version_download.call_args.kwargs['module_version'].version == '2.4.1'
+
+                # Ensure cached download is rejected without analytics token
+                res = client.get('/v1/modules/testnamespace/testmodulename/testprovider/2.4.1/download')
+                assert res.status_code == 401
+                assert AnalyticsEngine.record_module_version_download.call_count == 2
+
+                mock_get_for_download.assert_not_called()
+                mock_get_stored_source_download_url.assert_not_called()
+
+            assert response_cache.hits == 2
+
+        # Ensure cached download is not used after revision of module provider changes
+        with unittest.mock.patch('terrareg.cache.ResponseCache._BACKEND', response_cache), \
+                unittest.mock.patch('terrareg.models.ModuleProvider.get_api_revision', return_value=[6]):
+            res = client.get('/v1/modules/test_token-name__testnamespace/testmodulename/testprovider/2.4.1/download')
+            assert res.status_code == 204
+            assert response_cache.hits == 2
+            assert response_cache.misses == 2
@@ -2,6 +2,8 @@
 from unittest import mock
 
 import pytest
+
+from terrareg.module_search import ModuleSearch
 from test.unit.terrareg import (
     MockModuleProvider, MockModule, MockNamespace,
     mocked_server_namespace_fixture,
@@ -23,38 +25,6 @@ class TestApiTerraregNamespaceModules(TerraregUnitTest):
                 'limit': 10
             },
             'modules': [
-                {
-                    # Ensure normal published module is shown
-                    'description': 'Test description',
-                    'downloads': 0,
-                    'id': 'smallernamespacelist/publishedone/testprovider/2.1.1',
-                    'internal': False,
-                    'name': 'publishedone',
-                    'namespace': 'smallernamespacelist',
-                    'owner': 'Mock Owner',
-                    'provider': 'testprovider',
-                    'published_at': '2020-01-01T23:18:12',
-                    'source': None,
-                    'trusted': False,
-                    'verified': False,
-                    'version': '2.1.1'
-                },
-                {
-                    # Second published module provider in same module
-                    'description': 'Description of second provider in module',
-                    'downloads': 0,
-                    'id': 'smallernamespacelist/publishedone/secondnamespace/2.2.2',
-                    'internal': False,
-                    'name': 'publishedone',
-                    'namespace': 'smallernamespacelist',
-                    'owner': 'Mock Owner',
-                    'provider': 'secondnamespace',
-                    'published_at': '2020-01-01T23:18:12',
-                    'source': None,
-                    'trusted': False,
-                    'verified': False,
-                    'version': '2.2.2'
-                },
                 {
                     # Ensure module provider with no versions is returned correctly
                     'id': 'smallernamespacelist/noversions/testprovider',
@@ -81,12 +51,82 @@ class TestApiTerraregNamespaceModules(TerraregUnitTest):
                     'provider': 'testprovider',
                     'trusted': False,
                     'verified': False
+                },
+                {
+                    # Second published module provider in same module
+                    'description': 'Description of second provider in module',
+                    'downloads': 0,
+                    'id': 'smallernamespacelist/publishedone/secondnamespace/2.2.2',
+                    'internal': False,
+                    'name': 'publishedone',
+                    'namespace': 'smallernamespacelist',
+                    'owner': 'Mock Owner',
+                    'provider': 'secondnamespace',
+                    'published_at': '2020-01-01T23:18:12',
+                    'source': None,
+                    'trusted': False,
+                    'verified': False,
+                    'version': '2.2.2'
+                },
+                {
+                    # Ensure normal published module is shown
+                    'description': 'Test description',
+                    'downloads': 0,
+                    'id': 'smallernamespacelist/publishedone/testprovider/2.1.1',
+                    'internal': False,
+                    'name': 'publishedone',
+                    'namespace': 'smallernamespacelist',
+                    'owner': 'Mock Owner',
+                    'provider': 'testprovider',
+                    'published_at': '2020-01-01T23:18:12',
+                    'source': None,
+                    'trusted': False,
+                    'verified': False,
+                    'version': '2.1.1'
                 }
             ]
         }
 
         assert res.status_code == 200
 
+    @setup_test_data()
+    def test_cursor_pagination(self, client, mocked_server_namespace_fixture):
+        """Test paging through modules in namespace using cursors."""
+        res = client.get('/v1/terrareg/modules/smallernamespacelist?limit=2')
+
+        assert res.status_code == 200
+        assert [module['name'] for module in res.json['modules']] == ['noversions', 'onlybeta']
+        assert res.json['meta']['next_offset'] == 2
+        assert ModuleSearch.decode_cursor(res.json['meta']['next_cursor']) == (
+            'smallernamespacelist', 'onlybeta', 'testprovider')
+
+        res = client.get('/v1/terrareg/modules/smallernamespacelist?limit=2&cursor={}'.format(
+            res.json['meta']['next_cursor']))
+
+        assert res.status_code == 200
+        assert [module['id'] for module in res.json['modules']] == [
+            'smallernamespacelist/onlyunpublished/testprovider',
+            'smallernamespacelist/publishedone/secondnamespace/2.2.2'
+        ]
+
+        res = client.get('/v1/terrareg/modules/smallernamespacelist?limit=2&cursor={}'.format(
+            res.json['meta']['next_cursor']))
+
+        assert res.status_code == 200
+        assert [module['id'] for module in res.json['modules']] == [
+            'smallernamespacelist/publishedone/testprovider/2.1.1'
+        ]
+        assert 'next_cursor' not in res.json['meta']
+        assert 'next_offset' not in res.json['meta']
+
+    @setup_test_data()
+    def test_invalid_cursor(self, client, mocked_server_namespace_fixture):
+        """Test endpoint with invalid pagination cursor."""
+        res = client.get('/v1/terrareg/modules/smallernamespacelist?cursor=invalid')
+
+        assert res.json == {'status': 'Error', 'message': 'Invalid pagination cursor'}
+        assert res.status_code == 400
+
     def test_non_existent_namespace(self, client, mocked_server_namespace_fixture):
         """Test endpoint with non-existent module"""
 
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from terrareg.cache import LRUCache, ResponseCache
+from test.unit.terrareg import TerraregUnitTest
+
+
+class TestLRUCache(TerraregUnitTest):
+    """Test LRUCache."""
+
+    def test_get_and_set(self):
+        """Test storing and obtaining values."""
+        cache = LRUCache(name='unittest-get-set', max_size=10)
+        assert cache.get('key') is None
+        assert cache.get('key', 'default') == 'default'
+
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+        assert cache.size == 1
+
+        cache.delete('key')
+        assert cache.get('key') is None
+
+        assert cache.hits == 1
+        assert cache.misses == 3
+        assert cache.hit_ratio == 0.25
+
+    def test_eviction(self):
+        """Test least recently used entries are evicted."""
+        cache = LRUCache(name='unittest-eviction', max_size=2)
+        cache.set('first', 1)
+        cache.set('second', 2)
+
+        # Use first value, so second is least recently used
+        assert cache.get('first') == 1
+        cache.set('third', 3)
+
+        assert cache.get('second') is None
+        assert cache.get('first') == 1
+        assert cache.get('third') == 3
+        assert cache.size == 2
+        assert cache.evictions == 1
+
+    def test_clear(self):
+        """Test removing all values."""
+        cache = LRUCache(name='unittest-clear', max_size=2)
+        cache.set('first', 1)
+        cache.clear()
+        assert cache.size == 0
+        assert cache.get('first') is None
+
+    def test_disabled(self):
+        """Test cache with maximum size of 0 does not store values."""
+        cache = LRUCache(name='unittest-disabled', max_size=0)
+        cache.set('first', 1)
+        assert cache.get('first') is None
+
+    def test_registered(self):
+        """Test caches are registered by name."""
+        cache = LRUCache(name='unittest-registered', max_size=2)
+        assert cache in LRUCache.get_caches()
+
+
+class TestResponseCache(TerraregUnitTest):
+    """Test ResponseCache."""
+
+    def test_get_and_set(self):
+        """Test responses are only returned for the state they were cached with."""
+        backend = LRUCache(name='unittest-response-get-set', max_size=10)
+        with mock.patch('terrareg.cache.ResponseCache._BACKEND', backend):
+            assert ResponseCache.get(('resource', '/path'), [1, 2]) is None
+
+            ResponseCache.set(('resource', '/path'), [1, 2], {'test': 'response'})
+            assert ResponseCache.get(('resource', '/path'), [1, 2]) == {'test': 'response'}
+            assert ResponseCache.get(('resource', '/path'), [1, 3]) is None
+            assert ResponseCache.get(('resource', '/otherpath'), [1, 2]) is None
+
+    def test_disabled(self):
+        """Test response cache is disabled with cache size of 0."""
+        with mock.patch('terrareg.cache.ResponseCache._BACKEND', None), \
+                mock.patch('terrareg.config.Config.RESPONSE_CACHE_SIZE', 0):
+            assert ResponseCache.get_backend() is None
+            ResponseCache.set(('resource', '/path'), [1], {'test': 'response'})
+            assert ResponseCache.get(('resource', '/path'), [1]) is None
@@ -75,7 +75,15 @@ class TestConfig:
 
     @pytest.mark.parametrize('config_name', [
         'ADMIN_SESSION_EXPIRY_MINS',
-        'LISTEN_PORT'
+        'LISTEN_PORT',
+        'ANALYTICS_WRITE_BEHIND_BATCH_SIZE',
+        'ANALYTICS_WRITE_BEHIND_FLUSH_INTERVAL',
+        'ANALYTICS_WRITE_BEHIND_MAX_QUEUE_SIZE',
+        'ANALYTICS_RETENTION_DAYS',
+        'ANALYTICS_RETENTION_BATCH_SIZE',
+        'ANALYTICS_RETENTION_INTERVAL',
+        'SEARCH_CACHE_SIZE',
+        'RESPONSE_CACHE_SIZE'
     ])
     def test_integer_configs(self, config_name):
         """Test integer configs to ensure they are overriden with environment variables."""
@@ -137,7 +145,9 @@ class TestConfig:
         'ENABLE_SECURITY_SCANNING',
         'AUTOGENERATE_USAGE_BUILDER_VARIABLES',
         'THREADED',
-        'INFRACOST_TLS_INSECURE_SKIP_VERIFY'
+        'INFRACOST_TLS_INSECURE_SKIP_VERIFY',
+        'ANALYTICS_WRITE_BEHIND',
+        'SEARCH_IN_MEMORY_INDEX'
     ])
     def test_boolean_configs(self, config_name, test_value, expected_value):
         """Test boolean configs to ensure they are overriden with environment variables."""
@@ -146,3 +156,12 @@ class TestConfig:
         with unittest.mock.patch('os.environ', {config_name: test_value}):
             assert getattr(terrareg.config.Config(), config_name) is expected_value
 
+
+    def test_get_fingerprint(self):
+        """Test fingerprint of configuration changes when configuration values change."""
+        with unittest.mock.patch('os.environ', {}):
+            fingerprint = terrareg.config.Config().get_fingerprint(['ALLOW_MODULE_HOSTING', 'GIT_PROVIDER_CONFIG'])
+            assert fingerprint == terrareg.config.Config().get_fingerprint(['ALLOW_MODULE_HOSTING', 'GIT_PROVIDER_CONFIG'])
+
+        with unittest.mock.patch('os.environ', {'ALLOW_MODULE_HOSTING': 'False'}):
+            assert terrareg.config.Config().get_fingerprint(['ALLOW_MODULE_HOSTING', 'GIT_PROVIDER_CONFIG']) != fingerprint